@@ -0,0 +1,236 @@
+"""Structured, buffered activity log with rotated segments and a date index.
+
+Entries are JSON lines with ``ts``, ``action``, ``day``, ``task_id`` and
+``description``. :meth:`ActivityLog.record` only queues an entry; a worker
+thread appends queued entries in batches to ``current.jsonl``. Once that
+file passes ``max_segment_bytes`` it is gzipped into a numbered segment.
+``index.json`` lists, per segment, the dates it covers and which actions
+happened on each, so :meth:`ActivityLog.query` opens only the segments that
+can match. The window and the ``workflow`` command may log at once; each
+write goes through a file lock and starts from the index on disk.
+"""
+from datetime import datetime
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+from storage import FileLock
+
+logger = logging.getLogger(__name__)
+
+LEGACY_LINE = re.compile(r'^\[(?P<ts>[^\]]+)\] (?P<text>.*)$')
+LEGACY_TASK = re.compile(r'^(?P<verb>Added|Removed) task (?:to|from) (?P<day>\w+): (?P<description>.*)$')
+
+# Queue markers that end a batch early.
+_FLUSH = object()
+_CLOSE = object()
+
+
+class ActivityLog:
+    def __init__(self, directory='activity', max_segment_bytes=1 << 20, flush_interval=1.0):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_interval = flush_interval
+        self.current_path = os.path.join(directory, 'current.jsonl')
+        self.index_path = os.path.join(directory, 'index.json')
+        os.makedirs(directory, exist_ok=True)
+
+        self._file_lock = FileLock(f"{self.index_path}.lock")
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='activity-log', daemon=True)
+        self._worker.start()
+
+    def record(self, action, day=None, task=None, description=None):
+        """Queue one entry; returns immediately."""
+        if description is None and task is not None:
+            description = task.description
+        self._queue.put({
+            'ts': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'action': action,
+            'day': day,
+            'task_id': task.id if task is not None else None,
+            'description': description,
+        })
+
+    def flush(self):
+        """Block until every queued entry is on disk."""
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_CLOSE)
+        self._worker.join()
+
+    def query(self, start=None, end=None, action=None, day=None):
+        """Return entries in time order matching every given filter.
+
+        ``start`` and ``end`` are inclusive ``date`` objects, ``action`` is
+        an action name and ``day`` the weekday the task belonged to.
+        """
+        self.flush()
+        first = start.isoformat() if start else None
+        last = end.isoformat() if end else None
+        results = []
+        # Held while reading, so no other process rotates the files away.
+        with self._file_lock:
+            with self._lock:
+                self._index = self._merge_index(self._read_index(self._index))
+                segments = [segment for segment in self._index['segments']
+                            if self._may_match(segment['dates'], first, last, action)]
+                current = self._may_match(self._index['current'], first, last, action)
+            paths = [os.path.join(self.directory, segment['file']) for segment in segments]
+            if current:
+                paths.append(self.current_path)
+
+            for path in paths:
+                opener = gzip.open if path.endswith('.gz') else open
+                with opener(path, 'rt') as file:
+                    for line in file:
+                        entry = json.loads(line)
+                        date = entry['ts'][:10]
+                        if first and date < first or last and date > last:
+                            continue
+                        if action and entry['action'] != action:
+                            continue
+                        if day and entry['day'] != day:
+                            continue
+                        results.append(entry)
+        return results
+
+    def import_legacy(self, path):
+        """Load a plain-text activity_log.txt once, into a fresh log."""
+        with self._lock:
+            if self._index['segments'] or self._index['current']:
+                return 0
+        try:
+            with open(path, 'r') as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return 0
+        count = 0
+        for line in lines:
+            match = LEGACY_LINE.match(line)
+            if not match:
+                continue
+            entry = {'ts': match['ts'], 'action': 'other', 'day': None,
+                     'task_id': None, 'description': match['text']}
+            task = LEGACY_TASK.match(match['text'])
+            if task:
+                entry['action'] = 'add' if task['verb'] == 'Added' else 'remove'
+                entry['day'] = task['day']
+                entry['description'] = task['description']
+            elif match['text'] == "Cleared completed tasks":
+                entry['action'] = 'clear'
+                entry['description'] = None
+            self._queue.put(entry)
+            count += 1
+        return count
+
+    @staticmethod
+    def _may_match(dates, first, last, action):
+        for date, actions in dates.items():
+            if first and date < first or last and date > last:
+                continue
+            if action is None or action in actions:
+                return True
+        return False
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while isinstance(batch[-1], dict) and len(batch) < 500:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            entries = [entry for entry in batch if isinstance(entry, dict)]
+            try:
+                if entries:
+                    self._write(entries)
+            except OSError:
+                logger.exception("Writing %d activity entries failed", len(entries))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is _CLOSE:
+                return
+
+    def _write(self, entries):
+        with self._file_lock:
+            with open(self.current_path, 'a') as file:
+                for entry in entries:
+                    file.write(json.dumps(entry) + '\n')
+                size = file.tell()
+            with self._lock:
+                self._index = self._merge_index(self._read_index(self._index))
+                for entry in entries:
+                    actions = self._index['current'].setdefault(entry['ts'][:10], [])
+                    if entry['action'] not in actions:
+                        actions.append(entry['action'])
+                if size >= self.max_segment_bytes:
+                    self._rotate()
+                self._save_index()
+
+    def _rotate(self):
+        # Called with both locks held, from the worker thread.
+        number = len(self._index['segments']) + 1
+        name = f"segment-{number:05d}.jsonl.gz"
+        with open(self.current_path, 'rb') as source, \
+                gzip.open(os.path.join(self.directory, name), 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.remove(self.current_path)
+        self._index['segments'].append({'file': name, 'dates': self._index['current']})
+        self._index['current'] = {}
+
+    def _merge_index(self, index):
+        # Another process may have logged or rotated since we last read the
+        # index. Unless it rotated, keep the dates only we know of too.
+        if len(index['segments']) == len(self._index['segments']):
+            for date, actions in self._index['current'].items():
+                merged = index['current'].setdefault(date, [])
+                merged.extend(action for action in actions if action not in merged)
+        return index
+
+    def _read_index(self, default):
+        try:
+            with open(self.index_path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return default
+
+    def _load_index(self):
+        index = self._read_index({'segments': [], 'current': {}})
+        # The open segment is small, so re-derive its dates in case the last
+        # index write was lost.
+        index['current'] = {}
+        try:
+            with open(self.current_path, 'r') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    actions = index['current'].setdefault(entry['ts'][:10], [])
+                    if entry['action'] not in actions:
+                        actions.append(entry['action'])
+        except FileNotFoundError:
+            pass
+        return index
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self._index, file)
+        os.replace(tmp_path, self.index_path)
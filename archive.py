@@ -0,0 +1,179 @@
+"""Compressed, date-partitioned archive of completed and past tasks.
+
+Tasks leave the live schedule (and tasks.json) when they are cleared as
+completed or once they have no occurrence left in the current week or
+later. Each is filed under the date it last happened, in one gzipped JSON
+lines segment per month. Appending adds a gzip member to the month's
+segment, so nothing already written is rewritten.
+
+``manifest.json`` counts, per segment and date, the archived and the
+completed tasks. Counts and :meth:`TaskArchive.stats` come from it alone;
+a segment is only decompressed when a date inside it is shown, and the
+most recently used ones stay decoded.
+"""
+from collections import OrderedDict
+from datetime import date
+import gzip
+import json
+import logging
+import os
+
+from recurrence import next_occurrence, previous_occurrence, week_dates
+from task_model import Task
+
+logger = logging.getLogger(__name__)
+
+
+def expired(tasks, horizon):
+    """Return ``(day, task)`` for every task in a ``{day: DaySchedule}`` week
+    that has no occurrence on or after date ``horizon``."""
+    found = []
+    for day, day_tasks in tasks.items():
+        for task in day_tasks:
+            # Runs on every load, so settle the common cases without the
+            # calendar: dated tasks by their date, open-ended rules never.
+            if task.date is not None:
+                if task.date < horizon:
+                    found.append((day, task))
+            elif task.rule is not None and task.rule.until is not None:
+                if next_occurrence(day, task, horizon) is None:
+                    found.append((day, task))
+    return found
+
+
+def filed_date(day, task, today):
+    """The date an archived task is filed under: the last time it happened,
+    or its first date if that is still ahead."""
+    when = previous_occurrence(day, task, today)
+    if when is None:
+        when = next_occurrence(day, task, today) or today
+    return when
+
+
+class TaskArchive:
+    """Archived tasks under ``directory``, read a month segment at a time.
+
+    Writers should hold the schedule's storage lock, as they do when
+    saving, so two processes never append to a segment at once.
+    """
+
+    def __init__(self, directory='archive', max_segments=6):
+        self.directory = directory
+        self.max_segments = max_segments
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        os.makedirs(directory, exist_ok=True)
+        self._manifest = {}
+        self._manifest_stamp = None
+        self._segments = OrderedDict()
+
+    def __len__(self):
+        self._refresh()
+        return sum(counts[0] for dates in self._manifest.values() for counts in dates.values())
+
+    def add(self, entries, today=None):
+        """Archive ``(day, task)`` pairs, filing each as of date ``today``."""
+        today = today or date.today()
+        by_month = {}
+        for day, task in entries:
+            when = filed_date(day, task, today)
+            by_month.setdefault(when.strftime('%Y-%m'), []).append((when, day, task))
+        if not by_month:
+            return
+        self._refresh()
+        for month, month_entries in by_month.items():
+            with gzip.open(self._segment_path(month), 'at') as file:
+                for when, day, task in month_entries:
+                    file.write(json.dumps({'date': when.isoformat(), 'day': day, 'task': task.to_dict()}) + '\n')
+            dates = self._manifest.setdefault(month, {})
+            for when, day, task in month_entries:
+                counts = dates.setdefault(when.isoformat(), [0, 0])
+                counts[0] += 1
+                counts[1] += task.completed
+            self._segments.pop(month, None)
+        self._save_manifest()
+
+    def on(self, when):
+        """Return the tasks archived under date ``when``, in start-time order."""
+        self._refresh()
+        month = when.strftime('%Y-%m')
+        if when.isoformat() not in self._manifest.get(month, {}):
+            return ()
+        return self._segment(month).get(when, ())
+
+    def week(self, start):
+        """Return ``{day: tasks}`` archived in the week beginning on Monday ``start``."""
+        return {day: self.on(when) for day, when in week_dates(start).items()}
+
+    def stats(self, start=None, end=None):
+        """Return ``(archived, completed)`` counts for dates from ``start`` to
+        ``end`` inclusive, without opening any segment."""
+        self._refresh()
+        first = start.isoformat() if start else None
+        last = end.isoformat() if end else None
+        archived = completed = 0
+        for dates in self._manifest.values():
+            for when, counts in dates.items():
+                if first and when < first or last and when > last:
+                    continue
+                archived += counts[0]
+                completed += counts[1]
+        return archived, completed
+
+    def _segment(self, month):
+        # {date: tuple of tasks} for one month, decoded on first use.
+        segment = self._segments.get(month)
+        if segment is not None:
+            self._segments.move_to_end(month)
+            return segment
+        by_date = {}
+        seen = set()
+        for entry in self._read(month):
+            key = (entry['date'], entry['task']['id'])
+            if key in seen:
+                continue  # Archived again after a crash before the schedule was saved
+            seen.add(key)
+            by_date.setdefault(date.fromisoformat(entry['date']), []).append(Task.from_dict(entry['task']))
+        segment = {when: tuple(sorted(tasks, key=lambda task: task.minutes)) for when, tasks in by_date.items()}
+        self._segments[month] = segment
+        if len(self._segments) > self.max_segments:
+            self._segments.popitem(last=False)
+        return segment
+
+    def _read(self, month):
+        try:
+            with gzip.open(self._segment_path(month), 'rt') as file:
+                for line in file:
+                    yield json.loads(line)
+        except FileNotFoundError:
+            return
+        except (EOFError, ValueError):
+            # A member cut short by a crash; what came before it is intact.
+            logger.warning("Archive segment %s ends early", self._segment_path(month))
+
+    def _segment_path(self, month):
+        return os.path.join(self.directory, f"tasks-{month}.jsonl.gz")
+
+    def _refresh(self):
+        # Another process may have archived since the manifest was read.
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if stamp == self._manifest_stamp:
+            return
+        try:
+            with open(self.manifest_path, 'r') as file:
+                self._manifest = json.load(file)
+        except ValueError:
+            return
+        self._manifest_stamp = stamp
+        self._segments.clear()
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self._manifest, file)
+        os.replace(tmp_path, self.manifest_path)
+        stat = os.stat(self.manifest_path)
+        self._manifest_stamp = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
@@ -0,0 +1,91 @@
+"""Show that startup stays flat as the task archive grows to years of data.
+
+Each scenario holds the same live schedule of 500 current and upcoming
+tasks plus an archive of 0 to 5 years of past ones, 20 a day. For each it
+reports time to first paint (as benchmarks/startup.py measures it), then
+opening one week from a year ago, which decodes a single month segment, and
+archive stats over every year, which only read the manifest.
+
+Run from the repository root:
+
+    python benchmarks/archive_startup.py [runs]
+"""
+from datetime import date, timedelta
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import archive
+import recurrence
+import storage
+from startup import time_to_first_paint
+from task_model import DAYS, DaySchedule, Recurrence, Task, format_time
+
+LIVE = 500
+PER_DAY = 20
+YEARS = (0, 1, 2, 5)
+
+
+def live_schedule(rng, monday):
+    tasks = {day: [] for day in DAYS}
+    for i in range(LIVE):
+        offset = rng.randrange(7)
+        time_text = format_time(rng.randrange(7 * 60, 22 * 60))
+        if rng.random() < 0.2:
+            task = Task(f"Routine {i}", time_text, True, rule=Recurrence(1, monday))
+        else:
+            task = Task(f"Task {i}", time_text, date=monday + timedelta(days=offset + 7 * rng.randrange(4)))
+        tasks[DAYS[offset]].append(task)
+    return {day: DaySchedule(day_tasks) for day, day_tasks in tasks.items()}
+
+
+def fill_archive(directory, rng, monday, years):
+    entries = []
+    for back in range(1, years * 365 + 1):
+        when = monday - timedelta(days=back)
+        for i in range(PER_DAY):
+            task = Task(f"Done {back}-{i}", format_time(rng.randrange(7 * 60, 22 * 60)), date=when,
+                        location=rng.choice(('', 'Hall A', 'Lab 3')))
+            task.completed = rng.random() < 0.8
+            entries.append((DAYS[when.weekday()], task))
+    archive.TaskArchive(os.path.join(directory, 'archive')).add(entries, monday)
+    return len(entries)
+
+
+def disk_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 5
+    monday = recurrence.week_start(date.today())
+    print(f"{'archive':>16} {'on disk':>9} {'first paint':>12} {'past week':>10} {'stats':>8}")
+    for years in YEARS:
+        rng = random.Random(years)
+        with tempfile.TemporaryDirectory() as directory:
+            storage.JsonStorage(os.path.join(directory, 'tasks.json')).save(live_schedule(rng, monday))
+            count = fill_archive(directory, rng, monday, years)
+            paint = statistics.median(time_to_first_paint('lazy', directory) for _ in range(runs))
+
+            tasks_archive = archive.TaskArchive(os.path.join(directory, 'archive'))
+            start = time.perf_counter()
+            week = tasks_archive.week(monday - 52 * recurrence.WEEK)
+            past_week = time.perf_counter() - start
+            start = time.perf_counter()
+            tasks_archive.stats()
+            stats = time.perf_counter() - start
+            assert sum(map(len, week.values())) == (7 * PER_DAY if years else 0)
+
+            print(f"{count:>9,} tasks {disk_size(os.path.join(directory, 'archive')) / 1e6:7.2f}MB "
+                  f"{paint * 1e3:10.1f}ms {past_week * 1e3:8.1f}ms {stats * 1e3:6.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
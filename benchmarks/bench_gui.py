@@ -0,0 +1,109 @@
+"""pytest-benchmark suite for MainWindow's hot paths at 100, 10k and 100k tasks.
+
+See conftest.py for how to run it and compare runs.
+"""
+import itertools
+
+import pytest
+
+import startup
+import storage
+from conftest import SIZES
+from task_model import DAYS
+
+pytestmark = pytest.mark.parametrize('workdir', SIZES, indirect=True, ids=lambda size: f"{size}tasks")
+
+
+def busiest_day(window):
+    return max(DAYS, key=lambda day: len(window.tasks[day]))
+
+
+def settle(window):
+    # Run the refresh and the save the change bus would otherwise defer.
+    window.changes.publish()
+    window.changes.flush()
+
+
+def test_add_task(benchmark, window):
+    window.build_tab(0)  # Edit tab
+    counter = itertools.count()
+
+    def add():
+        window.task_input.setText(f"Benchmark task {next(counter)}")
+        window.add_task()
+        settle(window)
+
+    benchmark(add)
+
+
+def test_toggle_task_completion(benchmark, window):
+    day = busiest_day(window)
+    task = window.tasks[day][len(window.tasks[day]) // 2]
+    states = itertools.cycle((True, False))
+
+    def toggle():
+        window.toggle_task_completion(day, task, next(states))
+        settle(window)
+
+    benchmark(toggle)
+
+
+def test_toggle_burst(benchmark, window):
+    # Ten checkboxes ticked in one go should cost about as much as one.
+    day = busiest_day(window)
+    tasks = [window.tasks[day][row] for row in range(0, len(window.tasks[day]), len(window.tasks[day]) // 10)][:10]
+    states = itertools.cycle((True, False))
+
+    def toggle_ten():
+        state = next(states)
+        for task in tasks:
+            window.toggle_task_completion(day, task, state)
+        settle(window)
+
+    benchmark(toggle_ten)
+
+
+def test_update_week_view(benchmark, window, qapp):
+    def update():
+        window.update_week_view()
+        qapp.processEvents()  # Include the relayout and repaint it causes
+
+    benchmark(update)
+
+
+def test_update_task_display(benchmark, window, qapp):
+    window.build_tab(0)  # Edit tab
+    days = itertools.cycle(DAYS)
+
+    def switch_day():
+        window.day_combo.blockSignals(True)
+        window.day_combo.setCurrentText(next(days))
+        window.day_combo.blockSignals(False)
+        window.update_task_display()
+        qapp.processEvents()
+
+    benchmark(switch_day)
+
+
+def test_load_tasks(benchmark, window):
+    benchmark(window.load_tasks)
+
+
+def test_save_tasks_full(benchmark, window):
+    benchmark(window.save_tasks)
+
+
+def test_save_tasks_single_change(benchmark, window):
+    day = busiest_day(window)
+    task = window.tasks[day][0]
+
+    def save():
+        task.completed = not task.completed
+        window.save_tasks(storage.updated(day, 0, task))
+
+    benchmark(save)
+
+
+def test_cold_startup(benchmark, workdir):
+    # A fresh interpreter per round, timed from launch to the first paint.
+    benchmark.pedantic(startup.time_to_first_paint, args=('lazy', str(workdir)), rounds=3, iterations=1)
@@ -0,0 +1,137 @@
+"""Fixtures for the headless GUI benchmarks in bench_gui.py.
+
+Run from the repository root:
+
+    python -m pytest benchmarks/bench_gui.py
+
+Qt uses the offscreen platform, weather, forecast and Twilio calls are
+stubbed, and each window works in its own scratch directory. The stub
+forecast covers the current week, so Week tab rows carry forecast notes.
+Every run is saved as JSON under benchmarks/.results, named after the
+current commit, so a later run can be checked against it:
+
+    python -m pytest benchmarks/bench_gui.py --benchmark-compare --benchmark-compare-fail=mean:10%
+"""
+from datetime import date, datetime, timedelta
+import os
+import random
+import shutil
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = os.path.join(REPO, 'benchmarks', '.results')
+sys.path.insert(0, REPO)
+
+import messaging
+import storage
+import weather
+from task_model import DAYS, DaySchedule, Recurrence, Task, format_time
+
+SIZES = (100, 10_000, 100_000)
+
+WEATHER = {
+    'main': {'temp': 290.0, 'temp_max': 293.0, 'temp_min': 287.0},
+    'weather': [{'description': 'clear sky'}],
+    'wind': {'speed': 3.1},
+    'sys': {'sunrise': 1700000000, 'sunset': 1700040000},
+}
+
+
+def synthetic_forecast():
+    """A 3-hourly forecast response covering the current week."""
+    monday = datetime.combine(date.today() - timedelta(days=date.today().weekday()), datetime.min.time())
+    return {'list': [{'dt': int((monday + timedelta(hours=3 * i)).timestamp()),
+                      'main': {'temp': 285.0 + i % 8},
+                      'weather': [{'description': 'light rain' if i % 3 == 0 else 'clear sky'}],
+                      'pop': 0.6 if i % 3 == 0 else 0.0}
+                     for i in range(7 * 8)]}
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Runs before pytest-benchmark reads its options, so these become the
+    # defaults for this directory; explicit command-line values still win.
+    if not hasattr(config.option, 'benchmark_autosave'):
+        return
+    from pytest_benchmark.utils import get_tag
+    if config.option.benchmark_storage == 'file://./.benchmarks':
+        config.option.benchmark_storage = f"file://{RESULTS}"
+    if not config.option.benchmark_save and not config.option.benchmark_autosave:
+        config.option.benchmark_autosave = get_tag()
+
+
+def synthetic_schedule(count, seed=0):
+    """A week of ``count`` tasks: mostly dated one-offs, some weekly rules.
+
+    The one-offs fall in this week and the next eight, so none of them are
+    moved to the archive when a window loads the schedule.
+    """
+    rng = random.Random(seed)
+    monday = date.today() - timedelta(days=date.today().weekday())
+    tasks = {day: [] for day in DAYS}
+    for i in range(count):
+        offset = rng.randrange(7)
+        time = format_time(rng.randrange(24 * 60))
+        if rng.random() < 0.3:
+            task = Task(f"Routine {i}", time, True, rule=Recurrence(rng.choice((1, 1, 2))))
+        else:
+            when = monday + timedelta(days=offset + 7 * rng.randrange(0, 9))
+            task = Task(f"Task {i} review notes", time, date=when)
+        task.completed = rng.random() < 0.2
+        tasks[DAYS[offset]].append(task)
+    return {day: DaySchedule(day_tasks) for day, day_tasks in tasks.items()}
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture(scope='session')
+def schedule_files(tmp_path_factory):
+    """``{size: directory}`` holding a tasks.json of that many tasks."""
+    directories = {}
+    for size in SIZES:
+        directory = tmp_path_factory.mktemp(f"schedule-{size}")
+        storage.JsonStorage(str(directory / 'tasks.json')).save(synthetic_schedule(size))
+        directories[size] = directory
+    return directories
+
+
+@pytest.fixture(autouse=True)
+def no_network(monkeypatch):
+    monkeypatch.setattr(weather.WeatherClient, 'fetch', lambda self: WEATHER)
+    forecast = weather.Forecast.from_response(synthetic_forecast())
+    monkeypatch.setattr(weather.WeatherClient, 'cached_forecast', lambda self: forecast)
+    monkeypatch.setattr(weather.WeatherClient, 'fetch_forecast', lambda self: forecast)
+    monkeypatch.setattr(messaging.TwilioTransport, 'send', lambda self, body: None)
+
+
+@pytest.fixture
+def workdir(request, schedule_files, tmp_path, monkeypatch):
+    """A scratch directory, made current, with a tasks.json of ``request.param`` tasks."""
+    shutil.copy(schedule_files[request.param] / 'tasks.json', tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def window(qapp, workdir):
+    from PyQt5 import sip
+    import main
+    window = main.MainWindow()
+    window.show()
+    qapp.processEvents()
+    yield window
+    window.close()
+    # Destroy the widgets now, on this thread. Left to the cyclic garbage
+    # collector they can be freed on a storage or log worker thread, which
+    # Qt aborts on.
+    sip.delete(window)
+    qapp.processEvents()
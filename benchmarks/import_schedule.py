@@ -0,0 +1,104 @@
+"""Measure importing a 5,000-event iCalendar file and a 5,000-row CSV.
+
+Each run reads, plans and applies the import into a schedule of 1,000 tasks
+and saves it through the journal backend, as MainWindow.import_schedule does.
+
+Run from the repository root:
+
+    python benchmarks/import_schedule.py
+"""
+from datetime import date, timedelta
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import importer
+import storage
+from task_model import DAYS, DaySchedule, Task, format_time
+
+EVENT_COUNT = 5_000
+EXISTING = 1_000
+COURSES = ['Calculus', 'Chemistry', 'History', 'Biology', 'Physics', 'Art', 'Statistics', 'Economics']
+ROOMS = ['Hall A', 'Room 101', 'Lab 3', 'Library, 2nd floor']
+
+
+def write_ics(path, rng):
+    monday = date.today() - timedelta(days=date.today().weekday())
+    with open(path, 'w', newline='') as file:
+        file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//benchmark//EN\r\n")
+        for i in range(EVENT_COUNT):
+            when = monday + timedelta(days=rng.randrange(-60, 60))
+            minutes = rng.randrange(7 * 60, 21 * 60, 5)
+            file.write("BEGIN:VEVENT\r\n")
+            file.write(f"UID:event-{i}@benchmark\r\n")
+            file.write(f"DTSTART:{when:%Y%m%d}T{minutes // 60:02d}{minutes % 60:02d}00\r\n")
+            file.write(f"SUMMARY:{rng.choice(COURSES)} section {i}\r\n")
+            file.write(f"LOCATION:{rng.choice(ROOMS).replace(',', chr(92) + ',')}\r\n")
+            if rng.random() < 0.3:
+                file.write(f"RRULE:FREQ=WEEKLY;INTERVAL={rng.choice((1, 2))};BYDAY=MO,WE\r\n")
+            file.write("END:VEVENT\r\n")
+        file.write("END:VCALENDAR\r\n")
+
+
+def write_csv(path, rng):
+    monday = date.today() - timedelta(days=date.today().weekday())
+    with open(path, 'w', newline='') as file:
+        file.write("description,time,date,day,location,permanent\n")
+        for i in range(EVENT_COUNT):
+            time_text = format_time(rng.randrange(7 * 60, 21 * 60, 5))
+            if rng.random() < 0.3:
+                file.write(f"{rng.choice(COURSES)} {i},{time_text},,{rng.choice(DAYS)},Hall A,yes\n")
+            else:
+                when = monday + timedelta(days=rng.randrange(-60, 60))
+                file.write(f"{rng.choice(COURSES)} {i},{time_text},{when.isoformat()},,,\n")
+
+
+def existing_schedule(rng):
+    tasks = {day: [] for day in DAYS}
+    for i in range(EXISTING):
+        tasks[rng.choice(DAYS)].append(Task(f"Existing {i}", format_time(rng.randrange(24 * 60))))
+    return {day: DaySchedule(day_tasks) for day, day_tasks in tasks.items()}
+
+
+def run(path, directory):
+    tasks = existing_schedule(random.Random(1))
+    target = os.path.join(directory, f"tasks-{os.path.basename(path)}.json")
+    backend = storage.open_storage('journal', target)
+    backend.load()
+    backend.save(tasks)
+
+    start = time.perf_counter()
+    plan = importer.plan_import(tasks, importer.read_file(path))
+    planned = time.perf_counter()
+    plan.preview()
+    changes = importer.apply_plan(tasks, plan)
+    backend.save(tasks, changes)
+    done = time.perf_counter()
+
+    backend.close()
+    reloaded = storage.open_storage('journal', target)
+    loaded = reloaded.load()
+    assert all([task.id for task in loaded[day]] == [task.id for task in tasks[day]] for day in DAYS)
+    reloaded.close()
+    print(f"{os.path.basename(path):<14} {len(changes):>6} tasks  "
+          f"read+plan {planned - start:6.3f} s  apply+save {done - planned:6.3f} s  "
+          f"total {done - start:6.3f} s")
+
+
+def main():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        ics = os.path.join(directory, 'schedule.ics')
+        csv_path = os.path.join(directory, 'schedule.csv')
+        write_ics(ics, rng)
+        write_csv(csv_path, rng)
+        run(ics, directory)
+        run(csv_path, directory)
+
+
+if __name__ == '__main__':
+    main()
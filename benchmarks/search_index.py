@@ -0,0 +1,66 @@
+"""Measure search index build time and query latency at 100k tasks.
+
+Run from the repository root:
+
+    python benchmarks/search_index.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import SearchIndex
+from task_model import DAYS, DaySchedule, Task, format_time
+
+TASK_COUNT = 100_000
+REPEATS = 200
+COMMON = ['call', 'email', 'meeting', 'review', 'gym', 'lunch', 'pay', 'buy',
+          'write', 'read', 'plan', 'team', 'report', 'groceries', 'dentist']
+QUERIES = ['dentist', 'meet', 'team review', 'zorvak', 'pay bills', 're', 'xyzzy']
+
+
+def vocabulary(rng, size):
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'zor', 'bel', 'dra', 'qui']
+    words = {''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(size)}
+    return sorted(words) + ['zorvak', 'bills']
+
+
+def build_schedule(rng):
+    words = vocabulary(rng, 20_000)
+    tasks = {day: [] for day in DAYS}
+    for _ in range(TASK_COUNT):
+        description = ' '.join([rng.choice(COMMON)] + rng.sample(words, rng.randint(1, 4)))
+        task = Task(description, format_time(rng.randrange(24 * 60)))
+        tasks[rng.choice(DAYS)].append(task)
+    return {day: DaySchedule(day_tasks) for day, day_tasks in tasks.items()}
+
+
+def main():
+    tasks = build_schedule(random.Random(0))
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.rebuild(tasks)
+    len(index)  # the build itself runs on first use
+    print(f"build        {time.perf_counter() - start:8.3f} s for {TASK_COUNT:,} tasks")
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            results = index.search(query)
+        elapsed = (time.perf_counter() - start) / REPEATS
+        print(f"{query!r:<14} {elapsed * 1000:8.3f} ms  ({len(results)} shown)")
+
+    day, task = DAYS[0], Task("zorvak follow up", "09:00 AM")
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        index.add(day, task)
+        index.remove(task)
+    elapsed = (time.perf_counter() - start) / REPEATS
+    print(f"add+remove   {elapsed * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
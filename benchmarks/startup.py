@@ -0,0 +1,72 @@
+"""Measure time to first paint of MainWindow under the offscreen Qt platform.
+
+Each run starts a fresh interpreter in a scratch directory holding a copy of
+tasks.json, so imports and the schedule load are included. Run from the
+repository root:
+
+    python benchmarks/startup.py [runs]
+
+``--eager`` builds every tab before showing the window, which is how
+startup worked before tabs were built on first use.
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import time
+start = time.perf_counter()
+import sys
+sys.path.insert(0, sys.argv[1])
+from PyQt5.QtCore import QEvent, QObject
+from PyQt5.QtWidgets import QApplication
+import main
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            print(time.perf_counter() - start)
+            app.quit()
+        return False
+
+app = QApplication([])
+window = main.MainWindow()
+window.weather_client.base_url = 'http://127.0.0.1:9'  # Never leave the machine
+if sys.argv[2] == 'eager':
+    for index in range(window.tabs.count()):
+        window.build_tab(index)
+painter = FirstPaint()
+window.tabs.currentWidget().installEventFilter(painter)
+window.show()
+app.exec_()
+window.close()
+"""
+
+
+def time_to_first_paint(mode, directory):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, REPO, mode],
+        cwd=directory, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 5
+    modes = ['lazy', 'eager'] if '--eager' in sys.argv else ['lazy']
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copy(os.path.join(REPO, 'tasks.json'), directory)
+        for mode in modes:
+            times = [time_to_first_paint(mode, directory) for _ in range(runs)]
+            print(f"{mode:<6} median {statistics.median(times) * 1e3:7.1f}ms "
+                  f"min {min(times) * 1e3:7.1f}ms over {runs} runs")
+
+
+if __name__ == '__main__':
+    main()
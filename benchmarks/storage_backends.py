@@ -0,0 +1,85 @@
+"""Compare the JSON, journal and SQLite storage backends.
+
+Run from the repository root:
+
+    python benchmarks/storage_backends.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage
+from task_model import DAYS, DaySchedule, Task, format_time
+
+SIZES = (10_000, 100_000)
+TOGGLES = 200
+
+
+def build_schedule(count):
+    rng = random.Random(count)
+    tasks = {day: [] for day in DAYS}
+    for i in range(count):
+        task = Task(f"Task {i}", format_time(rng.randrange(24 * 60)), rng.random() < 0.3)
+        tasks[rng.choice(DAYS)].append(task)
+    return {day: DaySchedule(day_tasks) for day, day_tasks in tasks.items()}
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def toggle_cost(backend, tasks):
+    """Average seconds per single-task completion toggle."""
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(TOGGLES):
+        day = rng.choice(DAYS)
+        row = rng.randrange(len(tasks[day]))
+        task = tasks[day][row]
+        task.completed = not task.completed
+        backend.save(tasks, [storage.updated(day, row, task)])
+    return (time.perf_counter() - start) / TOGGLES
+
+
+def run(count, directory):
+    tasks = build_schedule(count)
+    today = DAYS[0]
+    results = []
+    for name in ('json', 'journal', 'sqlite'):
+        path = os.path.join(directory, f"{name}-{count}" + ('.db' if name == 'sqlite' else '.json'))
+        backend = storage.open_storage(name, path)
+        backend.load()
+        save = timed(lambda: backend.save(tasks))
+        backend.close()
+
+        backend = storage.open_storage(name, path)
+        load = timed(backend.load)
+        toggle = toggle_cost(backend, tasks)
+        if name == 'sqlite':
+            day = timed(lambda: backend.day_tasks(today))
+        else:
+            day = timed(lambda: backend.load()[today])
+        backend.close()
+        results.append((name, save, load, toggle, day))
+
+    print(f"\n{count:,} tasks")
+    print(f"{'backend':<10}{'full save':>12}{'load':>12}{'toggle':>12}{'one day':>12}")
+    for name, save, load, toggle, day in results:
+        print(f"{name:<10}{save * 1e3:>10.1f}ms{load * 1e3:>10.1f}ms"
+              f"{toggle * 1e3:>10.3f}ms{day * 1e3:>10.1f}ms")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for count in SIZES:
+            run(count, directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Measure the memory held per Task at 100k tasks.
+
+Run from the repository root:
+
+    python benchmarks/task_memory.py
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_model import DAYS, Task
+
+TASK_COUNT = 100_000
+
+
+class LegacyTask:
+    """The Task layout before __slots__, kept here for comparison."""
+
+    def __init__(self, description, time, is_permanent=False, completed=False):
+        self.description = description
+        self.time = time
+        self.is_permanent = is_permanent
+        self.completed = completed
+        self.day_task_layout = None
+        self.day_task_widget = None
+        self.tasks = {day: [] for day in DAYS}
+
+
+def bytes_per_task(task_class, descriptions, times):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [task_class(descriptions[i], times[i]) for i in range(TASK_COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tasks
+    return (after - before) / TASK_COUNT
+
+
+def main():
+    # Build the inputs up front so their strings are not counted per task.
+    descriptions = [f"Task {i}" for i in range(TASK_COUNT)]
+    times = [f"{(i % 12) + 1:02d}:{i % 60:02d} {'AM' if i % 2 else 'PM'}" for i in range(TASK_COUNT)]
+
+    for task_class in (LegacyTask, Task):
+        size = bytes_per_task(task_class, descriptions, times)
+        print(f"{task_class.__name__:<12} {size:8.1f} bytes/task at {TASK_COUNT:,} tasks")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Measure conflict checks and free-slot queries on a dense 100k-task week.
+
+Run from the repository root:
+
+    python benchmarks/time_ranges.py
+"""
+from datetime import date, timedelta
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import recurrence
+from task_model import DAYS, DaySchedule, Recurrence, Task, format_time
+
+TASK_COUNT = 100_000
+REPEATS = 200
+
+
+def build_schedule(rng, monday):
+    tasks = {day: [] for day in DAYS}
+    for i in range(TASK_COUNT):
+        offset = rng.randrange(7)
+        start = rng.randrange(6 * 60, 22 * 60)
+        end = format_time(min(start + rng.choice((30, 50, 75, 90, 165)), 24 * 60 - 1))
+        if rng.random() < 0.05:
+            task = Task(f"Class {i}", format_time(start), True, rule=Recurrence(rng.choice((1, 2))), end=end)
+        else:
+            when = monday + timedelta(days=offset + 7 * rng.randrange(-26, 26))
+            task = Task(f"Task {i}", format_time(start), date=when, end=end)
+        tasks[DAYS[offset]].append(task)
+    return {day: DaySchedule(day_tasks) for day, day_tasks in tasks.items()}
+
+
+def main():
+    rng = random.Random(0)
+    monday = recurrence.week_start(date.today())
+    start = time.perf_counter()
+    tasks = build_schedule(rng, monday)
+    print(f"build        {time.perf_counter() - start:8.3f} s for {TASK_COUNT:,} tasks")
+
+    probes = [(DAYS[offset], Task("Probe", format_time(rng.randrange(6 * 60, 21 * 60)),
+                                  date=monday + timedelta(days=offset), end="11:59 PM"))
+              for offset in rng.choices(range(7), k=REPEATS)]
+    start = time.perf_counter()
+    found = sum(len(tasks[day].conflicts(task)) for day, task in probes)
+    elapsed = (time.perf_counter() - start) / REPEATS
+    print(f"conflicts    {elapsed * 1000:8.3f} ms per dated task ({found / REPEATS:.0f} overlaps)")
+
+    # One all-day range on a crowded date must not turn every check there
+    # into a scan of the whole date.
+    crowded = DaySchedule(Task(f"Slot {i}", format_time(start), date=monday, end=format_time(start + 1))
+                          for i, start in enumerate(rng.choices(range(6 * 60, 22 * 60), k=20_000)))
+    crowded.insert(Task("All day", "12:00 AM", date=monday, end="11:59 PM"))
+    short = [Task("Probe", format_time(start), date=monday, end=format_time(start + 1))
+             for start in rng.choices(range(6 * 60, 21 * 60), k=REPEATS)]
+    start = time.perf_counter()
+    found = sum(len(crowded.conflicts(task)) for task in short)
+    elapsed = (time.perf_counter() - start) / REPEATS
+    print(f"conflicts    {elapsed * 1000:8.3f} ms per dated task on a crowded date with an all-day task "
+          f"({found / REPEATS:.0f} overlaps)")
+
+    weekly = [(day, Task("Probe", "09:00 AM", True, rule=Recurrence(2, monday), end="10:30 AM"))
+              for day in DAYS]
+    start = time.perf_counter()
+    for _ in range(REPEATS // 10):
+        for day, task in weekly:
+            tasks[day].conflicts(task)
+    elapsed = (time.perf_counter() - start) / (REPEATS // 10 * len(weekly))
+    print(f"conflicts    {elapsed * 1000:8.3f} ms per biweekly task")
+
+    for length in (30, 90, 180):
+        start = time.perf_counter()
+        for _ in range(REPEATS // 10):
+            slots = [next(tasks[day].free(when, length), None)
+                     for day, when in recurrence.week_dates(monday).items()]
+        elapsed = (time.perf_counter() - start) / (REPEATS // 10)
+        print(f"free {length:>3} min {elapsed * 1000:8.3f} ms per week "
+              f"({sum(slot is not None for slot in slots)} days with room)")
+
+
+if __name__ == '__main__':
+    main()
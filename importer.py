@@ -0,0 +1,377 @@
+"""Bulk import of class schedules from iCalendar (.ics) and CSV files.
+
+Files are read as a stream: :func:`read_ics` and :func:`read_csv` are
+generators of :class:`Entry` records, one per task or per unusable row, so
+a large file is never held in memory as a whole. :func:`plan_import` turns
+them into an :class:`ImportPlan` that can be previewed as a diff, and
+:func:`apply_plan` inserts every new task in one batch and returns the
+change records for a single save.
+
+Weekly recurring events become permanent tasks with a Recurrence rule; other
+events become one-off tasks on their date. iCalendar times are read as
+local wall-clock times, except UTC times which are converted to local.
+
+CSV files need a header row. ``description`` and ``time`` are required, plus
+a ``date`` (YYYY-MM-DD or MM/DD/YYYY) and/or a ``day`` name. Optional columns
+are ``end``, ``location``, ``permanent`` (yes/no), ``repeat`` (weeks) and
+``until``.
+"""
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+import csv
+import os
+import re
+
+import storage
+from task_model import DAYS, Recurrence, Task, format_time
+
+Entry = namedtuple('Entry', 'line day task error')
+
+ICS_DURATION = re.compile(r'^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:\d+S)?)?$')
+ICS_DAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+CLOCK = re.compile(r'^\s*(\d{1,2})(?::(\d{2}))?\s*([ap])\.?m?\.?\s*$|^\s*(\d{1,2}):(\d{2})\s*$', re.IGNORECASE)
+TRUE = {'1', 'y', 'yes', 'true', 'x'}
+
+
+def read_file(path):
+    """Pick the reader for ``path`` by its extension."""
+    if path.lower().endswith(('.ics', '.ical', '.ifb')):
+        return read_ics(path)
+    if path.lower().endswith('.csv'):
+        return read_csv(path)
+    raise ValueError(f"unsupported schedule file: {os.path.basename(path)}")
+
+
+# iCalendar
+
+def _unfolded(file):
+    """Yield ``(line number, logical line)``, joining folded continuation lines."""
+    pending, start = None, 0
+    for number, line in enumerate(file, 1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield start, pending
+        pending, start = line, number
+    if pending is not None:
+        yield start, pending
+
+
+def _property(line):
+    """Split ``NAME;PARAM=x:value`` into ``(NAME, {PARAM: x}, value)``."""
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ':' and not quoted:
+            head, value = line[:index], line[index + 1:]
+            break
+    else:
+        return None, {}, ''
+    name, *params = head.split(';')
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition('=')
+        parameters[key.upper()] = param_value.strip('"')
+    return name.upper(), parameters, value
+
+
+def _text(value):
+    return (value.replace('\\n', ' ').replace('\\N', ' ').replace('\\,', ',')
+            .replace('\\;', ';').replace('\\\\', '\\').strip())
+
+
+def _ics_datetime(value, params):
+    """Return ``(date, minutes)``; all-day values start at midnight."""
+    value = value.strip()
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8])), 0
+    moment = datetime(int(value[:4]), int(value[4:6]), int(value[6:8]),
+                      int(value[9:11]), int(value[11:13]))
+    if value.endswith('Z'):
+        moment = moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return moment.date(), moment.hour * 60 + moment.minute
+
+
+def _ics_end(event, start, minutes):
+    """Return the event's end time as minutes, capped at the end of its start day, or None."""
+    if 'DTEND' in event:
+        end_date, end = _ics_datetime(*event['DTEND'])
+        end += (end_date - start).days * 24 * 60
+    elif 'DURATION' in event:
+        match = ICS_DURATION.match(event['DURATION'][0].strip().lstrip('+'))
+        if match is None:
+            return None
+        weeks, days, hours, mins = (int(part or 0) for part in match.groups())
+        end = minutes + ((weeks * 7 + days) * 24 + hours) * 60 + mins
+    else:
+        return None
+    end = min(end, 24 * 60 - 1)
+    return end if end > minutes else None
+
+
+def _ics_rule(value, start):
+    """Return ``(interval, weekdays, until)`` for an RRULE ``value`` of an
+    event starting on ``start``; raise ValueError if it cannot be used."""
+    rule = dict(part.partition('=')[::2] for part in value.upper().split(';') if part)
+    try:
+        interval = int(rule.get('INTERVAL', 1))
+    except ValueError:
+        raise ValueError(f"unreadable repeat interval {rule['INTERVAL']!r}") from None
+    if interval < 1:
+        raise ValueError(f"repeat interval must be at least 1, not {interval}")
+    frequency = rule.get('FREQ')
+    if frequency == 'DAILY' and interval == 1:
+        weekdays = list(range(7))
+    elif frequency == 'WEEKLY' and 'BYDAY' in rule:
+        # Ordinal prefixes such as 1MO mean nothing in a weekly rule.
+        codes = [code.strip()[-2:] for code in rule['BYDAY'].split(',')]
+        for code in codes:
+            if code not in ICS_DAYS:
+                raise ValueError(f"unknown weekday {code!r} in repeat rule")
+        weekdays = sorted({ICS_DAYS[code] for code in codes})
+    elif frequency == 'WEEKLY':
+        weekdays = [start.weekday()]
+    else:
+        raise ValueError(f"unsupported repeat rule {value!r}")
+
+    try:
+        until = _ics_datetime(rule['UNTIL'], {})[0] if 'UNTIL' in rule else None
+    except (ValueError, IndexError):
+        raise ValueError(f"unreadable repeat end {rule['UNTIL']!r}") from None
+    if 'COUNT' in rule:
+        try:
+            count = int(rule['COUNT'])
+        except ValueError:
+            raise ValueError(f"unreadable repeat count {rule['COUNT']!r}") from None
+        if count < 1:
+            raise ValueError(f"repeat count must be at least 1, not {count}")
+        # The COUNT-th date across the weekdays: each repeat period holds
+        # one occurrence of every weekday, in the order of their first dates.
+        firsts = sorted(start + timedelta(days=(weekday - start.weekday()) % 7) for weekday in weekdays)
+        periods, position = divmod(count - 1, len(firsts))
+        until = firsts[position] + timedelta(weeks=periods * interval)
+    return interval, weekdays, until
+
+
+def _ics_exceptions(exdates):
+    """Return the dates of ``(value, params)`` EXDATE properties as a set."""
+    exceptions = set()
+    for value, params in exdates:
+        try:
+            exceptions.update(_ics_datetime(item, params)[0] for item in value.split(','))
+        except (ValueError, IndexError):
+            raise ValueError(f"unreadable excluded date {value!r}") from None
+    return exceptions
+
+
+def _event_entries(line, event):
+    if event.get('STATUS', ('', {}))[0].upper() == 'CANCELLED':
+        return
+    if 'DTSTART' not in event or 'SUMMARY' not in event:
+        yield Entry(line, None, None, "event has no start or summary")
+        return
+    try:
+        start, minutes = _ics_datetime(*event['DTSTART'])
+        end = _ics_end(event, start, minutes)
+    except (ValueError, IndexError):
+        yield Entry(line, None, None, f"unreadable start or end {event['DTSTART'][0]!r}")
+        return
+    description = _text(event['SUMMARY'][0])
+    location = _text(event['LOCATION'][0]) if 'LOCATION' in event else ''
+    time = format_time(minutes)
+    end = format_time(end) if end is not None else None
+
+    if 'RRULE' not in event:
+        task = Task(description, time, date=start, end=end, location=location)
+        yield Entry(line, DAYS[start.weekday()], task, None)
+        return
+
+    try:
+        interval, weekdays, until = _ics_rule(event['RRULE'][0], start)
+        exceptions = _ics_exceptions(event.get('EXDATE', ()))
+    except ValueError as e:
+        yield Entry(line, None, None, str(e))
+        return
+
+    for weekday in weekdays:
+        first = start + timedelta(days=(weekday - start.weekday()) % 7)
+        if until is not None and first > until:
+            continue  # COUNT ran out before this weekday came round
+        recurrence = Recurrence(interval, first, until,
+                                (when for when in exceptions if when.weekday() == weekday))
+        task = Task(description, time, True, rule=recurrence, end=end, location=location)
+        yield Entry(line, DAYS[weekday], task, None)
+
+
+def read_ics(path):
+    """Yield an Entry per task described by the VEVENTs of an iCalendar file."""
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as file:
+        event, start = None, 0
+        for number, line in _unfolded(file):
+            name, params, value = _property(line)
+            if name == 'BEGIN' and value.upper() == 'VEVENT':
+                event, start = {}, number
+            elif name == 'END' and value.upper() == 'VEVENT' and event is not None:
+                yield from _event_entries(start, event)
+                event = None
+            elif event is not None and name:
+                if name == 'EXDATE':
+                    event.setdefault(name, []).append((value, params))
+                else:
+                    event.setdefault(name, (value, params))
+
+
+# CSV
+
+def _clock(text, cache={}):
+    # Class schedules reuse a handful of times, so each distinct string is
+    # parsed once per run.
+    minutes = cache.get(text)
+    if minutes is None:
+        match = CLOCK.match(text)
+        if match is None:
+            raise ValueError(f"unreadable time {text!r}")
+        if match.group(1) is not None:
+            hour, minute = int(match.group(1)), int(match.group(2) or 0)
+            if not 1 <= hour <= 12:
+                raise ValueError(f"unreadable time {text!r}")
+            hour = hour % 12 + (12 if match.group(3).lower() == 'p' else 0)
+        else:
+            hour, minute = int(match.group(4)), int(match.group(5))
+        if hour > 23 or minute > 59:
+            raise ValueError(f"unreadable time {text!r}")
+        minutes = cache[text] = hour * 60 + minute
+    return minutes
+
+
+def _csv_date(text):
+    text = text.strip()
+    if not text:
+        return None
+    for pattern in ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y'):
+        try:
+            return datetime.strptime(text, pattern).date()
+        except ValueError:
+            pass
+    raise ValueError(f"unreadable date {text!r}")
+
+
+def _csv_repeat(text):
+    text = text.strip()
+    if not text:
+        return 1
+    try:
+        weeks = int(text)
+    except ValueError:
+        raise ValueError(f"unreadable repeat {text!r}") from None
+    if weeks < 1:
+        raise ValueError(f"repeat must be at least 1 week, not {weeks}")
+    return weeks
+
+
+def read_csv(path):
+    """Yield an Entry per row of a CSV schedule."""
+    with open(path, 'r', newline='', encoding='utf-8-sig') as file:
+        reader = csv.DictReader(file)
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or ()]
+        for row in reader:
+            line = reader.line_num
+            try:
+                description = (row.get('description') or '').strip()
+                if not description:
+                    raise ValueError("missing description")
+                location = (row.get('location') or '').strip()
+                time = format_time(_clock(row.get('time') or ''))
+                end = row.get('end') or ''
+                end = format_time(_clock(end)) if end.strip() else None
+                when = _csv_date(row.get('date') or '')
+                day = (row.get('day') or '').strip().capitalize()
+                if day and day not in DAYS:
+                    raise ValueError(f"unknown day {day!r}")
+                if when is not None:
+                    if day and day != DAYS[when.weekday()]:
+                        raise ValueError(f"{when.isoformat()} is not a {day}")
+                    day = DAYS[when.weekday()]
+                elif not day:
+                    raise ValueError("needs a date or a day")
+                permanent = (row.get('permanent') or '').strip().lower() in TRUE or when is None
+                if permanent:
+                    rule = Recurrence(_csv_repeat(row.get('repeat') or ''), when, _csv_date(row.get('until') or ''))
+                    task = Task(description, time, True, rule=rule, end=end, location=location)
+                else:
+                    task = Task(description, time, date=when, end=end, location=location)
+            except ValueError as e:
+                yield Entry(line, None, None, str(e))
+                continue
+            yield Entry(line, day, task, None)
+
+
+# Planning and applying
+
+class ImportPlan:
+    """What importing a file would change.
+
+    ``added`` holds ``(day, task)`` pairs not already scheduled,
+    ``duplicates`` the ones that are (or that repeat earlier rows), and
+    ``problems`` ``(line, message)`` pairs for rows that could not be read.
+    """
+
+    def __init__(self):
+        self.added = []
+        self.duplicates = []
+        self.problems = []
+
+    def summary(self):
+        return (f"{len(self.added)} new tasks, {len(self.duplicates)} already scheduled, "
+                f"{len(self.problems)} unreadable rows.")
+
+    def preview(self, limit=500):
+        """Return the plan as diff-style lines, at most ``limit`` of them."""
+        lines = []
+        for prefix, pairs in (('+', self.added), ('=', self.duplicates)):
+            for day, task in pairs:
+                if task.date is not None:
+                    when = task.date.isoformat()
+                elif task.rule.interval > 1:
+                    when = f"every {task.rule.interval} weeks"
+                else:
+                    when = "weekly"
+                lines.append(f"{prefix} {day} {task.span} - {task.title} ({when})")
+        lines.extend(f"! line {line}: {message}" for line, message in self.problems)
+        if len(lines) > limit:
+            lines[limit:] = [f"... {len(lines) - limit} more"]
+        return lines
+
+
+def plan_import(tasks, entries):
+    """Sort ``entries`` into an ImportPlan against the ``{day: DaySchedule}`` week."""
+    plan = ImportPlan()
+    seen = set()
+    for entry in entries:
+        if entry.error is not None:
+            plan.problems.append((entry.line, entry.error))
+            continue
+        key = (entry.day, entry.task.content_key())
+        if key in seen or tasks[entry.day].find_duplicate(entry.task) is not None:
+            plan.duplicates.append((entry.day, entry.task))
+            continue
+        seen.add(key)
+        plan.added.append((entry.day, entry.task))
+    return plan
+
+
+def apply_plan(tasks, plan):
+    """Insert every task in ``plan.added`` and return their change records."""
+    by_day = {}
+    for day, task in plan.added:
+        by_day.setdefault(day, []).append(task)
+    changes = []
+    for day, day_tasks in by_day.items():
+        # In row order, so replaying the records one by one rebuilds the
+        # same schedule.
+        for row, task in tasks[day].insert_many(day_tasks):
+            changes.append(storage.added(day, row, task))
+    return changes
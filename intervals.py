@@ -0,0 +1,205 @@
+"""Time-range index of one weekday's tasks, for conflict and free-time queries.
+
+Only tasks with an end time occupy a range. Ranges are grouped by the date
+they fall on, with weekly and legacy tasks in a group of their own, so a
+query only looks at tasks that can actually happen on the same date.
+"""
+from math import gcd
+import bisect
+import heapq
+
+
+def _week(when):
+    """Number of the Monday-based week holding ``when``."""
+    return (when.toordinal() - 1) // 7
+
+
+def may_share_date(a, b):
+    """Whether two undated tasks on the same weekday can fall on one date.
+
+    Exceptions are ignored, so this may say yes for two tasks that never
+    actually meet, but never says no for two that do.
+    """
+    if a.rule is None or b.rule is None:
+        return True
+    first, second = a.rule, b.rule
+    if first.until is not None and second.start is not None and first.until < second.start:
+        return False
+    if second.until is not None and first.start is not None and second.until < first.start:
+        return False
+    if first.start is None or second.start is None:
+        return True
+    # Weeks w = first.start (mod first.interval) = second.start (mod second.interval)
+    # exist exactly when the two starts agree modulo the gcd of the intervals.
+    return (_week(first.start) - _week(second.start)) % gcd(first.interval, second.interval) == 0
+
+
+class _Ranges:
+    """Ranges sorted by start, a tally of their lengths and a tree of their ends.
+
+    A range starting inside a query overlaps it, so those are one bisected
+    slice. Ranges starting before it overlap if they reach past its start;
+    they begin no earlier than the start minus the longest length present,
+    and when that window holds only a few ranges they are scanned.
+
+    One long range makes that window wide, so past ``SCAN`` ranges the
+    query walks ``ends`` instead: a binary tree over the minutes of the
+    day, stored sparsely by node number, where node 1 spans every minute,
+    node ``n`` splits into ``2n`` and ``2n + 1`` and the leaf for minute
+    ``m`` is ``LEAVES + m``. Each node holds the latest end of the ranges
+    starting within its span, and the walk only descends into spans that
+    reach past the query's start, so it costs O(log minutes) per range it
+    reports however long the others are.
+    """
+    __slots__ = ('starts', 'tasks', 'lengths', 'ends')
+
+    LEAVES = 2048  # A power of two past the last minute of a day
+    SCAN = 64
+
+    def __init__(self):
+        self.starts = []
+        self.tasks = []
+        self.lengths = {}
+        self.ends = {}
+
+    def add(self, task):
+        row = bisect.bisect_right(self.starts, task.minutes)
+        self.starts.insert(row, task.minutes)
+        self.tasks.insert(row, task)
+        length = task.end_minutes - task.minutes
+        self.lengths[length] = self.lengths.get(length, 0) + 1
+        self._update(task.minutes)
+
+    def remove(self, task):
+        row = bisect.bisect_left(self.starts, task.minutes)
+        while self.tasks[row] is not task:
+            row += 1
+        del self.starts[row]
+        del self.tasks[row]
+        length = task.end_minutes - task.minutes
+        self.lengths[length] -= 1
+        if not self.lengths[length]:
+            del self.lengths[length]
+        self._update(task.minutes)
+
+    def _update(self, minute):
+        # Recompute the leaf for ``minute`` and every span above it.
+        first = bisect.bisect_left(self.starts, minute)
+        last = bisect.bisect_right(self.starts, minute, first)
+        latest = max((task.end_minutes for task in self.tasks[first:last]), default=-1)
+        ends = self.ends
+        node = self.LEAVES + minute
+        while node:
+            if latest < 0:
+                ends.pop(node, None)
+            else:
+                ends[node] = latest
+            node //= 2
+            latest = max(ends.get(2 * node, -1), ends.get(2 * node + 1, -1))
+
+    def overlapping(self, start, end):
+        """Return the ranges overlapping ``[start, end)``, by start."""
+        starts, tasks = self.starts, self.tasks
+        if not starts:
+            return []
+        first = bisect.bisect_left(starts, start)
+        window = bisect.bisect_right(starts, start - max(self.lengths), 0, first)
+        if first - window <= self.SCAN:
+            found = [task for task in tasks[window:first] if task.end_minutes > start]
+        else:
+            found = self._reaching(start)
+        found.extend(tasks[first:bisect.bisect_left(starts, end, first)])
+        return found
+
+    def _reaching(self, start):
+        # The ranges starting before ``start`` and ending after it, by start.
+        starts, tasks, ends = self.starts, self.tasks, self.ends
+        found = []
+        stack = [(1, 0, self.LEAVES)] if ends.get(1, -1) > start else []
+        while stack:
+            node, low, high = stack.pop()
+            if high - low > 1:
+                middle = (low + high) // 2
+                if middle < start and ends.get(2 * node + 1, -1) > start:
+                    stack.append((2 * node + 1, middle, high))
+                if ends.get(2 * node, -1) > start:
+                    stack.append((2 * node, low, middle))
+                continue
+            if low >= start:
+                continue
+            first = bisect.bisect_left(starts, low)
+            found.extend(task for task in tasks[first:bisect.bisect_right(starts, low, first)]
+                         if task.end_minutes > start)
+        return found
+
+
+class IntervalIndex:
+    """The ranges of one weekday's tasks that have an end time."""
+
+    def __init__(self, tasks=()):
+        self._groups = {}
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        if task.end_minutes is not None:
+            group = self._groups.get(task.date)
+            if group is None:
+                group = self._groups[task.date] = _Ranges()
+            group.add(task)
+
+    def remove(self, task):
+        if task.end_minutes is not None:
+            group = self._groups[task.date]
+            group.remove(task)
+            if not group.starts:
+                del self._groups[task.date]
+
+    def conflicts(self, task):
+        """Return the indexed tasks whose ranges overlap ``task`` on a shared date."""
+        if task.end_minutes is None:
+            return []
+        start, end = task.minutes, task.end_minutes
+        found = []
+        weekly = self._groups.get(None)
+        if task.date is not None:
+            dated = self._groups.get(task.date)
+            if dated is not None:
+                found.extend(other for other in dated.overlapping(start, end) if other is not task)
+            if weekly is not None:
+                found.extend(other for other in weekly.overlapping(start, end)
+                             if other is not task and other.occurs_on(task.date))
+        else:
+            # A weekly task can fall on any indexed date, so each is checked.
+            for when, group in self._groups.items():
+                if when is not None and task.occurs_on(when):
+                    found.extend(other for other in group.overlapping(start, end) if other is not task)
+            if weekly is not None:
+                found.extend(other for other in weekly.overlapping(start, end)
+                             if other is not task and may_share_date(task, other))
+        found.sort(key=lambda other: other.minutes)
+        return found
+
+    def busy(self, when):
+        """Yield ``(start, end)`` of every range occupied on date ``when``, by start."""
+        dated = self._groups.get(when)
+        weekly = self._groups.get(None)
+        streams = []
+        if dated is not None:
+            streams.append(zip(dated.starts, (task.end_minutes for task in dated.tasks)))
+        if weekly is not None:
+            streams.append((task.minutes, task.end_minutes) for task in weekly.tasks if task.occurs_on(when))
+        return heapq.merge(*streams)
+
+    def free(self, when, length, earliest=0, latest=24 * 60):
+        """Yield ``(start, end)`` gaps of at least ``length`` minutes on ``when``,
+        between ``earliest`` and ``latest``."""
+        cursor = earliest
+        for start, end in self.busy(when):
+            if start >= latest:
+                break
+            if start - cursor >= length:
+                yield cursor, start
+            cursor = max(cursor, end)
+        if latest - cursor >= length:
+            yield cursor, latest
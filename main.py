@@ -1,43 +1,627 @@
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QHBoxLayout, 
                              QFrame, QTabWidget, QVBoxLayout, QLabel, QComboBox, 
                              QLineEdit, QPushButton, QMessageBox, QTextEdit,
-                             QGridLayout, QTimeEdit, QCheckBox, QScrollArea)
-from PyQt5.QtCore import Qt, QTime
-from twilio.rest import Client  
-import requests
-from datetime import datetime, date, timezone  
-import calendar
+                             QGridLayout, QTimeEdit, QCheckBox, QScrollArea,
+                             QListView, QDateEdit, QSpinBox, QShortcut, QFileDialog)
+from PyQt5.QtCore import (Qt, QTime, QDate, QAbstractListModel, QIdentityProxyModel,
+                          QEvent, QFileSystemWatcher, QModelIndex, QObject, QStringListModel, QThread,
+                          QTimer, pyqtSignal)
+from PyQt5.QtGui import QColor, QFont, QKeySequence
+from datetime import datetime, date, timedelta
+import csv
 import sys
-import json
 import os
 
-class Task:
-    def __init__(self, description, time, is_permanent=False, completed=False):
-        self.description = description
-        self.time = time
-        self.is_permanent = is_permanent
-        self.completed = completed
-        self.day_task_layout = None
-        self.day_task_widget = None
-        self.tasks = {day: [] for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']}
-     
-
-    def to_dict(self):
-        return {
-            'description': self.description,
-            'time': self.time,
-            'is_permanent': self.is_permanent,
-            'completed': self.completed
-        }
+from task_model import DAYS, Task, DaySchedule, Recurrence, format_time
+import activity
+import archive
+import importer
+import messaging
+import profiling
+import recurrence
+import reminders
+import search
+import storage
+import sync
+import theme
+import weather
+
+# Set WORKFLOW_PROFILE=1 to record hot-path timings from startup; F12 toggles
+# them at runtime.
+PROFILE = os.environ.get('WORKFLOW_PROFILE') == '1'
+
+# Hours of the day "Find Free Slot" searches, as (first, last)
+FREE_SLOT_HOURS = (8, 22)
+
+class DayTaskModel(QAbstractListModel):
+    """List model exposing one DaySchedule to the Edit tab list, through
+    EditTaskProxyModel, or one date's occurrences to its Week tab column.
+
+    Mutations go through the model so the attached view only repaints the
+    rows that actually changed. A Week tab column also notes each task's
+    forecast once :meth:`set_forecast` gives it one.
+    """
+
+    def __init__(self, schedule=None, parent=None):
+        super().__init__(parent)
+        self._schedule = schedule if schedule is not None else DaySchedule()
+        self._when = None
+        self._forecast = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._schedule)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self._schedule[index.row()]
+        if role == Qt.DisplayRole:
+            text = f"{task.span}: {task.title}"
+            if self._forecast is not None:
+                reading = self._forecast.during(self._when, task.minutes, task.end_minutes)
+                if reading is not None:
+                    text += f"\n{weather.format_slot(reading)}"
+            return text
+        if role == Qt.ForegroundRole and task.is_permanent and not task.completed:
+            return QColor('#800080')
+        if role == Qt.FontRole and task.completed:
+            font = QFont()
+            font.setStrikeOut(True)
+            return font
+        return None
 
-    @classmethod
-    def from_dict(cls, data):
-        return cls(
-            description=data['description'],
-            time=data['time'],
-            is_permanent=data['is_permanent'],
-            completed=data['completed']
-        )
+    def task(self, index):
+        return self._schedule[index.row()]
+
+    def set_schedule(self, schedule):
+        self.beginResetModel()
+        self._schedule = schedule
+        self.endResetModel()
+
+    def set_forecast(self, forecast, when):
+        """Annotate every row with its slot in ``forecast`` on date ``when``."""
+        self._forecast, self._when = forecast, when
+        if self._schedule:
+            self.dataChanged.emit(self.index(0), self.index(len(self._schedule) - 1), [Qt.DisplayRole])
+
+    def insert_task(self, task):
+        row = self._schedule.insertion_point(task)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._schedule.insert(task, row)
+        self.endInsertRows()
+        return row
+
+    def remove_task(self, task):
+        row = self._schedule.index(task)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._schedule.pop(row)
+        self.endRemoveRows()
+        return row
+
+    def task_changed(self, task):
+        index = self.index(self._schedule.index(task))
+        self.dataChanged.emit(index, index)
+
+    def insert_row(self, row, schedule):
+        """Show ``schedule``: the current one with a task added at ``row``."""
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._schedule = schedule
+        self.endInsertRows()
+
+    def remove_row(self, row, schedule):
+        """Show ``schedule``: the current one without the task at ``row``."""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._schedule = schedule
+        self.endRemoveRows()
+
+class EditTaskProxyModel(QIdentityProxyModel):
+    """Presents a DayTaskModel as the Edit tab's checkable task list.
+
+    Ticking a row reports the task through ``completion_toggled`` instead of
+    editing it directly, so completion still goes through MainWindow.
+    """
+    completion_toggled = pyqtSignal(object, bool)
+
+    def task(self, index):
+        return self.sourceModel().task(self.mapToSource(index))
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemIsUserCheckable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            task = self.task(index)
+            text = f"{task.span} - {task.title}"
+            if task.date is not None:
+                text += f" ({task.date:%b %d, %Y})"
+            elif task.rule is not None and task.rule.interval > 1:
+                text += f" (every {task.rule.interval} weeks)"
+            return text
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.task(index).completed else Qt.Unchecked
+        return super().data(index, role)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        self.completion_toggled.emit(self.task(index), value == Qt.Checked)
+        return True
+
+class WeekPage(QWidget):
+    """One calendar week of the Week tab timeline: seven day columns.
+
+    Pages are recycled as the timeline scrolls, so :meth:`show_week` points
+    an existing page at another week rather than building new widgets.
+    """
+    COLUMN_SIZE = (360, 872)
+    SPACING = 5
+    # Past this many added and removed rows a column is reset instead.
+    MAX_ROW_UPDATES = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setSpacing(self.SPACING)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.start = None
+        self.dates = {}
+        self.labels = {}
+        self.models = {}
+        self.columns = {}
+
+        for day in DAYS:  # Columns in calendar order, Monday first
+            container = QWidget()
+            container.setObjectName("dayColumn")
+            container.setFixedSize(*self.COLUMN_SIZE)
+
+            box_layout = QVBoxLayout(container)
+            box_layout.setSpacing(5)
+            box_layout.setContentsMargins(5, 5, 5, 5)
+
+            day_label = QLabel(day)
+            day_label.setAlignment(Qt.AlignCenter)
+            day_label.setObjectName("dayLabel")
+            box_layout.addWidget(day_label)
+
+            # List view over the tasks happening on this column's date
+            model = DayTaskModel((), self)
+            view = QListView()
+            view.setModel(model)
+            view.setWordWrap(True)
+            view.setSelectionMode(QListView.NoSelection)
+            view.setFocusPolicy(Qt.NoFocus)
+            box_layout.addWidget(view)
+
+            self.labels[day] = day_label
+            self.models[day] = model
+            layout.addWidget(container)
+        self.resize(self.sizeHint())
+
+    def show_week(self, start, columns, forecast, today):
+        """Show the week beginning on Monday ``start`` with ``{day: tasks}`` columns."""
+        self.start = start
+        self.dates = recurrence.week_dates(start)
+        for day, when in self.dates.items():
+            label = self.labels[day]
+            label.setText(f"{day} {when.month}/{when.day}")
+            theme.set_state(label, today=when == today)
+            self.models[day].set_forecast(forecast, when)
+            self.set_column(day, columns[day])
+
+    def set_column(self, day, tasks):
+        self.columns[day] = tasks
+        self.models[day].set_schedule(tasks)
+
+    def rows_changed(self, day, column, tasks):
+        """Show ``column`` for ``day`` by removing and inserting only the rows
+        of ``tasks``, which were just added to or removed from the schedule."""
+        old = self.columns[day]
+        changed = {id(task) for task in tasks}
+        removed = [row for row, task in enumerate(old) if id(task) in changed]
+        added = [row for row, task in enumerate(column) if id(task) in changed]
+        if (len(removed) + len(added) > self.MAX_ROW_UPDATES
+                or [task for task in old if id(task) not in changed]
+                != [task for task in column if id(task) not in changed]):
+            self.set_column(day, column)
+            return
+        model = self.models[day]
+        for row in reversed(removed):
+            old = old[:row] + old[row + 1:]
+            model.remove_row(row, old)
+        for row in added:
+            old = old[:row] + (column[row],) + old[row:]
+            model.insert_row(row, old)
+        self.columns[day] = column
+
+    def set_forecast(self, forecast):
+        for day, model in self.models.items():
+            model.set_forecast(forecast, self.dates[day])
+
+    def set_today(self, previous, today):
+        # Only the columns gaining or losing the highlight are re-polished.
+        for day, when in self.dates.items():
+            if when in (previous, today):
+                theme.set_state(self.labels[day], today=when == today)
+
+    def tasks_changed(self, tasks):
+        """Repaint the rows of ``(day, task)`` pairs edited in place."""
+        shown = {}
+        for day, task in tasks:
+            if day not in shown:
+                shown[day] = set(self.columns.get(day, ()))
+            if task in shown[day]:
+                self.models[day].task_changed(task)
+
+class WeekTimeline(QScrollArea):
+    """The Week tab: calendar weeks side by side, scrolled horizontally.
+
+    It spans ``weeks_before`` weeks back and ``weeks_after`` ahead of the
+    week containing today, but only the weeks in view plus one on each side
+    exist as WeekPage widgets. A page scrolled out of that range goes back
+    to a pool and is reused for the next week that needs one. Once
+    scrolling settles, an idle timer fetches the columns of the weeks just
+    beyond, so they are ready by the time they are scrolled to.
+
+    ``column(when)`` returns the tasks shown for a date.
+    """
+
+    def __init__(self, column, forecast=None, weeks_before=52, weeks_after=52, parent=None):
+        super().__init__(parent)
+        self.column = column
+        self.forecast = forecast
+        self.today = date.today()
+        self.first = recurrence.week_start(self.today) - recurrence.WEEK * weeks_before
+        self.count = weeks_before + weeks_after + 1
+        self._pages = {}  # Week start -> materialized WeekPage
+        self._pool = []
+        self._prefetched = {}  # Week start -> {day: tasks} fetched while idle
+        self._pending = []
+
+        content = QWidget()
+        page = WeekPage(content)
+        self.page_width = page.width() + WeekPage.SPACING
+        content.setFixedSize(self.page_width * self.count, page.height())
+        page.hide()
+        self._pool.append(page)
+        self.setWidget(content)
+        self.setFrameShape(QFrame.NoFrame)
+
+        scroll_bar = self.horizontalScrollBar()
+        scroll_bar.setSingleStep(WeekPage.COLUMN_SIZE[0] + WeekPage.SPACING)
+        scroll_bar.setPageStep(self.page_width)
+        scroll_bar.valueChanged.connect(self.materialize)
+
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setInterval(0)  # Fires once the event queue is empty
+        self.prefetch_timer.timeout.connect(self.prefetch_next)
+
+    def week_at(self, index):
+        return self.first + recurrence.WEEK * index
+
+    def current_week(self):
+        """The Monday of the week in the middle of the view."""
+        middle = self.horizontalScrollBar().value() + self.viewport().width() // 2
+        return self.week_at(min(self.count - 1, middle // self.page_width))
+
+    def scroll_to(self, start):
+        index = max(0, min(self.count - 1, (start - self.first).days // 7))
+        # Centre the page when the view is wider than one.
+        offset = max(0, (self.viewport().width() - self.page_width) // 2)
+        self.horizontalScrollBar().setValue(index * self.page_width - offset)
+        self.materialize()
+
+    @profiling.timed('materialize_weeks')
+    def materialize(self):
+        left = self.horizontalScrollBar().value()
+        right = left + max(1, self.viewport().width())
+        first = max(0, left // self.page_width - 1)
+        last = min(self.count - 1, (right - 1) // self.page_width + 1)
+        wanted = {self.week_at(index): index for index in range(first, last + 1)}
+
+        for start in [start for start in self._pages if start not in wanted]:
+            page = self._pages.pop(start)
+            page.hide()
+            self._pool.append(page)
+        for start, index in wanted.items():
+            if start in self._pages:
+                continue
+            page = self._pool.pop() if self._pool else WeekPage(self.widget())
+            columns = self._prefetched.pop(start, None) or self.week_columns(start)
+            page.show_week(start, columns, self.forecast, self.today)
+            page.move(index * self.page_width, 0)
+            page.show()
+            self._pages[start] = page
+
+        self._pending = [self.week_at(index) for index in (last + 1, first - 1)
+                         if 0 <= index < self.count and self.week_at(index) not in self._prefetched]
+        if self._pending:
+            self.prefetch_timer.start()
+
+    def prefetch_next(self):
+        if not self._pending:
+            self.prefetch_timer.stop()
+            return
+        start = self._pending.pop(0)
+        # Keep only the neighbours of the current view.
+        if len(self._prefetched) >= 2:
+            self._prefetched.pop(next(iter(self._prefetched)))
+        self._prefetched[start] = self.week_columns(start)
+
+    def week_columns(self, start):
+        return {day: self.column(when) for day, when in recurrence.week_dates(start).items()}
+
+    def refresh(self):
+        """Refetch every materialized column, after the schedule was replaced."""
+        self._prefetched.clear()
+        for start, page in self._pages.items():
+            page.show_week(start, self.week_columns(start), self.forecast, self.today)
+        self.materialize()
+
+    def refresh_day(self, day):
+        """Refetch one weekday's columns, after its schedule changed."""
+        self._prefetched.clear()
+        for page in self._pages.values():
+            page.set_column(day, self.column(page.dates[day]))
+        self.materialize()
+
+    def rows_changed(self, rows):
+        """Insert or remove the rows of ``(day, task)`` pairs just added to
+        or removed from the schedule, in every column showing them."""
+        self._prefetched.clear()
+        changed = {}
+        for day, task in rows:
+            changed.setdefault(day, []).append(task)
+        for page in self._pages.values():
+            for day, tasks in changed.items():
+                page.rows_changed(day, self.column(page.dates[day]), tasks)
+        self.materialize()
+
+    def tasks_changed(self, tasks):
+        for page in self._pages.values():
+            page.tasks_changed(tasks)
+
+    def set_forecast(self, forecast):
+        self.forecast = forecast
+        for page in self._pages.values():
+            page.set_forecast(forecast)
+
+    def set_today(self, today):
+        """Move the today highlight after the date rolls over."""
+        previous, self.today = self.today, today
+        if previous == today:
+            return
+        for page in self._pages.values():
+            page.set_today(previous, today)
+        if recurrence.week_start(previous) != recurrence.week_start(today):
+            # Last week now also shows what was archived from it.
+            self.refresh()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.materialize()
+
+class WeatherWorker(QObject):
+    """Runs a WeatherClient request on a QThread and reports back by signal."""
+    finished = pyqtSignal(str)
+    failed = pyqtSignal()
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+
+    @profiling.timed('weather_request')
+    def run(self):
+        try:
+            text = weather.format_weather(self.client.current())
+        except Exception:
+            self.failed.emit()
+        else:
+            self.finished.emit(text)
+
+class ForecastWorker(QObject):
+    """Runs WeatherClient.forecast on a QThread and reports back by signal."""
+    finished = pyqtSignal(object)
+    failed = pyqtSignal()
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+
+    @profiling.timed('forecast_request')
+    def run(self):
+        try:
+            forecast = self.client.forecast()
+        except Exception:
+            self.failed.emit()
+        else:
+            self.finished.emit(forecast)
+
+class PerformanceOverlay(QLabel):
+    """Floating table of profiler stats, refreshed twice a second while shown."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setObjectName("perfOverlay")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+        self.note = None
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            self.note = None
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+
+    def refresh(self):
+        lines = profiling.profiler.summary()
+        if self.note:
+            lines.append(self.note)
+        self.setText('\n'.join(lines))
+        self.adjustSize()
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 20, parent.height() - self.height() - 20)
+
+
+class InteractionCapture(QObject):
+    """Runs cProfile over the next single mouse click or key press.
+
+    Profiling starts when the button or key goes down and stops once the
+    events queued by its release have been handled.
+    """
+    captured = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.recording = False
+
+    def arm(self):
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        kind = event.type()
+        if not self.recording and kind in (QEvent.MouseButtonPress, QEvent.KeyPress):
+            self.recording = True
+            profiling.profiler.start_capture()
+        elif self.recording and kind in (QEvent.MouseButtonRelease, QEvent.KeyRelease):
+            QApplication.instance().removeEventFilter(self)
+            QTimer.singleShot(0, self.finish)
+        return False
+
+    def finish(self):
+        self.recording = False
+        path = profiling.profiler.stop_capture()
+        if path is not None:
+            self.captured.emit(path)
+
+
+class ChangeBus(QObject):
+    """Coalesces schedule changes into one refresh and one save.
+
+    Handlers report each mutation with :meth:`mark`. Days to show afresh,
+    tasks added or removed, and tasks that only changed in place are
+    published together through ``changed`` once control returns to the
+    event loop, however many changes were marked in that turn. Change records are held until
+    no change has been marked for ``save_delay`` milliseconds and are then
+    written by a single call to ``save``; :meth:`flush` writes them at once.
+    """
+    changed = pyqtSignal(object, object, object)  # {day}, [(day, task)] added or removed, [(day, task)]
+
+    def __init__(self, save, save_delay=1000, parent=None):
+        super().__init__(parent)
+        self._save = save
+        self._days = set()
+        self._rows = []
+        self._tasks = []
+        self._records = []
+        self._full = False
+        self._publish_timer = QTimer(self)
+        self._publish_timer.setSingleShot(True)
+        self._publish_timer.setInterval(0)
+        self._publish_timer.timeout.connect(self.publish)
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(save_delay)
+        self._save_timer.timeout.connect(self.flush)
+
+    def mark(self, days=(), records=None, tasks=(), rows=()):
+        """Note a change to be saved and shown.
+
+        ``days`` changed in ways that need their occurrences expanded again,
+        ``rows`` holds ``(day, task)`` pairs added or removed, ``tasks`` holds
+        ``(day, task)`` pairs edited in place, and ``records`` are the
+        storage change records; None means the whole schedule must be saved.
+        """
+        if records is None:
+            self._full = True
+            self._records = []
+        elif not self._full:
+            self._records.extend(records)
+        self._save_timer.start()  # Restarted by every change
+        self._days.update(days)
+        self._rows.extend(rows)
+        self._tasks.extend(tasks)
+        if (self._days or self._rows or self._tasks) and not self._publish_timer.isActive():
+            self._publish_timer.start()
+
+    def pending(self):
+        return self._full or bool(self._records)
+
+    def discard(self):
+        """Forget unsaved change records, once storage already reflects them."""
+        self._save_timer.stop()
+        self._full, self._records = False, []
+
+    def publish(self):
+        self._publish_timer.stop()
+        days, rows, tasks = self._days, self._rows, self._tasks
+        self._days, self._rows, self._tasks = set(), [], []
+        if days or rows or tasks:
+            self.changed.emit(days, rows, tasks)
+
+    def flush(self):
+        """Save everything marked so far, now."""
+        self._save_timer.stop()
+        if not self.pending():
+            return
+        records = () if self._full else self._records
+        self._full, self._records = False, []
+        self._save(*records)
+
+
+class StorageWatcher(QObject):
+    """Notices when another process writes to the schedule's storage files.
+
+    A file replaced by a rename, as atomic saves do, drops out of a
+    QFileSystemWatcher, so the files' directories are watched as well and
+    the files are re-added after every notification. A burst of
+    notifications leads to one check, ``delay`` milliseconds after the
+    last; ``changed`` is emitted only if the files differ from what the
+    SyncState last recorded, which our own saves keep current.
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, state, delay=200, parent=None):
+        super().__init__(parent)
+        self.state = state
+        self._paths = [os.path.abspath(path) for path in state.paths]
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.addPaths(sorted({os.path.dirname(path) for path in self._paths}))
+        self._watcher.fileChanged.connect(self._schedule_check)
+        self._watcher.directoryChanged.connect(self._schedule_check)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self.check)
+        self._watch_files()
+
+    def _watch_files(self):
+        watched = set(self._watcher.files())
+        missing = [path for path in self._paths if path not in watched and os.path.exists(path)]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _schedule_check(self, path):
+        self._timer.start()
+
+    def check(self):
+        self._watch_files()
+        if self.state.stale():
+            self.changed.emit()
+
+
+class MessageStatusRelay(QObject):
+    """Carries MessageQueue status callbacks from its worker to the GUI thread."""
+    status_changed = pyqtSignal(int, str, str)
 
 class CustomTabWidget(QTabWidget):
     def __init__(self):
@@ -46,74 +630,120 @@ class CustomTabWidget(QTabWidget):
         self.day_task_widget = None
         self.tasks = {day: [] for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']}
 
-        today = date.today()
+        self.date_label = QLabel()
+        self.date_label.setObjectName("dateLabel")
+        self.set_date(date.today())
+        self.setCornerWidget(self.date_label, Qt.TopRightCorner)
+
+    def set_date(self, today):
         date_numeric = today.strftime("%m/%d/%Y")
         date_spelled = today.strftime("%B %d, %Y")
-        self.date_label = QLabel(f"{date_numeric} ({date_spelled})")
-        self.date_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-family: 'Segoe UI', 'Arial', sans-serif;
-                font-size: 10pt;
-                padding: 8px 20px;
-            }
-        """)
-        self.setCornerWidget(self.date_label, Qt.TopRightCorner)
+        self.date_label.setText(f"{date_numeric} ({date_spelled})")
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.day_task_layout = None
         self.day_task_widget = None
-        self.tasks = {day: [] for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']}
+        self.search_input = None
+        # Reminders and resent outbox messages report status before the Day
+        # tab, which shows it, may have been built.
+        self.message_status = ""
+        self.message_status_label = None
+        profiling.profiler.enabled = PROFILE
+        self.storage = storage.open_storage()
+        self.weather_client = weather.WeatherClient()
+        self.weather_thread = None
+        # Works offline from the last forecast fetched; refreshed below.
+        self.forecast = self.weather_client.cached_forecast()
+        self.forecast_thread = None
+        self.forecast_timer = QTimer(self)
+        self.forecast_timer.timeout.connect(self.refresh_forecast)
+        self.message_relay = MessageStatusRelay()
+        self.message_relay.status_changed.connect(self.show_message_status)
+        self.message_queue = messaging.MessageQueue(
+            messaging.TwilioTransport(), on_status=self.message_relay.status_changed.emit)
+        self.activity = activity.ActivityLog()
+        self.activity.import_legacy('activity_log.txt')
+        self.archive = archive.TaskArchive()
+        self.reminders = reminders.ReminderSchedule()
+        # A `workflow daemon` may be sending them instead.
+        self.reminder_sender = reminders.SenderLock()
+        self.reminder_timer = QTimer(self)
+        self.reminder_timer.setSingleShot(True)
+        self.reminder_timer.timeout.connect(self.send_due_reminders)
+        self.rollover_timer = QTimer(self)
+        self.rollover_timer.setSingleShot(True)
+        self.rollover_timer.timeout.connect(self.roll_over_day)
+        self.search_index = search.SearchIndex()
+        # Indexes a loaded schedule in short slices while the window is idle.
+        self.index_timer = QTimer(self)
+        self.index_timer.timeout.connect(self.build_search_index)
+        self.occurrences = recurrence.OccurrenceCache()
+        self.search_results = []
+        self.changes = ChangeBus(self.save_tasks, parent=self)
+        # (day, row, task) taken out by Edit and not yet added back
+        self.editing = None
+        self.sync_state = sync.SyncState(self.storage)
+        # Initialize task storage
+        self.tasks = {day: DaySchedule() for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']}
         self.load_tasks()
         self.setWindowTitle("WorkFlow")
         self.tabs = CustomTabWidget()
         self.setCentralWidget(self.tabs)
-        
-        # Initialize task storage
-        self.tasks = {day: [] for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']}
-        self.load_tasks()
 
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: black;
-            }
-            QTabWidget::pane {
-                border: 1px solid white;
-                background-color: black;
-            }
-            QTabWidget::tab-bar {
-                left: 0px;
-            }
-            QTabBar::tab {
-                background-color: #333333;
-                color: white;
-                padding: 8px 20px;
-                margin-right: 2px;
-            }
-            QTabBar::tab:selected {
-                background-color: #90d5ff;
-                border: 1px solid white;
-            }
-        """)
+        self.setStyleSheet(theme.STYLESHEET)
         self.setMinimumSize(2560, 872)
 
         self.create_tabs()
+        self.changes.changed.connect(self.show_changes)
+        self.storage_watcher = StorageWatcher(self.sync_state, parent=self)
+        self.storage_watcher.changed.connect(self.sync_external_changes)
+        self.forecast_timer.start(self.weather_client.forecast_ttl * 1000)
+        QTimer.singleShot(0, self.refresh_forecast)
+        self.arm_rollover_timer()
+
+        # Profiling: F12 shows the stats overlay and records while it is up,
+        # Ctrl+Shift+D writes the stats to a file, Ctrl+Shift+P runs cProfile
+        # over the next click or key press.
+        self.perf_overlay = PerformanceOverlay(self)
+        self.interaction_capture = InteractionCapture(self)
+        self.interaction_capture.captured.connect(
+            lambda path: self.show_profiling_note(f"cProfile capture written to {path}"))
+        QShortcut(QKeySequence("F12"), self, self.toggle_profiling)
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self,
+                  lambda: self.show_profiling_note(f"Stats written to {profiling.profiler.dump()}"))
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, self.interaction_capture.arm)
 
     def create_tabs(self):
         self.edit_tab = QWidget()
         self.week_tab = QWidget()
         self.day_tab = QWidget()
+        self.history_tab = QWidget()
 
         self.tabs.addTab(self.edit_tab, "Edit")
         self.tabs.addTab(self.week_tab, "Week")
         self.tabs.addTab(self.day_tab, "Day")
+        self.tabs.addTab(self.history_tab, "History")
         self.tabs.setCurrentIndex(1)
 
-        self.add_content_to_edit_tab()
+        # Whole weekday schedules, shown by the Edit tab list.
+        self.day_models = {day: DayTaskModel(self.tasks[day], self) for day in DAYS}
+
+        # Only the Week tab is shown at startup; the others are built the
+        # first time they are opened.
         self.add_content_to_week_tab()
-        self.add_content_to_day_tab()
+        self.pending_tabs = {
+            self.edit_tab: self.add_content_to_edit_tab,
+            self.day_tab: self.add_content_to_day_tab,
+            self.history_tab: self.add_content_to_history_tab,
+        }
+        self.tabs.currentChanged.connect(self.build_tab)
+
+    def build_tab(self, index):
+        build = self.pending_tabs.pop(self.tabs.widget(index), None)
+        if build is not None:
+            build()
 
     def add_content_to_edit_tab(self):
         layout = QHBoxLayout(self.edit_tab)
@@ -122,22 +752,13 @@ class MainWindow(QMainWindow):
 
         # Task Input Container
         input_container = QWidget()
-        input_container.setStyleSheet("background-color: white; border: 2px solid black;")
+        input_container.setObjectName("panel")
         input_container.setMinimumWidth(1280)
         input_layout = QVBoxLayout(input_container)
 
         # Header
         header = QLabel("Add, Edit, Remove Tasks")
-        header.setStyleSheet("""
-            QLabel {
-                color: black;
-                background-color: white;
-                padding: 5px;
-                font-family: 'Segoe UI', 'Arial', sans-serif;
-                font-size: 10pt;  /* Changed from 12pt to 10pt */
-                font-weight: bold;
-            }
-        """)
+        header.setObjectName("panelHeader")
         input_layout.addWidget(header)
 
         # Task input fields
@@ -146,52 +767,66 @@ class MainWindow(QMainWindow):
         # Day selection
         self.day_combo = QComboBox()
         self.day_combo.addItems(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
-        self.day_combo.setStyleSheet("""
-            QComboBox {
-                padding: 5px;
-                border: 1px solid black;
-                background: white;
-                font-family: 'Segoe UI', 'Arial', sans-serif;
-            }
-        """)
         input_grid.addWidget(QLabel("Day:"), 0, 0)
         input_grid.addWidget(self.day_combo, 0, 1)
 
+        # Date of a one-off task, or the first occurrence of a permanent one;
+        # kept on the selected day
+        self.date_edit = QDateEdit(QDate.currentDate())
+        self.date_edit.setCalendarPopup(True)
+        self.day_combo.setCurrentText(DAYS[date.today().weekday()])
+        input_grid.addWidget(QLabel("Date:"), 1, 0)
+        input_grid.addWidget(self.date_edit, 1, 1)
+
         # Time input
         self.time_edit = QTimeEdit()
         self.time_edit.setTime(QTime.currentTime())
         self.time_edit.setDisplayFormat("h:mm AP")  # Changed to 12-hour format with AM/PM
-        self.time_edit.setStyleSheet("""
-            QTimeEdit {
-                padding: 5px;
-                border: 1px solid black;
-                font-family: 'Segoe UI', 'Arial', sans-serif;
-            }
-        """)
-        input_grid.addWidget(QLabel("Time:"), 1, 0)
-        input_grid.addWidget(self.time_edit, 1, 1)
+        input_grid.addWidget(QLabel("Time:"), 2, 0)
+        input_grid.addWidget(self.time_edit, 2, 1)
+
+        # Optional end time; a task without one is a point in time
+        self.end_check = QCheckBox("Ends:")
+        self.end_edit = QTimeEdit()
+        self.end_edit.setDisplayFormat("h:mm AP")
+        self.end_edit.setEnabled(False)
+        self.end_check.toggled.connect(self.end_edit.setEnabled)
+        self.end_check.toggled.connect(self.suggest_end_time)
+        input_grid.addWidget(self.end_check, 3, 0)
+        input_grid.addWidget(self.end_edit, 3, 1)
 
         # Task description
         self.task_input = QLineEdit()
         self.task_input.setPlaceholderText("Enter task description")
-        self.task_input.setStyleSheet("""
-            QLineEdit {
-                padding: 5px;
-                border: 1px solid black;
-                font-family: 'Segoe UI', 'Arial', sans-serif;
-            }
-        """)
-        input_grid.addWidget(QLabel("Task:"), 2, 0)
-        input_grid.addWidget(self.task_input, 2, 1)
+        input_grid.addWidget(QLabel("Task:"), 4, 0)
+        input_grid.addWidget(self.task_input, 4, 1)
+
+        self.location_input = QLineEdit()
+        self.location_input.setPlaceholderText("Optional")
+        input_grid.addWidget(QLabel("Location:"), 5, 0)
+        input_grid.addWidget(self.location_input, 5, 1)
 
         # Permanent checkbox
         self.permanent_check = QCheckBox("Permanent Task")
-        self.permanent_check.setStyleSheet("""
-            QCheckBox {
-                font-family: 'Segoe UI', 'Arial', sans-serif;
-            }
-        """)
-        input_grid.addWidget(self.permanent_check, 3, 0, 1, 2)
+        input_grid.addWidget(self.permanent_check, 6, 0, 1, 2)
+
+        # How often a permanent task repeats
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(1, 52)
+        self.interval_spin.setSuffix(" week(s)")
+        self.interval_spin.setEnabled(False)
+        self.permanent_check.toggled.connect(self.interval_spin.setEnabled)
+        input_grid.addWidget(QLabel("Repeat every:"), 7, 0)
+        input_grid.addWidget(self.interval_spin, 7, 1)
+
+        # Length of the gap "Find Free Slot" looks for
+        self.slot_length_spin = QSpinBox()
+        self.slot_length_spin.setRange(5, 12 * 60)
+        self.slot_length_spin.setSingleStep(15)
+        self.slot_length_spin.setValue(90)
+        self.slot_length_spin.setSuffix(" min")
+        input_grid.addWidget(QLabel("Free slot:"), 8, 0)
+        input_grid.addWidget(self.slot_length_spin, 8, 1)
 
         input_layout.addLayout(input_grid)
 
@@ -201,53 +836,56 @@ class MainWindow(QMainWindow):
         self.edit_button = QPushButton("Edit")
         self.remove_button = QPushButton("Remove Selected")
         self.clear_button = QPushButton("Clear Completed")
+        self.skip_button = QPushButton("Skip Date")
+        self.import_button = QPushButton("Import...")
+        self.free_slot_button = QPushButton("Find Free Slot")
 
-        for button in [self.add_button, self.edit_button, self.remove_button, self.clear_button]:
-            button.setStyleSheet("""
-                QPushButton {
-                    padding: 8px 20px;
-                    background-color: #333333;
-                    color: white;
-                    border: none;
-                    font-family: 'Segoe UI', 'Arial', sans-serif;
-                }
-                QPushButton:hover {
-                    background-color: #90d5ff;
-                }
-            """)
+        for button in [self.add_button, self.edit_button, self.remove_button, self.clear_button, self.skip_button,
+                       self.import_button, self.free_slot_button]:
+            button.setObjectName("actionButton")
             button_layout.addWidget(button)
 
         input_layout.addLayout(button_layout)
 
+        # Search across every day
+        search_header = QLabel("Search Tasks")
+        search_header.setObjectName("sectionHeader")
+        input_layout.addWidget(search_header)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search all days")
+        self.search_input.textChanged.connect(self.update_search_results)
+        input_layout.addWidget(self.search_input)
+
+        self.search_results_model = QStringListModel(self)
+        self.search_results_view = QListView()
+        self.search_results_view.setModel(self.search_results_model)
+        self.search_results_view.setUniformItemSizes(True)
+        self.search_results_view.setEditTriggers(QListView.NoEditTriggers)
+        self.search_results_view.clicked.connect(self.show_search_result)
+        input_layout.addWidget(self.search_results_view)
+
         # Task List Container
         list_container = QWidget()
-        list_container.setStyleSheet("background-color: white; border: 2px solid black;")
+        list_container.setObjectName("panel")
         list_container.setMinimumWidth(1280)
         list_layout = QVBoxLayout(list_container)
 
         # Tasks header
         tasks_header = QLabel("Current Tasks")
-        tasks_header.setStyleSheet("""
-            QLabel {
-                color: black;
-                background-color: white;
-                padding: 5px;
-                font-family: 'Segoe UI', 'Arial', sans-serif;
-                font-size: 12pt;
-                font-weight: bold;
-            }
-        """)
+        tasks_header.setObjectName("sectionHeader")
         list_layout.addWidget(tasks_header)
 
-        # Create scroll area for tasks
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("background-color: white; border: none;")
-        
-        self.task_list_widget = QWidget()
-        self.task_list_layout = QVBoxLayout(self.task_list_widget)
-        scroll.setWidget(self.task_list_widget)
-        list_layout.addWidget(scroll)
+        # Checkable list view over the selected day's model; only the
+        # visible rows are ever laid out or painted.
+        self.task_list_model = EditTaskProxyModel(self)
+        self.task_list_model.completion_toggled.connect(
+            lambda task, checked: self.toggle_task_completion(self.day_combo.currentText(), task, checked))
+        self.task_list_view = QListView()
+        self.task_list_view.setModel(self.task_list_model)
+        self.task_list_view.setUniformItemSizes(True)
+        self.task_list_view.setSelectionMode(QListView.SingleSelection)
+        list_layout.addWidget(self.task_list_view)
 
         # Add containers to main layout
         layout.addWidget(input_container)
@@ -258,7 +896,13 @@ class MainWindow(QMainWindow):
         self.edit_button.clicked.connect(self.edit_task)
         self.remove_button.clicked.connect(self.remove_task)
         self.clear_button.clicked.connect(self.clear_completed_tasks)
+        self.skip_button.clicked.connect(self.skip_occurrence)
+        self.import_button.clicked.connect(self.import_schedule)
+        self.free_slot_button.clicked.connect(self.find_free_slot)
         self.day_combo.currentTextChanged.connect(self.update_task_display)
+        self.day_combo.currentTextChanged.connect(self.move_date_to_day)
+        self.date_edit.dateChanged.connect(
+            lambda value: self.day_combo.setCurrentText(DAYS[value.toPyDate().weekday()]))
 
         # Initial update
         self.update_task_display()
@@ -270,14 +914,48 @@ class MainWindow(QMainWindow):
         is_permanent = self.permanent_check.isChecked()
 
         if description:
-            new_task = Task(description, time, is_permanent)
-            self.tasks[day].append(new_task)
-            self.save_tasks()
-            self.update_task_display()
-            self.update_week_view()
-            self.update_todays_tasks()  # Update today's tasks
+            when = self.date_edit.date().toPyDate()
+            end = self.end_edit.time().toString("hh:mm AP") if self.end_check.isChecked() else None
+            location = self.location_input.text().strip()
+            try:
+                if is_permanent:
+                    rule = Recurrence(interval=self.interval_spin.value(), start=when)
+                    new_task = Task(description, time, is_permanent, rule=rule, end=end, location=location)
+                else:
+                    new_task = Task(description, time, date=when, end=end, location=location)
+            except ValueError:
+                QMessageBox.warning(self, "Input Error", "The end time must be after the start time.")
+                return
+            duplicate = self.tasks[day].find_duplicate(new_task)
+            if duplicate is not None:
+                # Point at the existing entry instead of adding it again.
+                index = self.task_list_model.index(self.tasks[day].index(duplicate), 0)
+                self.task_list_view.setCurrentIndex(index)
+                QMessageBox.information(self, "Duplicate Task", f"This task is already scheduled for {day}.")
+                return
+            conflicts = self.tasks[day].conflicts(new_task)
+            if conflicts:
+                overlaps = '\n'.join(f"{task.span} - {task.title}" for task in conflicts[:5])
+                if len(conflicts) > 5:
+                    overlaps += f"\n... and {len(conflicts) - 5} more"
+                answer = QMessageBox.question(self, "Time Conflict",
+                                              f"This overlaps with:\n{overlaps}\n\nAdd it anyway?")
+                if answer != QMessageBox.Yes:
+                    return
+            row = self.day_models[day].insert_task(new_task)
+            self.sync_state.added(day, new_task)
+            self.reminders.add(day, new_task)
+            self.search_index.add(day, new_task)
+            if self.editing is not None:
+                # The edited task's removal and its re-add are saved as one.
+                records = [storage.replaced(self.tasks)]
+                self.editing = None
+            else:
+                records = [storage.added(day, row, new_task)]
+            self.changes.mark(records=records, rows=[(day, new_task)])
             self.task_input.clear()
-            self.log_activity(f"Added task to {day}: {description}")
+            self.location_input.clear()
+            self.log_activity('add', day, new_task)
         else:
             QMessageBox.warning(self, "Input Error", "Please enter a task description.")
 
@@ -287,15 +965,31 @@ class MainWindow(QMainWindow):
 
         if selected_task:
             # Load the selected task's details into the input fields
-            time_obj = datetime.strptime(selected_task.time, "%I:%M %p")
-            self.time_edit.setTime(QTime(time_obj.hour, time_obj.minute))
+            self.time_edit.setTime(QTime(selected_task.minutes // 60, selected_task.minutes % 60))
             self.task_input.setText(selected_task.description)
+            self.location_input.setText(selected_task.location)
+            self.end_check.setChecked(selected_task.end_minutes is not None)
+            if selected_task.end_minutes is not None:
+                self.end_edit.setTime(QTime(selected_task.end_minutes // 60, selected_task.end_minutes % 60))
             self.permanent_check.setChecked(selected_task.is_permanent)
-
-            # Remove the old task and allow the user to re-add or update it
-            self.tasks[day].remove(selected_task)
-            self.update_task_display()
-            self.update_todays_tasks()
+            rule = selected_task.rule
+            when = selected_task.date or (rule.start if rule is not None else None)
+            if when is not None:
+                self.date_edit.setDate(QDate(when.year, when.month, when.day))
+            self.interval_spin.setValue(rule.interval if rule is not None else 1)
+
+            if self.editing is not None:
+                # The previous edit was never added back: it was a removal.
+                self.changes.mark(records=[storage.removed(*self.editing)])
+            # Remove the old task and allow the user to re-add or update it.
+            # Nothing is saved until then, so closing mid-edit keeps it.
+            self.sync_state.before_change(day, selected_task)
+            row = self.day_models[day].remove_task(selected_task)
+            self.reminders.remove(selected_task)
+            self.search_index.remove(selected_task)
+            self.editing = (day, row, selected_task)
+            self.changes.mark(records=[], rows=[(day, selected_task)])
+            self.log_activity('edit', day, selected_task)
         else:
             QMessageBox.warning(self, "Selection Error", "Please select a task to edit.")
 
@@ -304,173 +998,243 @@ class MainWindow(QMainWindow):
         day = self.day_combo.currentText()
         selected_task = self.get_selected_task()
         if selected_task:
-            self.tasks[day].remove(selected_task)
-            self.save_tasks()
-            self.update_task_display()
-            self.update_week_view()
-            self.update_todays_tasks()  # Update today's tasks
-            self.log_activity(f"Removed task from {day}: {selected_task.description}")
+            self.sync_state.before_change(day, selected_task)
+            row = self.day_models[day].remove_task(selected_task)
+            self.reminders.remove(selected_task)
+            self.search_index.remove(selected_task)
+            self.changes.mark(records=[storage.removed(day, row, selected_task)], rows=[(day, selected_task)])
+            self.log_activity('remove', day, selected_task)
         else:
             QMessageBox.warning(self, "Selection Error", "Please select a task to remove.")
 
     def clear_completed_tasks(self):
-        for day in self.tasks:
-            self.tasks[day] = [task for task in self.tasks[day] if not task.completed]
-        self.save_tasks()
-        self.update_task_display()
-        self.update_week_view()
-        self.log_activity("Cleared completed tasks")
+        completed = [(day, task) for day in self.tasks for task in self.tasks[day] if task.completed]
+        self.archive_tasks(completed)
+        self.log_activity('clear', description=f"Archived {len(completed)} completed tasks")
+
+    def archive_tasks(self, entries):
+        """Move ``(day, task)`` pairs from the open schedule to the archive."""
+        with self.storage.lock:
+            self.archive.add(entries)
+        changes = []
+        for day, task in entries:
+            self.sync_state.before_change(day, task)
+            row = self.day_models[day].remove_task(task)
+            changes.append(storage.removed(day, row, task))
+            self.reminders.remove(task)
+            self.search_index.remove(task)
+        self.changes.mark(records=changes, rows=entries)
+
+    def skip_occurrence(self):
+        day = self.day_combo.currentText()
+        selected_task = self.get_selected_task()
+        when = self.date_edit.date().toPyDate()
+        if selected_task is None or selected_task.rule is None:
+            QMessageBox.warning(self, "Selection Error", "Please select a permanent task to skip.")
+            return
+        if not selected_task.occurs_on(when):
+            QMessageBox.information(self, "Skip Date", f"This task does not occur on {when:%b %d, %Y}.")
+            return
+        self.sync_state.before_change(day, selected_task)
+        selected_task.rule.exceptions.add(when)
+        self.reminders.remove(selected_task)
+        self.reminders.add(day, selected_task)
+        self.changes.mark([day], [storage.updated(day, self.tasks[day].index(selected_task), selected_task)])
+        self.log_activity('skip', day, selected_task, f"{selected_task.description} on {when.isoformat()}")
+
+    def import_schedule(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Schedule", "",
+                                              "Schedules (*.ics *.csv);;All files (*)")
+        if not path:
+            return
+        try:
+            plan = importer.plan_import(self.tasks, importer.read_file(path))
+        except (OSError, ValueError, UnicodeDecodeError, csv.Error) as e:
+            QMessageBox.warning(self, "Import Error", f"Could not read {os.path.basename(path)}: {e}")
+            return
+        if not plan.added:
+            QMessageBox.information(self, "Import Schedule", f"Nothing to import. {plan.summary()}")
+            return
+
+        # Dry run first: nothing changes until the preview is accepted.
+        preview = QMessageBox(QMessageBox.Question, "Import Schedule",
+                              f"Import from {os.path.basename(path)}?\n\n{plan.summary()}",
+                              QMessageBox.Ok | QMessageBox.Cancel, self)
+        preview.setDetailedText('\n'.join(plan.preview()))
+        if preview.exec_() != QMessageBox.Ok:
+            return
+
+        changes = importer.apply_plan(self.tasks, plan)
+        for day, task in plan.added:
+            self.sync_state.added(day, task)
+            self.reminders.add(day, task)
+            self.search_index.add(day, task)
+        days = {day for day, task in plan.added}
+        for day in days:
+            self.day_models[day].set_schedule(self.tasks[day])
+        self.changes.mark(days, changes)
+        self.changes.flush()  # Large and deliberate: save it right away
+        self.log_activity('import', description=f"Imported {len(changes)} tasks from {os.path.basename(path)}")
+
+    def suggest_end_time(self, checked):
+        if checked:
+            self.end_edit.setTime(self.time_edit.time().addSecs(3600))
+
+    def find_free_slot(self):
+        # The first gap of the chosen length left this week, between
+        # FREE_SLOT_HOURS and not before now.
+        length = self.slot_length_spin.value()
+        today = date.today()
+        now = datetime.now()
+        earliest, latest = FREE_SLOT_HOURS[0] * 60, FREE_SLOT_HOURS[1] * 60
+        for offset in range(7 - today.weekday()):
+            when = today + timedelta(days=offset)
+            day = DAYS[when.weekday()]
+            start = max(earliest, now.hour * 60 + now.minute + 1) if offset == 0 else earliest
+            slot = next(self.tasks[day].free(when, length, start, latest), None)
+            if slot is not None:
+                break
+        else:
+            QMessageBox.information(self, "Find Free Slot", f"No free {length}-minute slot is left this week.")
+            return
+        self.date_edit.setDate(QDate(when.year, when.month, when.day))
+        self.time_edit.setTime(QTime(slot[0] // 60, slot[0] % 60))
+        self.end_check.setChecked(True)
+        end = slot[0] + length
+        self.end_edit.setTime(QTime(end // 60, end % 60))
+        QMessageBox.information(self, "Find Free Slot",
+                                f"{day} {when:%b %d} is free from {format_time(slot[0])} to {format_time(slot[1])}.")
+
+    def move_date_to_day(self, day):
+        # Keep the date in the same calendar week, on the newly chosen day.
+        start = recurrence.week_start(self.date_edit.date().toPyDate())
+        when = recurrence.week_dates(start)[day]
+        self.date_edit.setDate(QDate(when.year, when.month, when.day))
 
     def get_selected_task(self):
-        day = self.day_combo.currentText()
-        for i in range(self.task_list_layout.count()):
-            widget = self.task_list_layout.itemAt(i).widget()
-            if widget:
-                checkbox = widget.layout().itemAt(0).widget()
-                if checkbox.isChecked():
-                    return self.tasks[day][i]
-        return None
+        selected = self.task_list_view.selectionModel().selectedIndexes()
+        if not selected:
+            return None
+        return self.task_list_model.task(selected[0])
 
+    @profiling.timed('update_task_display')
     def update_task_display(self):
-        while self.task_list_layout.count():
-            widget = self.task_list_layout.takeAt(0).widget()
-            if widget:
-                widget.deleteLater()
-
-        selected_day = self.day_combo.currentText()
-        for task in self.tasks[selected_day]:
-            task_widget = QWidget()
-            task_layout = QHBoxLayout(task_widget)
-            
-            checkbox = QCheckBox()
-            checkbox.setChecked(task.completed)
-            checkbox.stateChanged.connect(lambda state, t=task: self.toggle_task_completion(t, state))
-            
-            label = QLabel(f"{task.time} - {task.description}")
-            label.setStyleSheet("""
-                QLabel {
-                    font-family: 'Segoe UI', 'Arial', sans-serif;
-                    %s
-                }
-            """ % ("color: #800080;" if task.is_permanent else ""))  # Changed to purple (#800080)
-            
-            task_layout.addWidget(checkbox)
-            task_layout.addWidget(label)
-            self.task_list_layout.addWidget(task_widget)
-
-
-    def toggle_task_completion(self, task, state):
+        # Swapping the source model is O(1); the view lays out visible rows only.
+        self.task_list_model.setSourceModel(self.day_models[self.day_combo.currentText()])
+
+    @profiling.timed('update_search_results')
+    def update_search_results(self):
+        if self.search_input is None:
+            return
+        self.search_results = self.search_index.search(self.search_input.text())
+        self.search_results_model.setStringList(
+            [f"{day} {task.span} - {task.title}" for day, task in self.search_results])
+
+    def show_search_result(self, index):
+        # Switch the task list to the result's day and select the task there.
+        day, task = self.search_results[index.row()]
+        self.day_combo.setCurrentText(day)
+        row = self.tasks[day].index(task)
+        self.task_list_view.setCurrentIndex(self.task_list_model.index(row, 0))
+
+    def toggle_task_completion(self, day, task, state):
+        self.sync_state.before_change(day, task)
         task.completed = bool(state)
-        self.save_tasks()
-        self.update_week_view()
+        self.day_models[day].task_changed(task)
+        self.changes.mark(records=[storage.updated(day, self.tasks[day].index(task), task)], tasks=[(day, task)])
+
+    def show_changes(self, days, rows, tasks):
+        # Everything marked on the change bus during one event-loop turn.
+        for day in DAYS:
+            if day in days:
+                self.refresh_day(day)
+        rows = [(day, task) for day, task in rows if day not in days]
+        if rows:
+            self.show_rows(rows)
+        # Columns rebuilt above already show the tasks' new state.
+        self.timeline.tasks_changed([(day, task) for day, task in tasks if day not in days])
+        if days or rows:
+            self.update_search_results()
+            self.arm_reminder_timer()
 
     def add_content_to_week_tab(self):
-        layout = QHBoxLayout(self.week_tab)
-        layout.setSpacing(5)
-        layout.setContentsMargins(5, 5, 5, 5)
-
-        days = ['Saturday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Sunday']
-        self.day_layouts = {}  # Store layouts for later updates
-
-        for day in days:
-            container = QWidget()
-            container.setStyleSheet("background-color: white; ")
-            container.setFixedSize(360, 872)  # Set fixed size for all day boxes
-
-            box_layout = QVBoxLayout(container)
-            box_layout.setSpacing(5)
-            box_layout.setContentsMargins(5, 5, 5, 5)
-
-            # Day label
-            day_label = QLabel(day)
-            day_label.setAlignment(Qt.AlignCenter)
-        
-            
-            my_date = date.today()
-            if day != calendar.day_name[my_date.weekday()]:
-                day_label.setStyleSheet("""
-                    QLabel {
-                        color: black;
-                        background-color: white;
-                        padding: 5px;
-                        font-family: 'Segoe UI', 'Arial', sans-serif;
-                        font-size: 12pt;
-                        font-weight: bold;
-                    }
-                """)
-            else:
-                day_label.setStyleSheet("""
-                    QLabel {
-                        color: #90d5ff;
-                        background-color: white;
-                        padding: 5px;
-                        font-family: 'Segoe UI', 'Arial', sans-serif;
-                        font-size: 12pt;
-                        font-weight: bold;
-                        text-decoration: underline;
-                    }
-                """)
-            box_layout.addWidget(day_label)
-
-            # Create scroll area for tasks
-            scroll = QScrollArea()
-            scroll.setWidgetResizable(True)
-            scroll.setStyleSheet("background-color: white; border: none;")
-            
-            task_widget = QWidget()
-            task_layout = QVBoxLayout(task_widget)
-            scroll.setWidget(task_widget)
-            
-            self.day_layouts[day] = task_layout
-            box_layout.addWidget(scroll)
-            
-            layout.addWidget(container)
+        outer_layout = QVBoxLayout(self.week_tab)
+        outer_layout.setSpacing(5)
+        outer_layout.setContentsMargins(5, 5, 5, 5)
+
+        # Earlier weeks also show what has been archived from them.
+        navigation = QHBoxLayout()
+        previous_button = QPushButton("< Previous Week")
+        this_week_button = QPushButton("This Week")
+        next_button = QPushButton("Next Week >")
+        previous_button.clicked.connect(
+            lambda: self.timeline.scroll_to(self.timeline.current_week() - recurrence.WEEK))
+        this_week_button.clicked.connect(
+            lambda: self.timeline.scroll_to(recurrence.week_start(date.today())))
+        next_button.clicked.connect(
+            lambda: self.timeline.scroll_to(self.timeline.current_week() + recurrence.WEEK))
+        for button in (previous_button, this_week_button, next_button):
+            button.setObjectName("actionButton")
+        navigation.addWidget(previous_button)
+        navigation.addStretch()
+        navigation.addWidget(this_week_button)
+        navigation.addStretch()
+        navigation.addWidget(next_button)
+        outer_layout.addLayout(navigation)
+
+        # Only the weeks around the view are built; see WeekTimeline.
+        self.timeline = WeekTimeline(self.week_column, self.forecast)
+        outer_layout.addWidget(self.timeline)
 
         self.update_week_view()
 
-    def update_week_view(self):
-         for day, layout in self.day_layouts.items():
-            while layout.count():
-                widget = layout.takeAt(0).widget()
-                if widget:
-                    widget.deleteLater()
-
-            for task in sorted(self.tasks[day], key=lambda x: datetime.strptime(x.time, "%I:%M %p")):
-                task_label = QLabel(f"{task.time}: {task.description}")
-                task_label.setStyleSheet(f"""
-                    QLabel {{
-                        font-family: 'Segoe UI', 'Arial', sans-serif;
-                        padding: 2px;
-                        {
-                            'text-decoration: line-through;' if task.completed else 
-                            'color: #800080;' if task.is_permanent else ''  # Changed to purple
-                        }
-                    }}
-                """)
-                layout.addWidget(task_label)
-                task_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
-
-
-            layout.addStretch()
+    @profiling.timed('update_week_view')
+    def update_week_view(self, start=None):
+        """Scroll to the calendar week beginning on Monday ``start``, by
+        default the one containing today, refetching the shown columns."""
+        for day, model in self.day_models.items():
+            model.set_schedule(self.tasks[day])
+        self.timeline.refresh()
+        self.timeline.scroll_to(start or recurrence.week_start(date.today()))
+
+    def week_column(self, when):
+        """The tasks shown for date ``when``: its occurrences, plus what was
+        archived from it if it is before this week."""
+        live = self.occurrences.on(when)
+        if when >= recurrence.week_start(date.today()):
+            return live
+        archived = self.archive.on(when)
+        if not archived:
+            return live
+        return tuple(sorted(live + archived, key=lambda task: task.minutes))
+
+    def refresh_day(self, day):
+        # Re-expand one weekday after its schedule changed.
+        self.occurrences.invalidate(day)
+        self.timeline.refresh_day(day)
+        if day == DAYS[date.today().weekday()]:
+            self.update_todays_tasks()
+
+    def show_rows(self, rows):
+        # Tasks added or removed: the Week tab only inserts or drops their rows.
+        for day, task in rows:
+            self.occurrences.forget(day, task)
+        self.timeline.rows_changed(rows)
+        if DAYS[date.today().weekday()] in {day for day, task in rows}:
+            self.update_todays_tasks()
 
     def add_content_to_day_tab(self):
         layout = QHBoxLayout(self.day_tab)
 
         # First container: Weather info and today's tasks
         container1 = QWidget()
-        container1.setStyleSheet("background-color: white; border: 2px solid black;")
+        container1.setObjectName("panel")
         container1.setMinimumWidth(640)
         container1_layout = QVBoxLayout(container1)
 
         # Weather info
         weather_title = QLabel("Current Weather in Anaheim")
-        weather_title.setStyleSheet("""
-            QLabel {
-                font-size: 14pt;
-                font-weight: bold;
-                padding: 5px;
-            }
-        """)
+        weather_title.setObjectName("weatherTitle")
 
         container1_layout.addWidget(weather_title)
 
@@ -482,13 +1246,7 @@ class MainWindow(QMainWindow):
 
         # Task section
         task_section_label = QLabel("Today's Tasks:")
-        task_section_label.setStyleSheet("""
-            QLabel {
-                font-size: 12pt;
-                font-weight: bold;
-                padding: 5px;
-            }
-        """)
+        task_section_label.setObjectName("sectionHeader")
         container1_layout.addWidget(task_section_label)
 
         # Scrollable area for today's tasks
@@ -507,18 +1265,12 @@ class MainWindow(QMainWindow):
 
         # Second container: Send message section
         container2 = QWidget()
-        container2.setStyleSheet("background-color: white; border: 2px solid black;")
+        container2.setObjectName("panel")
         container2.setMinimumWidth(640)
         container2_layout = QVBoxLayout(container2)
 
         label = QLabel("Send a Message to Your Phone")
-        label.setStyleSheet("""
-            QLabel {
-                font-size: 12pt;
-                font-weight: bold;
-                padding: 5px;
-            }
-        """)
+        label.setObjectName("sectionHeader")
         container2_layout.addWidget(label)
 
         self.message_input = QTextEdit()
@@ -529,102 +1281,335 @@ class MainWindow(QMainWindow):
         send_button.clicked.connect(self.send_message)
         container2_layout.addWidget(send_button)
 
+        self.message_status_label = QLabel(self.message_status)
+        container2_layout.addWidget(self.message_status_label)
+
         layout.addWidget(container2)
 
+    @profiling.timed('update_weather_info')
     def update_weather_info(self, label):
-        try:
-            city = ''
-            api_key = ''
-            base_url = 'https://api.openweathermap.org/data/2.5/weather'
-            response = requests.get(f"{base_url}?q={city}&appid={api_key}").json()
-
-            # Extract main temperature details
-            temp_kelvin = response['main']['temp']
-            temp_fahrenheit = (temp_kelvin - 273.15) * 9/5 + 32
-
-            temp_max_kelvin = response['main']['temp_max']
-            temp_max_fahrenheit = (temp_max_kelvin - 273.15) * 9/5 + 32
-
-            temp_min_kelvin = response['main']['temp_min']
-            temp_min_fahrenheit = (temp_min_kelvin - 273.15) * 9/5 + 32
-
-            # Extract weather description
-            description = response['weather'][0]['description']
-
-            # Extract wind speed
-            wind_speed = response['wind']['speed']
-
-            # Extract sunrise and sunset times
-            sunrise_timestamp = response['sys']['sunrise']
-            sunset_timestamp = response['sys']['sunset']
-
-            # Convert timestamps to readable times
-            sunrise_time = datetime.fromtimestamp(sunrise_timestamp).strftime('%I:%M %p')
-            sunset_time = datetime.fromtimestamp(sunset_timestamp).strftime('%I:%M %p')
-
-            # Update the label text with the additional information
-            label.setText(
-                f"Current Temperature: {temp_fahrenheit:.1f}°F ({description.capitalize()})\n"
-                f"High: {temp_max_fahrenheit:.1f}°F | Low: {temp_min_fahrenheit:.1f}°F\n"
-                f"Wind Speed: {wind_speed} m/s\n"
-                f"Sunrise: {sunrise_time} | Sunset: {sunset_time}"
-            )
-        except Exception:
-            label.setText("Unable to fetch weather data.")
-            
+        # Show the last reading straight away, then refresh it off the GUI thread.
+        cached = self.weather_client.cached()
+        if cached is not None:
+            try:
+                label.setText(weather.format_weather(cached))
+            except (KeyError, IndexError, TypeError):
+                cached = None
+
+        def show_error():
+            if cached is None:
+                label.setText("Unable to fetch weather data.")
+
+        self.weather_thread = QThread(self)
+        self.weather_worker = WeatherWorker(self.weather_client)
+        self.weather_worker.moveToThread(self.weather_thread)
+        self.weather_thread.started.connect(self.weather_worker.run)
+        self.weather_worker.finished.connect(label.setText)
+        self.weather_worker.failed.connect(show_error)
+        self.weather_worker.finished.connect(self.weather_thread.quit)
+        self.weather_worker.failed.connect(self.weather_thread.quit)
+        self.weather_thread.start()
+
+    def refresh_forecast(self):
+        # One request for the whole forecast, off the GUI thread; until it
+        # lands (or if it fails) the cached forecast stays up.
+        if self.forecast_thread is not None and self.forecast_thread.isRunning():
+            return
+        self.forecast_thread = QThread(self)
+        self.forecast_worker = ForecastWorker(self.weather_client)
+        self.forecast_worker.moveToThread(self.forecast_thread)
+        self.forecast_thread.started.connect(self.forecast_worker.run)
+        self.forecast_worker.finished.connect(self.show_forecast)
+        self.forecast_worker.finished.connect(self.forecast_thread.quit)
+        self.forecast_worker.failed.connect(self.forecast_thread.quit)
+        self.forecast_thread.start()
+
+    def show_forecast(self, forecast):
+        self.forecast = forecast
+        self.timeline.set_forecast(forecast)
+        self.update_todays_tasks()
 
+    def arm_rollover_timer(self):
+        # Fire just after the coming midnight.
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self.rollover_timer.start(int((midnight - now).total_seconds() * 1000) + 1000)
 
+    def roll_over_day(self):
+        today = date.today()
+        # A window left open into a new week archives what the last one
+        # finished, as loading does.
+        expired = archive.expired(self.tasks, recurrence.week_start(today))
+        if expired:
+            self.archive_tasks(expired)
+            self.log_activity('archive', description=f"Archived {len(expired)} past tasks")
+        self.tabs.set_date(today)
+        self.timeline.set_today(today)
+        self.update_todays_tasks()
+        self.arm_rollover_timer()
+
+    def add_content_to_history_tab(self):
+        layout = QHBoxLayout(self.history_tab)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        # Filter container
+        filter_container = QWidget()
+        filter_container.setObjectName("panel")
+        filter_container.setMinimumWidth(640)
+        filter_layout = QVBoxLayout(filter_container)
+
+        header = QLabel("Search Activity")
+        header.setObjectName("sectionHeader")
+        filter_layout.addWidget(header)
+
+        filter_grid = QGridLayout()
+        today = QDate.currentDate()
+        self.history_from = QDateEdit(today.addMonths(-1))
+        self.history_from.setCalendarPopup(True)
+        self.history_to = QDateEdit(today)
+        self.history_to.setCalendarPopup(True)
+        self.history_day = QComboBox()
+        self.history_day.addItems(['Any day', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+        self.history_action = QComboBox()
+        self.history_action.addItems(['Any action', 'add', 'edit', 'remove', 'clear', 'skip', 'import', 'sync', 'archive'])
+
+        filter_grid.addWidget(QLabel("From:"), 0, 0)
+        filter_grid.addWidget(self.history_from, 0, 1)
+        filter_grid.addWidget(QLabel("To:"), 1, 0)
+        filter_grid.addWidget(self.history_to, 1, 1)
+        filter_grid.addWidget(QLabel("Day:"), 2, 0)
+        filter_grid.addWidget(self.history_day, 2, 1)
+        filter_grid.addWidget(QLabel("Action:"), 3, 0)
+        filter_grid.addWidget(self.history_action, 3, 1)
+        filter_layout.addLayout(filter_grid)
+
+        search_button = QPushButton("Search")
+        search_button.setObjectName("actionButton")
+        search_button.clicked.connect(self.update_history)
+        filter_layout.addWidget(search_button)
+        filter_layout.addStretch()
+
+        # Results container
+        results_container = QWidget()
+        results_container.setObjectName("panel")
+        results_container.setMinimumWidth(1280)
+        results_layout = QVBoxLayout(results_container)
+
+        results_header = QLabel("History")
+        results_header.setObjectName("sectionHeader")
+        results_layout.addWidget(results_header)
+
+        self.archive_stats_label = QLabel()
+        results_layout.addWidget(self.archive_stats_label)
+
+        self.history_model = QStringListModel(self)
+        history_view = QListView()
+        history_view.setModel(self.history_model)
+        history_view.setUniformItemSizes(True)
+        results_layout.addWidget(history_view)
+
+        layout.addWidget(filter_container)
+        layout.addWidget(results_container)
+
+        self.update_history()
+
+    @profiling.timed('update_history')
+    def update_history(self):
+        day = self.history_day.currentText()
+        action = self.history_action.currentText()
+        start = self.history_from.date().toPyDate()
+        end = self.history_to.date().toPyDate()
+        entries = self.activity.query(
+            start=start,
+            end=end,
+            action=None if action == 'Any action' else action,
+            day=None if day == 'Any day' else day,
+        )
+        self.history_model.setStringList([
+            f"[{entry['ts']}] {entry['action']}"
+            + (f" {entry['day']}" if entry['day'] else "")
+            + (f": {entry['description']}" if entry['description'] else "")
+            for entry in entries
+        ])
+        # Counted from the archive manifest; no archived task is loaded.
+        archived, completed = self.archive.stats(start, end)
+        self.archive_stats_label.setText(f"Archived from these dates: {archived} tasks, {completed} completed")
+
+    @profiling.timed('update_todays_tasks')
     def update_todays_tasks(self):
+        if self.day_task_layout is None:
+            return  # The Day tab has not been built yet
+
         # Clear the current tasks in the Day Tab
         while self.day_task_layout.count():
             widget = self.day_task_layout.takeAt(0).widget()
             if widget:
                 widget.deleteLater()
 
-        today = calendar.day_name[date.today().weekday()]
-        for task in self.tasks[today]:
-            task_label = QLabel(f"{task.time} - {task.description}")
+        today = date.today()
+        for task in self.occurrences.on(today):
+            text = f"{task.span} - {task.title}"
+            reading = self.forecast.during(today, task.minutes, task.end_minutes)
+            if reading is not None:
+                text += f"  ({weather.format_slot(reading)})"
+            task_label = QLabel(text)
             task_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
             self.day_task_layout.addWidget(task_label)
 
         self.day_task_layout.addStretch()
 
+    @profiling.timed('send_message')
     def send_message(self):
         message = self.message_input.toPlainText().strip()
         if message:
-            try:
-                account_sid = ''
-                auth_token = ''
-                client = Client(account_sid, auth_token)
-                client.messages.create(
-                    body=message,
-                    from_='',
-                    to=''
-                )
-                QMessageBox.information(self, "Message Sent", "Your message has been sent successfully!")
-                self.message_input.clear()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to send message: {e}")
+            self.message_queue.submit(message)
+            self.set_message_status("Message queued for delivery.")
+            self.message_input.clear()
         else:
             QMessageBox.warning(self, "Input Error", "Please enter a message before sending.")
 
+    def show_message_status(self, message_id, status, detail):
+        if status == 'sent':
+            self.set_message_status("Your message has been sent successfully!")
+        elif status == 'retrying':
+            self.set_message_status(f"Sending failed, retrying: {detail}")
+        else:
+            self.set_message_status("Message could not be sent.")
+            QMessageBox.critical(self, "Error", f"Failed to send message: {detail}")
+
+    def build_search_index(self):
+        if self.search_index.build(0.02):
+            self.index_timer.stop()
+
+    def set_message_status(self, text):
+        self.message_status = text
+        if self.message_status_label is not None:
+            self.message_status_label.setText(text)
+
+    @profiling.timed('load_tasks')
     def load_tasks(self):
-        try:
-            with open('tasks.json', 'r') as file:
-                tasks_dict = json.load(file)
-                self.tasks = {day: [Task.from_dict(data) for data in tasks] for day, tasks in tasks_dict.items()}
-        except FileNotFoundError:
-            pass
-
-    def save_tasks(self):
-        tasks_dict = {day: [task.to_dict() for task in tasks] for day, tasks in self.tasks.items()}
-        with open('tasks.json', 'w') as file:
-            json.dump(tasks_dict, file)
+        self.changes.flush()
+        self.editing = None
+        with self.storage.lock:
+            self.tasks = self.storage.load()
+            self.archive_expired()
+            self.sync_state.synced()
+        self.reminders.reset(self.tasks)
+        self.occurrences.reset(self.tasks)
+        self.search_index.rebuild(self.tasks)
+        self.index_timer.start(0)
+        self.arm_reminder_timer()
+
+    def archive_expired(self):
+        # Tasks with nothing left from this week on move to the archive, so
+        # the live schedule and every load and save of it stay small. Runs
+        # with the storage lock held.
+        expired = archive.expired(self.tasks, recurrence.week_start(date.today()))
+        if not expired:
+            return
+        self.archive.add(expired)
+        changes = [storage.removed(day, self.tasks[day].remove(task), task) for day, task in expired]
+        self.storage.save(self.tasks, changes)
+        self.log_activity('archive', description=f"Archived {len(expired)} past tasks")
+
+    @profiling.timed('save_tasks')
+    def save_tasks(self, *changes):
+        # With no change records the storage persists the whole schedule.
+        with self.storage.lock:
+            if self.sync_state.stale():
+                # Someone else wrote since our last sync: fold their edits in
+                # first.
+                days, dirty = self.merge_external_changes()
+                if not dirty:
+                    return  # What we had to save is on disk already
+                if days:
+                    # Our records were made against rows their edits have
+                    # moved, so the merged schedule is saved whole.
+                    changes = ()
+            self.storage.save(self.tasks, changes)
+            self.sync_state.synced()
+
+    def sync_external_changes(self):
+        # Another process (or a script) wrote to the schedule.
+        with self.storage.lock:
+            if not self.sync_state.stale():
+                return
+            days, dirty = self.merge_external_changes()
+            if dirty:
+                self.changes.mark(records=None)
+            else:
+                # Anything still queued is already on disk, and its rows
+                # no longer match the merged schedule.
+                self.changes.discard()
+
+    def merge_external_changes(self):
+        """Merge the stored schedule into ours, re-rendering only the days
+        that changed. Returns ``(days, dirty)``: the days the merge changed,
+        and whether ours still has edits to save."""
+        merged, days, dirty = sync.reload(self.storage, self.sync_state, self.tasks)
+        for day in days:
+            old, new = self.tasks[day], merged[day]
+            kept = {id(task) for task in new}
+            for task in old:
+                if id(task) not in kept:
+                    self.reminders.remove(task)
+                    self.search_index.remove(task)
+            existing = {id(task) for task in old}
+            for task in new:
+                if id(task) not in existing:
+                    self.reminders.add(day, task)
+                    self.search_index.add(day, task)
+            self.tasks[day] = new
+            self.day_models[day].set_schedule(new)
+        if days:
+            self.changes.mark(days, [])
+            self.log_activity('sync', description=f"Merged outside changes to {', '.join(sorted(days, key=DAYS.index))}")
+        return days, dirty
     
-    def log_activity(self, activity):
-        with open('activity_log.txt', 'a') as file:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            file.write(f"[{timestamp}] {activity}\n")
+    @profiling.timed('log_activity')
+    def log_activity(self, action, day=None, task=None, description=None):
+        # Queued for the activity log's writer thread; never touches disk here.
+        self.activity.record(action, day, task, description)
+
+    def arm_reminder_timer(self):
+        due = self.reminders.next_due()
+        if due is None:
+            self.reminder_timer.stop()
+            return
+        delay = (due - datetime.now()).total_seconds()
+        self.reminder_timer.start(max(0, int(delay * 1000)))
+
+    def send_due_reminders(self):
+        due = self.reminders.pop_due()
+        if self.reminder_sender.held():
+            for day, task in due:
+                if not task.completed:
+                    self.message_queue.submit(reminders.reminder_text(task))
+        self.arm_reminder_timer()
+
+    def toggle_profiling(self):
+        self.perf_overlay.toggle()
+        profiling.profiler.enabled = PROFILE or self.perf_overlay.isVisible()
+
+    def show_profiling_note(self, note):
+        if not self.perf_overlay.isVisible():
+            self.toggle_profiling()
+        self.perf_overlay.note = note
+        self.perf_overlay.refresh()
+
+    def closeEvent(self, event):
+        for thread in (self.weather_thread, self.forecast_thread):
+            if thread is not None:
+                thread.quit()
+                thread.wait()
+        self.weather_client.close()
+        self.message_queue.close(timeout=5)
+        self.reminder_sender.release()
+        self.activity.close()
+        self.changes.flush()
+        self.storage.close()
+        super().closeEvent(event)
 
 
 if __name__ == '__main__':
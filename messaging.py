@@ -0,0 +1,188 @@
+"""Background delivery queue for text messages sent from the Day tab.
+
+Messages are persisted to an outbox file, delivered by one worker thread
+through a pluggable transport, retried with exponential backoff and
+rate-limited. Each process holds an outbox of its own, so the window and
+``workflow daemon`` never overwrite each other's messages. Nothing here
+touches Qt; status updates go to a plain callback that MainWindow forwards
+through a signal.
+"""
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+import profiling
+from storage import FileLock
+
+ACCOUNT_SID = ''
+AUTH_TOKEN = ''
+FROM_NUMBER = ''
+TO_NUMBER = ''
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentError(Exception):
+    """A delivery failure that retrying will not fix."""
+
+
+class TwilioTransport:
+    """Sends messages through one lazily created, reused Twilio client."""
+
+    def __init__(self, account_sid=ACCOUNT_SID, auth_token=AUTH_TOKEN,
+                 from_=FROM_NUMBER, to=TO_NUMBER):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_ = from_
+        self.to = to
+        self._client = None
+
+    @profiling.timed('message_transport')
+    def send(self, body):
+        # twilio is slow to import, so it is only loaded on the first send.
+        from twilio.base.exceptions import TwilioRestException
+        if self._client is None:
+            from twilio.rest import Client
+            self._client = Client(self.account_sid, self.auth_token)
+        try:
+            self._client.messages.create(body=body, from_=self.from_, to=self.to)
+        except TwilioRestException as e:
+            # Rate limiting and server errors are worth retrying; anything
+            # else (bad number, bad credentials) will fail the same way again.
+            if e.status == 429 or e.status >= 500:
+                raise
+            raise PermanentError(str(e)) from e
+
+
+class MessageQueue:
+    """Delivers queued messages on a worker thread.
+
+    ``on_status(message_id, status, detail)`` is called from the worker with
+    status ``'sent'``, ``'retrying'`` or ``'failed'``. Pending messages are
+    kept in ``outbox_path`` and resumed when the queue is created again. If
+    another queue, in this process or another, holds that outbox, the queue
+    takes the first free one of ``outbox.1.json``, ``outbox.2.json`` and
+    so on; :attr:`outbox_path` is the one it took.
+    Attempts are spaced at least ``min_interval`` seconds apart, and a failed
+    message waits ``base_delay * 2 ** (attempts - 1)`` seconds (capped at
+    ``max_delay``) before its next attempt.
+    """
+
+    def __init__(self, transport, outbox_path='outbox.json', on_status=None,
+                 max_attempts=5, base_delay=2.0, max_delay=300.0, min_interval=1.0):
+        self.transport = transport
+        self.outbox_path, self._outbox_lock = self._claim_outbox(outbox_path)
+        self.on_status = on_status
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_interval = min_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending = self._load_outbox()
+        self._ids = itertools.count(max((m['id'] for m in self._pending), default=0) + 1)
+        self._last_attempt = 0.0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='message-queue', daemon=True)
+        self._worker.start()
+
+    def submit(self, body):
+        """Queue ``body`` for delivery and return its message id."""
+        with self._lock:
+            message = {'id': next(self._ids), 'body': body, 'attempts': 0, 'next_attempt': 0.0}
+            self._pending.append(message)
+            self._save_outbox()
+            self._wakeup.notify()
+        return message['id']
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def close(self, timeout=None):
+        """Stop the worker; undelivered messages stay in the outbox."""
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+        self._worker.join(timeout)
+        if not self._worker.is_alive() and self._outbox_lock is not None:
+            self._outbox_lock.release()
+            self._outbox_lock = None
+
+    def _run(self):
+        while True:
+            with self._lock:
+                message = self._next_due()
+            if message is None:
+                return
+            self._deliver(message)
+
+    def _next_due(self):
+        # Called with the lock held; waits until a message is due or closed.
+        while not self._closed:
+            now = time.time()
+            if self._pending:
+                message = min(self._pending, key=lambda m: m['next_attempt'])
+                due = max(message['next_attempt'], self._last_attempt + self.min_interval)
+                if due <= now:
+                    return message
+                self._wakeup.wait(due - now)
+            else:
+                self._wakeup.wait()
+        return None
+
+    def _deliver(self, message):
+        self._last_attempt = time.time()
+        try:
+            self.transport.send(message['body'])
+        except Exception as e:
+            permanent = isinstance(e, PermanentError)
+            with self._lock:
+                message['attempts'] += 1
+                if permanent or message['attempts'] >= self.max_attempts:
+                    self._pending.remove(message)
+                    status = 'failed'
+                else:
+                    delay = min(self.base_delay * 2 ** (message['attempts'] - 1), self.max_delay)
+                    message['next_attempt'] = time.time() + delay
+                    status = 'retrying'
+                self._save_outbox()
+            logger.warning("Sending message %s failed (%s): %s", message['id'], status, e)
+            self._report(message['id'], status, str(e))
+        else:
+            with self._lock:
+                self._pending.remove(message)
+                self._save_outbox()
+            self._report(message['id'], 'sent', '')
+
+    def _report(self, message_id, status, detail):
+        if self.on_status is not None:
+            self.on_status(message_id, status, detail)
+
+    @staticmethod
+    def _claim_outbox(outbox_path):
+        root, ext = os.path.splitext(outbox_path)
+        for number in itertools.count():
+            path = f"{root}.{number}{ext}" if number else outbox_path
+            lock = FileLock(f"{path}.lock")
+            if lock.acquire(blocking=False):
+                return path, lock
+
+    def _load_outbox(self):
+        try:
+            with open(self.outbox_path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return []
+
+    def _save_outbox(self):
+        # Called with the lock held. The outbox only holds undelivered
+        # messages, so rewriting it whole stays cheap.
+        tmp_path = f"{self.outbox_path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self._pending, file)
+        os.replace(tmp_path, self.outbox_path)
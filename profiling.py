@@ -0,0 +1,144 @@
+"""Opt-in timing of the application's hot paths.
+
+Functions decorated with :func:`timed` report their wall time to the shared
+:data:`profiler`. While it is disabled a call costs one flag check on top of
+the function itself. Enabled, every name keeps a call count, total, maximum
+and a latency histogram of power-of-two microsecond buckets. Timings may be
+recorded from any thread.
+
+:meth:`Profiler.start_capture` and :meth:`Profiler.stop_capture` bracket a
+cProfile run, which MainWindow uses to profile one user interaction.
+"""
+from datetime import datetime
+import cProfile
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+
+class Stats:
+    """Count, total, maximum and histogram of one name's call times."""
+    __slots__ = ('count', 'total', 'maximum', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        # Bucket b counts calls taking [2 ** (b - 1), 2 ** b) microseconds.
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        """Upper bound, in seconds, of the bucket holding the given fraction of calls."""
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= fraction * self.count:
+                return min(2 ** bucket / 1e6, self.maximum)
+        return self.maximum
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean(),
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'max': self.maximum,
+            'histogram_us': {str(2 ** bucket): count for bucket, count in sorted(self.buckets.items())},
+        }
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._capture = None
+
+    def timed(self, name):
+        """Decorate a function so its calls are recorded under ``name``.
+
+        Like a Qt slot, the wrapper drops positional arguments the function
+        does not accept, so it can stay connected to signals that pass more.
+        """
+        def decorate(func):
+            code = func.__code__
+            limit = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if limit is not None:
+                    args = args[:limit]
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = Stats()
+            stats.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    def snapshot(self):
+        """Return ``{name: stats dict}`` for every name recorded so far."""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self.stats.items())}
+
+    def summary(self):
+        """Return the stats as text lines, slowest total first."""
+        rows = sorted(self.snapshot().items(), key=lambda item: item[1]['total'], reverse=True)
+        lines = [f"{'name':<24}{'calls':>7}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, stats in rows:
+            lines.append(f"{name:<24}{stats['count']:>7}{stats['mean'] * 1e3:>10.2f}"
+                         f"{stats['p95'] * 1e3:>10.2f}{stats['max'] * 1e3:>10.2f}")
+        return lines
+
+    def dump(self, directory='.'):
+        """Write the stats to a timestamped JSON file and return its path."""
+        path = os.path.join(directory, f"profile-{datetime.now():%Y%m%d-%H%M%S}.json")
+        with open(path, 'w') as file:
+            json.dump(self.snapshot(), file, indent=2)
+        return path
+
+    def start_capture(self):
+        if self._capture is None:
+            self._capture = cProfile.Profile()
+            self._capture.enable()
+
+    def stop_capture(self, directory='.'):
+        """Stop a cProfile capture and return the path of its .prof file."""
+        capture, self._capture = self._capture, None
+        if capture is None:
+            return None
+        capture.disable()
+        path = os.path.join(directory, f"profile-{datetime.now():%Y%m%d-%H%M%S}.prof")
+        capture.dump_stats(path)
+        return path
+
+
+profiler = Profiler()
+timed = profiler.timed
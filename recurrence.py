@@ -0,0 +1,134 @@
+"""Calendar occurrences of the weekday task schedule.
+
+Tasks are stored per weekday; whether a task actually happens on a given
+date is decided by :meth:`task_model.Task.occurs_on`. :class:`OccurrenceCache`
+expands a calendar week on first request into tuples of the scheduled Task
+objects themselves, never copies, and keeps the most recently used weeks.
+"""
+from collections import OrderedDict
+from datetime import timedelta
+
+from task_model import DAYS
+
+WEEK = timedelta(days=7)
+
+
+def week_start(when):
+    """Return the Monday of the week containing ``when``."""
+    return when - timedelta(days=when.weekday())
+
+
+def week_dates(start):
+    """Return ``{day: date}`` for the week beginning on Monday ``start``."""
+    return {day: start + timedelta(days=offset) for offset, day in enumerate(DAYS)}
+
+
+def next_occurrence(day, task, start):
+    """Return the first date on or after ``start`` that ``task`` happens, or None.
+
+    ``day`` is the weekday schedule holding the task.
+    """
+    when = start + timedelta(days=(DAYS.index(day) - start.weekday()) % 7)
+    if task.date is not None:
+        return task.date if task.date >= start else None
+    rule = task.rule
+    if rule is None:
+        return when
+    step = WEEK
+    if rule.start is not None:
+        if when < rule.start:
+            when = rule.start + timedelta(days=(DAYS.index(day) - rule.start.weekday()) % 7)
+        skipped = (when - rule.start).days // 7 % rule.interval
+        if skipped:
+            when += WEEK * (rule.interval - skipped)
+        step = WEEK * rule.interval
+    # Only exceptions can make an aligned week miss, so this is bounded.
+    for _ in range(len(rule.exceptions) + 1):
+        if rule.until is not None and when > rule.until:
+            return None
+        if rule.occurs_on(when):
+            return when
+        when += step
+    return None
+
+
+def previous_occurrence(day, task, end):
+    """Return the last date on or before ``end`` that ``task`` happens, or None."""
+    if task.date is not None:
+        return task.date if task.date <= end else None
+    rule = task.rule
+    if rule is not None and rule.until is not None:
+        end = min(end, rule.until)
+    when = end - timedelta(days=(end.weekday() - DAYS.index(day)) % 7)
+    if rule is None:
+        return when
+    step = WEEK
+    if rule.start is not None:
+        skipped = (when - rule.start).days // 7 % rule.interval
+        when -= WEEK * skipped
+        step = WEEK * rule.interval
+    for _ in range(len(rule.exceptions) + 1):
+        if rule.start is not None and when < rule.start:
+            return None
+        if rule.occurs_on(when):
+            return when
+        when -= step
+    return None
+
+
+class OccurrenceCache:
+    """Per-date occurrences of a ``{day: DaySchedule}`` week, memoized.
+
+    Dates are expanded only when asked for and grouped by calendar week;
+    once more than ``max_weeks`` weeks are cached the least recently used
+    is dropped. Call :meth:`forget` with a task added to or removed from a
+    weekday, :meth:`invalidate` with a weekday after changing a rule on it,
+    and :meth:`reset` after replacing the schedule.
+    """
+
+    def __init__(self, tasks=None, max_weeks=8):
+        self.max_weeks = max_weeks
+        self._tasks = tasks if tasks is not None else {}
+        self._weeks = OrderedDict()
+
+    def reset(self, tasks):
+        self._tasks = tasks
+        self._weeks.clear()
+
+    def invalidate(self, day=None):
+        """Forget cached occurrences for ``day``, or for every day."""
+        for week in self._weeks.values():
+            if day is None:
+                week.clear()
+            else:
+                week.pop(day, None)
+
+    def forget(self, day, task):
+        """Forget the cached dates ``task``, just added to or removed from
+        ``day``, can fall on: only its own date if it is a one-off."""
+        if task.date is None:
+            self.invalidate(day)
+            return
+        week = self._weeks.get(week_start(task.date))
+        if week is not None:
+            week.pop(day, None)
+
+    def on(self, when):
+        """Return the tasks happening on date ``when``, in start-time order."""
+        start = week_start(when)
+        week = self._weeks.get(start)
+        if week is None:
+            week = self._weeks[start] = {}
+            if len(self._weeks) > self.max_weeks:
+                self._weeks.popitem(last=False)
+        else:
+            self._weeks.move_to_end(start)
+        day = DAYS[when.weekday()]
+        tasks = week.get(day)
+        if tasks is None:
+            tasks = week[day] = tuple(task for task in self._tasks.get(day, ()) if task.occurs_on(when))
+        return tasks
+
+    def week(self, start):
+        """Return ``{day: tasks}`` for the week beginning on Monday ``start``."""
+        return {day: self.on(when) for day, when in week_dates(start).items()}
@@ -0,0 +1,138 @@
+"""Min-heap of upcoming task reminders.
+
+Every task with an occurrence still ahead has exactly one pending reminder:
+its next occurrence minus the lead time. The heap is keyed on that moment;
+MainWindow, or the ``workflow daemon`` command, waits for
+:meth:`ReminderSchedule.next_due` and calls :meth:`ReminderSchedule.pop_due`
+when it arrives. Both may run at once; only the one holding the
+:class:`SenderLock` sends what comes due.
+"""
+from datetime import datetime, timedelta
+import heapq
+import itertools
+
+from recurrence import next_occurrence
+from storage import FileLock
+
+SENDER_LOCK = 'reminders.lock'
+
+
+def reminder_text(task):
+    """The text message sent when ``task`` is due."""
+    return f"Reminder: {task.span} - {task.title}"
+
+
+class SenderLock:
+    """Whether this process is the one that sends reminders.
+
+    The first process to ask takes ``path`` and keeps it until
+    :meth:`release`. The others ask again at each reminder, so one of them
+    takes over once the sender exits.
+    """
+
+    def __init__(self, path=SENDER_LOCK):
+        self._lock = FileLock(path)
+        self._held = False
+
+    def held(self):
+        if not self._held:
+            self._held = self._lock.acquire(blocking=False)
+        return self._held
+
+    def release(self):
+        if self._held:
+            self._lock.release()
+            self._held = False
+
+
+class ReminderSchedule:
+    """Upcoming reminders with O(log n) add, amortized O(1) remove.
+
+    Removal only marks a task's heap entry as cancelled; cancelled entries
+    are dropped when they reach the top, and the heap is rebuilt once they
+    make up more than half of it.
+    """
+
+    def __init__(self, lead=timedelta(minutes=10)):
+        self.lead = lead
+        self._heap = []
+        self._entries = {}
+        self._cancelled = 0
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def reset(self, tasks, now=None):
+        """Rebuild the heap from a ``{day: tasks}`` schedule."""
+        now = now or datetime.now()
+        self._heap = []
+        self._entries = {}
+        self._cancelled = 0
+        for day, day_tasks in tasks.items():
+            for task in day_tasks:
+                entry = self._entry(day, task, now)
+                if entry is not None:
+                    self._entries[task] = entry
+                    self._heap.append(entry)
+        heapq.heapify(self._heap)
+
+    def add(self, day, task, now=None):
+        entry = self._entry(day, task, now or datetime.now())
+        if entry is not None:
+            self._entries[task] = entry
+            heapq.heappush(self._heap, entry)
+
+    def remove(self, task):
+        entry = self._entries.pop(task, None)
+        if entry is None:
+            return
+        entry[-1] = False
+        self._cancelled += 1
+        if self._cancelled > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if entry[-1]]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def next_due(self):
+        """Return when the earliest reminder is due, or None if there are none."""
+        self._drop_cancelled()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """Return ``(day, task)`` for every reminder due by ``now``.
+
+        Each returned task is rescheduled for its next occurrence after
+        ``now``, so a machine that slept through several only reminds once.
+        """
+        now = now or datetime.now()
+        due = []
+        while True:
+            self._drop_cancelled()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            _, _, day, task, _ = self._heap[0]
+            due.append((day, task))
+            replacement = self._entry(day, task, now)
+            if replacement is None:
+                del self._entries[task]
+                heapq.heappop(self._heap)
+            else:
+                self._entries[task] = replacement
+                heapq.heapreplace(self._heap, replacement)
+
+    def _drop_cancelled(self):
+        while self._heap and not self._heap[0][-1]:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+
+    def _entry(self, day, task, now):
+        # [due, tiebreak, day, task, active]; lists so remove() can cancel in
+        # place. None once the task has no occurrence left to remind about.
+        when = next_occurrence(day, task, now.date())
+        while when is not None:
+            due = datetime.combine(when, datetime.min.time()) + timedelta(minutes=task.minutes) - self.lead
+            if due > now:
+                return [due, next(self._counter), day, task, True]
+            when = next_occurrence(day, task, when + timedelta(days=1))
+        return None
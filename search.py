@@ -0,0 +1,208 @@
+"""In-memory inverted index for searching task descriptions and locations.
+
+Descriptions and locations are split into lowercase word tokens. Each token maps to the
+ids of the tasks containing it, and a sorted vocabulary turns a prefix into
+a contiguous range of tokens found with bisect. The index is kept current
+with :meth:`SearchIndex.add` and :meth:`SearchIndex.remove` and rebuilt
+from scratch with :meth:`SearchIndex.rebuild`.
+"""
+import bisect
+import heapq
+from operator import itemgetter
+import re
+import time
+
+from task_model import DAYS
+
+TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+class SearchIndex:
+    """Token postings for every task, kept current one task at a time.
+
+    Each token has a set of task ids, for intersecting query words, and a
+    list of rank keys ``(day, minutes, id)`` in sorted order, so a query can
+    walk matches best-first and stop once it has enough.
+
+    :meth:`rebuild` only records the schedule, so loading tasks never waits
+    on indexing. Call :meth:`build` with a time budget from an idle timer
+    to index it a slice at a time; a query before that finishes the rest.
+    """
+
+    # Tasks indexed between checks of the time budget
+    BUILD_CHUNK = 1000
+
+    def __init__(self):
+        self._postings = {}
+        self._ordered = {}
+        self._vocabulary = []
+        self._tasks = {}
+        self._pending = None
+        self._build = None
+
+    def __len__(self):
+        self.build()
+        return len(self._tasks)
+
+    def rebuild(self, tasks):
+        """Re-index a ``{day: tasks}`` schedule, as it stands once built."""
+        self._pending = tasks
+        self._build = None
+
+    def build(self, budget=None):
+        """Index the pending schedule, for at most about ``budget`` seconds
+        if given. Returns whether the index is complete."""
+        if self._pending is None:
+            return True
+        if self._build is None:
+            self._build = self._indexing(self._pending)
+        deadline = None if budget is None else time.perf_counter() + budget
+        for _ in self._build:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+        self._pending = self._build = None
+        return True
+
+    def _indexing(self, tasks):
+        # Yields every BUILD_CHUNK tasks; the index is only swapped in at the end.
+        entries = []
+        for day in sorted(tasks, key=lambda day: DAYS.index(day) if day in DAYS else len(DAYS)):
+            day_index = DAYS.index(day) if day in DAYS else len(DAYS)
+            day_entries = [((day_index, task.minutes, task.id), day, task) for task in tasks[day]]
+            # Appending in rank order leaves every token's list sorted.
+            day_entries.sort(key=itemgetter(0))
+            entries.extend(day_entries)
+            yield
+        postings = {}
+        ordered = {}
+        indexed = {}
+        for position, (key, day, task) in enumerate(entries, 1):
+            if position % self.BUILD_CHUNK == 0:
+                yield
+            tokens = frozenset(TOKEN.findall(task.title.lower()))
+            indexed[task.id] = (day, task, tokens, key)
+            for token in tokens:
+                ids = postings.get(token)
+                if ids is None:
+                    postings[token] = {task.id}
+                    ordered[token] = [key]
+                else:
+                    ids.add(task.id)
+                    ordered[token].append(key)
+        self._postings = postings
+        self._ordered = ordered
+        self._tasks = indexed
+        self._vocabulary = sorted(postings)
+
+    def add(self, day, task):
+        if self._pending is not None:
+            self._build = None  # The pending schedule has it; index that afresh
+            return
+        tokens = frozenset(tokenize(task.title))
+        key = self._rank_key(day, task)
+        self._tasks[task.id] = (day, task, tokens, key)
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                self._ordered[token] = []
+                bisect.insort(self._vocabulary, token)
+            ids.add(task.id)
+            bisect.insort(self._ordered[token], key)
+
+    def remove(self, task):
+        if self._pending is not None:
+            self._build = None
+            return
+        entry = self._tasks.pop(task.id, None)
+        if entry is None:
+            return
+        _, _, tokens, key = entry
+        for token in tokens:
+            ids = self._postings[token]
+            ids.discard(task.id)
+            if not ids:
+                del self._postings[token]
+                del self._ordered[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+            else:
+                ordered = self._ordered[token]
+                del ordered[bisect.bisect_left(ordered, key)]
+
+    def search(self, query, limit=50):
+        """Return up to ``limit`` ``(day, task)`` pairs matching every query word.
+
+        Each query word matches a task word it equals or is a prefix of. An
+        exact word scores 2 and a prefix scores 1; ties are broken by day
+        and start time.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        self.build()
+        groups = []
+        for term in terms:
+            tokens = self._matching_tokens(term)
+            if not tokens:
+                return []
+            groups.append((term, tokens))
+        # Drive the walk from the rarest word; the others only filter.
+        groups.sort(key=lambda group: sum(len(self._postings[token]) for token in group[1]))
+        (term, tokens), others = groups[0], groups[1:]
+
+        candidates = None
+        if others:
+            candidates = self._ids(tokens)
+            for _, other_tokens in others:
+                candidates = candidates & self._ids(other_tokens)
+                if not candidates:
+                    return []
+
+        best = 2 * len(terms)
+        exact = self._ordered.get(term, [])
+        prefixed = heapq.merge(*(self._ordered[token] for token in tokens if token != term))
+        results = []
+        seen = set()
+        for bound, stream in ((best, exact), (best - 1, prefixed)):
+            # Keys arrive in rank order, so once ``limit`` results from this
+            # stream reach its best possible score, nothing later in it can
+            # displace them. Earlier results only count if they beat it.
+            enough = sum(1 for score, _ in results if -score > bound)
+            if enough >= limit:
+                break
+            base = bound - best + 2
+            for key in stream:
+                task_id = key[2]
+                # A task with several words sharing the prefix comes up once
+                # per word.
+                if task_id in seen or candidates is not None and task_id not in candidates:
+                    continue
+                seen.add(task_id)
+                task_tokens = self._tasks[task_id][2]
+                score = base + sum(2 if other in task_tokens else 1 for other, _ in others)
+                results.append((-score, key))
+                if score >= bound:
+                    enough += 1
+                    if enough >= limit:
+                        break
+        results.sort()
+        return [self._tasks[key[2]][:2] for _, key in results[:limit]]
+
+    def _matching_tokens(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + '\U0010ffff', start)
+        return self._vocabulary[start:end]
+
+    def _ids(self, tokens):
+        # The posting set itself when there is only one; callers never mutate it.
+        if len(tokens) == 1:
+            return self._postings[tokens[0]]
+        return set().union(*(self._postings[token] for token in tokens))
+
+    @staticmethod
+    def _rank_key(day, task):
+        return (DAYS.index(day) if day in DAYS else len(DAYS), task.minutes, task.id)
@@ -0,0 +1,675 @@
+"""Persistence backends for the weekly task schedule.
+
+Every backend exposes the same three calls used by MainWindow:
+
+    tasks = storage.load()          # {day: DaySchedule}
+    storage.save(tasks, changes)    # persist, optionally as incremental changes
+    storage.close()
+
+``changes`` is a sequence of small records built with :func:`added`,
+:func:`removed` and :func:`updated`. Backends that cannot use them simply
+rewrite everything. Use :func:`open_storage` to pick a backend by name.
+
+Several processes may share one schedule. Each backend has a
+:class:`FileLock` as ``lock``; hold it around a load or save that must not
+interleave with another process's, and use ``watch_paths()`` to learn
+which files change when the schedule does. A backend may also rewrite
+those files by itself without changing the schedule, as compaction does;
+it tells the objects in its ``rewrite_observers`` first, through
+``before_rewrite()``, and after, through ``after_rewrite()``, with
+``lock`` held throughout.
+"""
+from datetime import date
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from task_model import (DAYS, Task, DaySchedule, Recurrence, legacy_task_id, new_task_id, parse_time,
+                        split_legacy_description)
+
+logger = logging.getLogger(__name__)
+
+
+def added(day, row, task):
+    return {'op': 'add', 'day': day, 'row': row, 'task': task.to_dict()}
+
+
+def removed(day, row, task):
+    return {'op': 'remove', 'day': day, 'row': row, 'id': task.id}
+
+
+def updated(day, row, task):
+    return {'op': 'set', 'day': day, 'row': row, 'id': task.id, 'completed': task.completed,
+            'rule': task.rule.to_dict() if task.rule is not None else None}
+
+
+def replaced(tasks):
+    return {'op': 'replace', 'tasks': schedule_to_dict(tasks)}
+
+
+def empty_schedule():
+    return {day: DaySchedule() for day in DAYS}
+
+
+def schedule_from_dict(tasks_dict):
+    tasks = empty_schedule()
+    for day, day_tasks in tasks_dict.items():
+        tasks[day] = DaySchedule(Task.from_dict(data, legacy_task_id(day, position, data))
+                                 for position, data in enumerate(day_tasks))
+    return tasks
+
+
+def schedule_to_dict(tasks):
+    return {day: [task.to_dict() for task in day_tasks] for day, day_tasks in tasks.items()}
+
+
+def apply_change(tasks, change):
+    """Apply one change record to ``tasks`` in place."""
+    op = change['op']
+    if op == 'replace':
+        tasks.clear()
+        tasks.update(schedule_from_dict(change['tasks']))
+        return
+    schedule = tasks.setdefault(change['day'], DaySchedule())
+    # Records written before tasks had ids only carry the row.
+    task = schedule.get(change['id']) if 'id' in change else None
+    if op == 'add':
+        schedule.insert(Task.from_dict(change['task']), change['row'])
+    elif op == 'remove':
+        schedule.pop(schedule.index(task) if task is not None else change['row'])
+    elif op == 'set':
+        task = task or schedule[change['row']]
+        task.completed = change['completed']
+        # Records written before recurrence rules only carry completion.
+        if 'rule' in change:
+            task.rule = Recurrence.from_dict(change['rule']) if change['rule'] else None
+    else:
+        raise ValueError(f"unknown change record: {op!r}")
+
+
+def write_atomic(path, data):
+    """Replace ``path`` with ``data`` so readers see either the old or new file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class FileLock:
+    """Advisory lock on ``path``, shared by every process that opens it.
+
+    Re-entrant: threads of one process take turns through an RLock, and the
+    OS lock is held while any of them is inside. Processes that do not
+    take the lock are not kept out.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def acquire(self, blocking=True):
+        """Take the lock; without ``blocking``, return False if it is held."""
+        if not self._lock.acquire(blocking):
+            return False
+        if self._depth == 0:
+            taken = False
+            try:
+                self._file = open(self.path, 'a+b')
+                taken = self._lock_file(blocking)
+            finally:
+                if not taken:
+                    if self._file is not None:
+                        self._file.close()
+                        self._file = None
+                    self._lock.release()
+            if not taken:
+                return False
+        self._depth += 1
+        return True
+
+    def _lock_file(self, blocking):
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                return False
+            return True
+        self._file.seek(0)
+        # LK_LOCK gives up after ten seconds; keep waiting.
+        while True:
+            try:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            self._file.close()
+            self._file = None
+        self._lock.release()
+
+
+class Storage:
+    """Base class for storage backends."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = FileLock(f"{path}.lock")
+        self.rewrite_observers = []
+
+    def watch_paths(self):
+        """Files whose contents change whenever the stored schedule does."""
+        return [self.path]
+
+    def load(self):
+        raise NotImplementedError
+
+    def save(self, tasks, changes=()):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonStorage(Storage):
+    """The whole schedule as one JSON document, rewritten on every save."""
+
+    def __init__(self, path='tasks.json'):
+        super().__init__(path)
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as file:
+                return schedule_from_dict(json.load(file))
+        except FileNotFoundError:
+            return empty_schedule()
+
+    def save(self, tasks, changes=()):
+        write_atomic(self.path, json.dumps(schedule_to_dict(tasks)).encode('utf-8'))
+
+
+class JournalStorage(Storage):
+    """A tasks.json snapshot plus an append-only journal of changes.
+
+    Each save appends its change records to ``<path>.journal`` and flushes
+    them to the OS, so its cost does not depend on the schedule size. A
+    background thread fsyncs the journal at most every ``sync_interval``
+    seconds. Once the journal holds ``compact_after`` records it is rotated
+    to ``<path>.journal.old`` and the thread writes a fresh snapshot, which
+    is atomically renamed over ``path`` before the old journal is deleted.
+
+    The first line of a journal names the snapshot it applies to (by hash),
+    or is null while it continues a rotated journal whose snapshot is not
+    written yet. Once that snapshot is in place the journal is rewritten
+    with its hash, so a journal is only ever rotated with a real base. That
+    lets ``load`` tell whether a crash happened before or after the
+    snapshot was replaced. The snapshot stays in the plain tasks.json format.
+    """
+
+    def __init__(self, path='tasks.json', sync_interval=1.0, compact_after=1000):
+        super().__init__(path)
+        self.journal_path = f"{path}.journal"
+        self.old_journal_path = f"{path}.journal.old"
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._journal = None
+        self._records = 0
+        self._dirty = False
+        self._pending_snapshot = None
+        self._base = None
+        self._rotated_base = None
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='journal-sync', daemon=True)
+        self._worker.start()
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            data = b''
+        snapshot_hash = hashlib.sha1(data).hexdigest()
+        tasks = schedule_from_dict(json.loads(data)) if data else empty_schedule()
+
+        recovered = None
+        old_exists, old_base, old_changes = self._read_journal(self.old_journal_path)
+        if old_exists and old_base == snapshot_hash:
+            # A compaction was interrupted before the snapshot was replaced.
+            # Finish it with exactly the state it was meant to capture.
+            self._replay(tasks, old_changes)
+            recovered = schedule_to_dict(tasks)
+            self._rotated_base = old_base
+        elif old_exists:
+            # The snapshot already absorbed it; only the delete was missed.
+            os.remove(self.old_journal_path)
+        exists, base, changes = self._read_journal(self.journal_path)
+        if exists and (base is None or base == snapshot_hash):
+            self._replay(tasks, changes)
+        else:
+            if changes:
+                logger.warning("Ignoring %s: %s changed outside the journal", self.journal_path, self.path)
+            exists = False
+            changes = []
+
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+            if exists:
+                self._journal = open(self.journal_path, 'a')
+                self._base = base
+                if base is None and recovered is None:
+                    # It continued a journal the snapshot has since absorbed.
+                    self._rebase(snapshot_hash)
+            else:
+                self._journal = open(self.journal_path, 'w')
+                self._write_header(None if recovered is not None else snapshot_hash)
+            self._records = len(changes)
+            if recovered is not None:
+                self._pending_snapshot = recovered
+                self._wakeup.notify()
+        return tasks
+
+    def save(self, tasks, changes=()):
+        if not changes:
+            # Without incremental records the whole state goes in one record.
+            changes = [replaced(tasks)]
+        with self._lock:
+            for change in changes:
+                self._journal.write(json.dumps(change, separators=(',', ':')) + '\n')
+            self._journal.flush()
+            self._records += len(changes)
+            self._dirty = True
+            if (self._records >= self.compact_after or changes[0]['op'] == 'replace') and self._can_rotate():
+                self._rotate(tasks)
+
+    def watch_paths(self):
+        return [self.path, self.journal_path]
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+        self._worker.join()
+        if self._journal is not None:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal.close()
+            self._journal = None
+
+    def _can_rotate(self):
+        return self._pending_snapshot is None and not os.path.exists(self.old_journal_path)
+
+    def _read_journal(self, path):
+        """Return ``(exists, base, changes)`` for the journal at ``path``."""
+        try:
+            with open(path, 'r') as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return False, None, []
+        try:
+            base = json.loads(lines[0])['base']
+        except (IndexError, ValueError, KeyError):
+            return False, None, []
+        changes = []
+        for line in lines[1:]:
+            try:
+                changes.append(json.loads(line))
+            except ValueError:
+                # A torn final write from a crash; everything before it is intact.
+                break
+        return True, base, changes
+
+    def _replay(self, tasks, changes):
+        for change in changes:
+            apply_change(tasks, change)
+
+    def _write_header(self, base):
+        self._journal.write(json.dumps({'base': base}) + '\n')
+        self._journal.flush()
+        self._base = base
+
+    def _rebase(self, base):
+        # Called with both locks held: rewrite the journal's header to name
+        # snapshot ``base``, keeping its records.
+        self._journal.close()
+        with open(self.journal_path, 'rb') as file:
+            file.readline()
+            records = file.read()
+        header = json.dumps({'base': base}) + '\n'
+        write_atomic(self.journal_path, header.encode('utf-8') + records)
+        self._journal = open(self.journal_path, 'a')
+        self._base = base
+
+    def _rotate(self, tasks):
+        # Called with the lock held. The journal's header already names the
+        # snapshot it applies to, so the rotated one does too.
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal.close()
+        os.replace(self.journal_path, self.old_journal_path)
+        self._rotated_base = self._base
+        self._journal = open(self.journal_path, 'w')
+        self._write_header(None)
+        self._records = 0
+        self._request_snapshot(tasks)
+
+    def _request_snapshot(self, tasks):
+        # Called with the lock held, on the saving thread: the worker only
+        # ever sees plain data, never Task objects the caller goes on editing.
+        self._pending_snapshot = schedule_to_dict(tasks)
+        self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            sync_fd = None
+            with self._lock:
+                if not self._closed and self._pending_snapshot is None:
+                    self._wakeup.wait(self.sync_interval)
+                if self._dirty and self._journal is not None:
+                    # fsync a duplicate descriptor outside the lock so saves
+                    # never wait on the disk, even if the journal is rotated.
+                    sync_fd = os.dup(self._journal.fileno())
+                    self._dirty = False
+                snapshot = self._pending_snapshot
+                closed = self._closed
+            try:
+                if sync_fd is not None:
+                    try:
+                        os.fsync(sync_fd)
+                    finally:
+                        os.close(sync_fd)
+                if snapshot is not None:
+                    self._write_snapshot(snapshot)
+            except Exception:
+                # Keep syncing for the rest of the session; an unfinished
+                # compaction is completed by the next load.
+                logger.exception("Syncing %s failed", self.journal_path)
+            if snapshot is not None:
+                with self._lock:
+                    self._pending_snapshot = None
+            if closed:
+                return
+
+    def _write_snapshot(self, snapshot):
+        try:
+            # Under the file lock, so another process never reads the new
+            # snapshot together with the old journal it already absorbed.
+            with self.lock:
+                exists, base, _ = self._read_journal(self.old_journal_path)
+                if not exists or base != self._rotated_base:
+                    return  # Another process finished this compaction first
+                for observer in self.rewrite_observers:
+                    observer.before_rewrite()
+                try:
+                    data = json.dumps(snapshot).encode('utf-8')
+                    write_atomic(self.path, data)
+                    # Only now can the live journal name its base; until then
+                    # a crash leaves it null, continuing the old journal.
+                    with self._lock:
+                        if self._journal is not None:
+                            self._rebase(hashlib.sha1(data).hexdigest())
+                    os.remove(self.old_journal_path)
+                finally:
+                    for observer in self.rewrite_observers:
+                        observer.after_rewrite()
+        except OSError:
+            logger.exception("Compacting %s failed; the journal is kept for replay", self.path)
+
+
+class SqliteStorage(Storage):
+    """One row per task in an SQLite database in WAL mode.
+
+    Rows are indexed by (day, minutes, seq) and by completion state, so
+    saves touch only the changed rows and callers that need a slice of the
+    schedule can query it without loading the rest. ``seq`` records insertion
+    order and breaks ties between tasks that start at the same minute,
+    matching the order DaySchedule keeps in memory. ``uid`` holds the Task id
+    and has a unique index, so changes address their row directly. ``date``
+    is an ISO date and ``rule`` a JSON-encoded Recurrence, both nullable, as
+    is ``end_minutes``.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            uid TEXT,
+            day TEXT NOT NULL,
+            minutes INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            is_permanent INTEGER NOT NULL,
+            completed INTEGER NOT NULL,
+            date TEXT,
+            rule TEXT,
+            end_minutes INTEGER,
+            location TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS tasks_day_time ON tasks (day, minutes, seq);
+        CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed, is_permanent);
+    """
+
+    def __init__(self, path='tasks.db'):
+        super().__init__(path)
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(self.SCHEMA)
+        self._add_uids()
+        self._add_dates()
+        self._add_ranges()
+        self._seq = self._db.execute('SELECT COALESCE(MAX(seq), 0) FROM tasks').fetchone()[0]
+
+    def load(self):
+        tasks = {day: [] for day in DAYS}
+        rows = self._db.execute(
+            'SELECT day, uid, minutes, description, is_permanent, completed, date, rule, end_minutes, location '
+            'FROM tasks ORDER BY day, minutes, seq')
+        for row in rows:
+            tasks.setdefault(row[0], []).append(self._task(row[1:]))
+        return {day: DaySchedule(day_tasks) for day, day_tasks in tasks.items()}
+
+    def save(self, tasks, changes=()):
+        with self._db:
+            if not changes:
+                self._replace(tasks)
+            for change in changes:
+                self._apply(change)
+
+    def watch_paths(self):
+        # Commits land in the write-ahead log until a checkpoint.
+        return [self.path, f"{self.path}-wal"]
+
+    def close(self):
+        self._db.close()
+
+    def day_tasks(self, day):
+        """Return one day's tasks in order, reading only that day's rows."""
+        rows = self._db.execute(
+            'SELECT uid, minutes, description, is_permanent, completed, date, rule, end_minutes, location '
+            'FROM tasks WHERE day = ? ORDER BY minutes, seq', (day,))
+        return [self._task(row) for row in rows]
+
+    @staticmethod
+    def _task(row):
+        uid, minutes, description, is_permanent, completed, when, rule, end_minutes, location = row
+        task = Task.__new__(Task)
+        task.id = uid
+        task.minutes = minutes
+        task.end_minutes = end_minutes
+        task.location = location
+        task.description = description
+        task.is_permanent = bool(is_permanent)
+        task.completed = bool(completed)
+        task.date = date.fromisoformat(when) if when else None
+        if rule:
+            task.rule = Recurrence.from_dict(json.loads(rule))
+        else:
+            task.rule = Recurrence() if task.is_permanent else None
+        return task
+
+    def _add_uids(self):
+        # Databases created before tasks had ids lack the uid column.
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(tasks)')}
+        with self._db:
+            if 'uid' not in columns:
+                self._db.execute('ALTER TABLE tasks ADD COLUMN uid TEXT')
+            missing = self._db.execute('SELECT id FROM tasks WHERE uid IS NULL').fetchall()
+            self._db.executemany('UPDATE tasks SET uid = ? WHERE id = ?',
+                                 [(new_task_id(), row_id) for row_id, in missing])
+            self._db.execute('CREATE UNIQUE INDEX IF NOT EXISTS tasks_uid ON tasks (uid)')
+
+    def _add_dates(self):
+        # Databases created before dated tasks lack the date and rule columns.
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(tasks)')}
+        with self._db:
+            for column in ('date', 'rule'):
+                if column not in columns:
+                    self._db.execute(f'ALTER TABLE tasks ADD COLUMN {column} TEXT')
+
+    def _add_ranges(self):
+        # Databases created before tasks had end times lack these columns;
+        # their class times are recovered from the descriptions.
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(tasks)')}
+        if 'end_minutes' in columns:
+            return
+        with self._db:
+            self._db.execute('ALTER TABLE tasks ADD COLUMN end_minutes INTEGER')
+            self._db.execute("ALTER TABLE tasks ADD COLUMN location TEXT NOT NULL DEFAULT ''")
+            updates = []
+            for row_id, minutes, text in self._db.execute('SELECT id, minutes, description FROM tasks'):
+                description, end, location = split_legacy_description(text)
+                if end is not None and parse_time(end) > minutes:
+                    updates.append((description, parse_time(end), location, row_id))
+            self._db.executemany(
+                'UPDATE tasks SET description = ?, end_minutes = ?, location = ? WHERE id = ?', updates)
+
+    def _row_id(self, change):
+        if 'id' in change:
+            row = self._db.execute('SELECT id FROM tasks WHERE uid = ?', (change['id'],)).fetchone()
+        else:
+            row = self._db.execute(
+                'SELECT id FROM tasks WHERE day = ? ORDER BY minutes, seq LIMIT 1 OFFSET ?',
+                (change['day'], change['row'])).fetchone()
+        return row[0]
+
+    def _insert(self, day, task):
+        self._seq += 1
+        self._db.execute(
+            'INSERT INTO tasks (uid, day, minutes, seq, description, is_permanent, completed, date, rule, '
+            'end_minutes, location) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (task.id, day, task.minutes, self._seq, task.description, task.is_permanent, task.completed,
+             task.date.isoformat() if task.date else None, self._rule(task.rule), task.end_minutes,
+             task.location))
+
+    @staticmethod
+    def _rule(rule):
+        return json.dumps(rule.to_dict()) if rule is not None else None
+
+    def _replace(self, tasks):
+        self._db.execute('DELETE FROM tasks')
+        for day, day_tasks in tasks.items():
+            for task in day_tasks:
+                self._insert(day, task)
+
+    def _apply(self, change):
+        op = change['op']
+        if op == 'replace':
+            self._replace(schedule_from_dict(change['tasks']))
+        elif op == 'add':
+            self._insert(change['day'], Task.from_dict(change['task']))
+        elif op == 'remove':
+            self._db.execute('DELETE FROM tasks WHERE id = ?', (self._row_id(change),))
+        elif op == 'set':
+            row_id = self._row_id(change)
+            self._db.execute('UPDATE tasks SET completed = ? WHERE id = ?', (change['completed'], row_id))
+            if 'rule' in change:
+                rule = Recurrence.from_dict(change['rule']) if change['rule'] else None
+                self._db.execute('UPDATE tasks SET rule = ? WHERE id = ?', (self._rule(rule), row_id))
+        else:
+            raise ValueError(f"unknown change record: {op!r}")
+
+
+BACKENDS = {
+    'json': JsonStorage,
+    'journal': JournalStorage,
+    'sqlite': SqliteStorage,
+}
+
+# The backend MainWindow and the workflow CLI share; one of BACKENDS. Set
+# WORKFLOW_STORAGE (e.g. to sqlite) to switch both.
+DEFAULT_BACKEND = os.environ.get('WORKFLOW_STORAGE') or 'journal'
+
+
+def open_storage(backend=None, path=None):
+    """Create the storage backend registered under ``backend``, by default
+    :data:`DEFAULT_BACKEND`."""
+    backend = backend or DEFAULT_BACKEND
+    try:
+        storage_class = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"unknown storage backend: {backend!r}") from None
+    return storage_class() if path is None else storage_class(path)
+
+
+def migrate_json_to_sqlite(json_path='tasks.json', db_path='tasks.db'):
+    """Copy a tasks.json schedule (and any pending journal) into SQLite.
+
+    Returns the number of tasks written. Existing rows in the database are
+    replaced.
+    """
+    source = JournalStorage(json_path)
+    try:
+        tasks = source.load()
+    finally:
+        source.close()
+    target = SqliteStorage(db_path)
+    try:
+        target.save(tasks)
+    finally:
+        target.close()
+    return sum(len(day_tasks) for day_tasks in tasks.values())
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'migrate':
+        sys.exit("usage: python storage.py migrate [tasks.json] [tasks.db]")
+    count = migrate_json_to_sqlite(*sys.argv[2:4])
+    print(f"Migrated {count} tasks")
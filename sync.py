@@ -0,0 +1,146 @@
+"""Keeping one process's schedule in step with edits made by others.
+
+:class:`SyncState` remembers how the schedule stood on disk when this
+process last loaded or saved it, and a signature of the storage files. When
+the signature no longer matches, someone else has written. :func:`merge`
+then combines their schedule with ours task by task, relative to that
+common base, so concurrent edits to different tasks are all kept. When both
+sides changed the same task, fields only one side changed are combined and
+ours win where both changed the same field, since ours are written last.
+
+Right after a load or save the base is our own schedule, so it is not
+copied; only the tasks we change before the next save have their on-disk
+version recorded, through :meth:`SyncState.before_change` and
+:meth:`SyncState.added`. The storage's own compactions rewrite its files
+without changing the schedule, so they are not taken for outside writes.
+"""
+import os
+
+from task_model import DaySchedule, Task
+
+
+def signature(paths):
+    """A cheap fingerprint of ``paths`` that changes whenever one is written."""
+    result = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            result.append(None)
+        else:
+            result.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    return tuple(result)
+
+
+def snapshot(tasks):
+    """Return ``{(day, task id): task dict}`` for a ``{day: DaySchedule}`` week."""
+    return {(day, task.id): task.to_dict() for day, day_tasks in tasks.items() for task in day_tasks}
+
+
+class SyncState:
+    """How the schedule in ``store`` stood when this process last synced."""
+
+    def __init__(self, store):
+        self.paths = store.watch_paths()
+        self.signature = None
+        # (day, task id) -> on-disk task dict, or None if it is not on disk,
+        # for every task changed since the last sync.
+        self.before = {}
+        self._current = False
+        store.rewrite_observers.append(self)
+
+    def before_change(self, day, task):
+        """Call before editing or removing ``task``."""
+        self.before.setdefault((day, task.id), task.to_dict())
+
+    def added(self, day, task):
+        """Call after adding ``task``."""
+        self.before.setdefault((day, task.id), None)
+
+    def synced(self, before=None):
+        """Record that our schedule now matches storage, apart from ``before``."""
+        self.before = before or {}
+        self.signature = signature(self.paths)
+
+    def stale(self):
+        """Whether another process has written since our last load or save."""
+        return signature(self.paths) != self.signature
+
+    def before_rewrite(self):
+        # Called by the storage, with its lock held, before it rewrites its
+        # own files.
+        self._current = not self.stale()
+
+    def after_rewrite(self):
+        # Same schedule, new files: still current if we were before.
+        if self._current:
+            self.signature = signature(self.paths)
+
+
+def _merge_task(base, mine, theirs):
+    """Merge one task's dicts; any may be None for a task absent on that side."""
+    if mine == theirs:
+        return mine
+    if mine == base:
+        return theirs
+    if theirs == base:
+        return mine
+    if mine is None or theirs is None:
+        # Deleted on one side and edited on the other: keep the edit.
+        return mine if mine is not None else theirs
+    if base is None:
+        return mine
+    return {field: mine[field] if mine[field] != base.get(field) else theirs[field] for field in mine}
+
+
+def merge(before, mine, theirs):
+    """Merge two ``{day: DaySchedule}`` weeks that started from a common base.
+
+    ``before`` is :attr:`SyncState.before`: the base differs from ``mine``
+    only there. Returns ``(merged, days, pending)``: the merged week, which
+    reuses the Task objects of ``mine`` or ``theirs`` wherever a task came
+    through unchanged; the days whose tasks differ from ``mine``; and, in
+    the form of ``before``, where the merged week differs from ``theirs``.
+    """
+    mine_data, theirs_data = snapshot(mine), snapshot(theirs)
+    mine_objects = {(day, task.id): task for day, day_tasks in mine.items() for task in day_tasks}
+    theirs_objects = {(day, task.id): task for day, day_tasks in theirs.items() for task in day_tasks}
+
+    # Their order first, then tasks only we have; DaySchedule keeps it for ties.
+    keys = list(theirs_data)
+    keys.extend(key for key in mine_data if key not in theirs_data)
+    merged = {day: [] for day in set(mine) | set(theirs)}
+    pending = {}
+    for key in keys:
+        base = before[key] if key in before else mine_data.get(key)
+        data = _merge_task(base, mine_data.get(key), theirs_data.get(key))
+        if data != theirs_data.get(key):
+            pending[key] = theirs_data.get(key)
+        if data is None:
+            continue
+        if data == mine_data.get(key):
+            task = mine_objects[key]
+        elif data == theirs_data.get(key):
+            task = theirs_objects[key]
+        else:
+            task = Task.from_dict(data)
+        merged[key[0]].append(task)
+
+    merged = {day: DaySchedule(day_tasks) for day, day_tasks in merged.items()}
+    days = {day for day in merged
+            if [id(task) for task in merged[day]] != [id(task) for task in mine.get(day, ())]}
+    return merged, days, pending
+
+
+def reload(store, state, tasks):
+    """Merge what others wrote to ``store`` into ``tasks``.
+
+    Call with ``store.lock`` held. Returns ``(merged, days, dirty)``; when
+    ``dirty`` the merged week holds edits of ours that are not on disk yet;
+    if ``days`` is empty too, records made against the old schedule still
+    apply to the stored one.
+    """
+    theirs = store.load()
+    merged, days, pending = merge(state.before, tasks, theirs)
+    state.synced(pending)
+    return merged, days, bool(pending)
@@ -0,0 +1,315 @@
+"""Qt-free task records and per-day schedules shared by the UI and storage."""
+from datetime import date, datetime
+import bisect
+import functools
+import re
+import uuid
+
+from intervals import IntervalIndex
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+@functools.lru_cache(maxsize=2048)
+def parse_time(text):
+    """Return a "hh:mm AP" time string as minutes since midnight.
+
+    There are only 1440 distinct times, so results are cached; loading or
+    importing many tasks parses each distinct time once.
+    """
+    parsed = datetime.strptime(text, "%I:%M %p")
+    return parsed.hour * 60 + parsed.minute
+
+
+def format_time(minutes):
+    """Return minutes since midnight as a "hh:mm AP" time string."""
+    hour, minute = divmod(minutes, 60)
+    return f"{hour % 12 or 12:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def new_task_id():
+    return uuid.uuid4().hex
+
+
+def legacy_task_id(day, position, data):
+    """Derive a stable id for a task saved before tasks had ids.
+
+    The id only depends on where the task sits in the saved file, so it is
+    the same on every load until the file is rewritten with real ids.
+    """
+    name = f"{day}/{position}/{data['time']}/{data['description']}"
+    return uuid.uuid5(uuid.NAMESPACE_URL, name).hex
+
+
+# "Phys Mech @ RGC 013 (4:00 PM - 5:15PM)": how class times were written
+# before tasks had end times and locations.
+LEGACY_RANGE = re.compile(
+    r'^(?P<description>.*?)(?:\s*@\s*(?P<location>[^()]*?))?\s*'
+    r'\(\s*\d{1,2}:\d{2}\s*[AP]M\s*-\s*(?P<end>\d{1,2}:\d{2})\s*(?P<meridiem>[AP]M)\s*\)\s*$',
+    re.IGNORECASE)
+
+
+def split_legacy_description(description):
+    """Return ``(description, end, location)`` from a description with an embedded time range.
+
+    ``end`` is a "hh:mm AP" string, or None when there is no range to split.
+    """
+    match = LEGACY_RANGE.match(description)
+    if match is None or not match['description']:
+        return description, None, ''
+    end = f"{int(match['end'].split(':')[0]):02d}:{match['end'].split(':')[1]} {match['meridiem'].upper()}"
+    return match['description'], end, match['location'] or ''
+
+
+def _parse_date(text):
+    return date.fromisoformat(text) if text else None
+
+
+def _format_date(value):
+    return value.isoformat() if value else None
+
+
+class Recurrence:
+    """How a permanent task repeats on its schedule's weekday.
+
+    The task occurs every ``interval`` weeks counting from the week of
+    ``start`` (every week when ``start`` is None), not after ``until``, and
+    never on a date in ``exceptions``.
+    """
+    __slots__ = ('interval', 'start', 'until', 'exceptions')
+
+    def __init__(self, interval=1, start=None, until=None, exceptions=()):
+        self.interval = interval
+        self.start = start
+        self.until = until
+        self.exceptions = set(exceptions)
+
+    def occurs_on(self, when):
+        """Whether a ``when`` falling on the task's weekday is an occurrence."""
+        if self.start is not None:
+            if when < self.start or (when - self.start).days // 7 % self.interval:
+                return False
+        if self.until is not None and when > self.until:
+            return False
+        return when not in self.exceptions
+
+    def to_dict(self):
+        return {
+            'interval': self.interval,
+            'start': _format_date(self.start),
+            'until': _format_date(self.until),
+            'exceptions': sorted(_format_date(when) for when in self.exceptions)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            interval=data['interval'],
+            start=_parse_date(data['start']),
+            until=_parse_date(data['until']),
+            exceptions=[_parse_date(when) for when in data['exceptions']]
+        )
+
+
+class Task:
+    """One scheduled task.
+
+    A one-off task has a ``date``; a permanent task has a Recurrence
+    ``rule``. Tasks saved before either existed have neither and occur every
+    week on their day.
+
+    A task with an ``end`` time occupies the range from its start to its
+    end; without one it is a point in time, like a reminder.
+    """
+    __slots__ = ('id', 'description', 'minutes', 'end_minutes', 'location', 'is_permanent', 'completed',
+                 'date', 'rule')
+
+    def __init__(self, description, time, is_permanent=False, completed=False, id=None,
+                 date=None, rule=None, end=None, location=''):
+        self.id = id or new_task_id()
+        self.description = description
+        self.minutes = parse_time(time)
+        self.end_minutes = parse_time(end) if end else None
+        if self.end_minutes is not None and self.end_minutes <= self.minutes:
+            raise ValueError(f"{description!r} ends at {end}, before it starts at {time}")
+        self.location = location
+        self.is_permanent = is_permanent
+        self.completed = completed
+        self.date = date
+        self.rule = rule if rule is not None or not is_permanent else Recurrence()
+
+    @property
+    def time(self):
+        return format_time(self.minutes)
+
+    @property
+    def end(self):
+        return format_time(self.end_minutes) if self.end_minutes is not None else None
+
+    @property
+    def span(self):
+        """"hh:mm AP - hh:mm AP", or just the start time without an end."""
+        return f"{self.time} - {self.end}" if self.end_minutes is not None else self.time
+
+    @property
+    def title(self):
+        """The description, followed by the location if there is one."""
+        return f"{self.description} @ {self.location}" if self.location else self.description
+
+    def occurs_on(self, when):
+        """Whether the task happens on ``when``, a date on its schedule's weekday."""
+        if self.date is not None:
+            return self.date == when
+        if self.rule is not None:
+            return self.rule.occurs_on(when)
+        return True
+
+    def content_key(self):
+        """What makes two tasks on the same day exact duplicates."""
+        return (self.minutes, self.description, self.is_permanent, self.date, self.end_minutes, self.location)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'description': self.description,
+            'time': self.time,
+            'is_permanent': self.is_permanent,
+            'completed': self.completed,
+            'date': _format_date(self.date),
+            'rule': self.rule.to_dict() if self.rule is not None else None,
+            'end': self.end,
+            'location': self.location
+        }
+
+    @classmethod
+    def from_dict(cls, data, default_id=None):
+        description, end, location = data['description'], data.get('end'), data.get('location', '')
+        if 'end' not in data:
+            # Saved before tasks had end times; recover one from the description.
+            split = split_legacy_description(description)
+            if split[1] is not None and parse_time(split[1]) > parse_time(data['time']):
+                description, end, location = split
+        return cls(
+            description=description,
+            time=data['time'],
+            is_permanent=data['is_permanent'],
+            completed=data['completed'],
+            id=data.get('id', default_id),
+            date=_parse_date(data.get('date')),
+            rule=Recurrence.from_dict(data['rule']) if data.get('rule') else None,
+            end=end,
+            location=location
+        )
+
+
+class DaySchedule:
+    """Tasks for one weekday, always ordered by start time.
+
+    Start times are parsed once when a Task is created, so keeping the order
+    is a bisect per insert or removal rather than a re-sort on every repaint.
+    Tasks sharing a start time keep their insertion order.
+
+    Tasks are also indexed by id and by content key, so lookups and
+    duplicate checks are dictionary hits, and by time range for
+    :meth:`conflicts` and :meth:`free`.
+    """
+
+    def __init__(self, tasks=()):
+        self._tasks = sorted(tasks, key=lambda task: task.minutes)
+        self._keys = [task.minutes for task in self._tasks]
+        self._by_id = {}
+        self._by_content = {}
+        self._ranges = IntervalIndex()
+        for task in self._tasks:
+            self._index(task)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        return iter(self._tasks)
+
+    def __getitem__(self, row):
+        return self._tasks[row]
+
+    def get(self, task_id):
+        """Return the task with ``task_id``, or None."""
+        return self._by_id.get(task_id)
+
+    def find_duplicate(self, task):
+        """Return a scheduled task with the same content as ``task``, or None."""
+        matches = self._by_content.get(task.content_key())
+        return matches[0] if matches else None
+
+    def conflicts(self, task):
+        """Return scheduled tasks whose time ranges overlap ``task`` on a date both fall on."""
+        return self._ranges.conflicts(task)
+
+    def free(self, when, length, earliest=0, latest=24 * 60):
+        """Yield ``(start, end)`` minute ranges of ``length`` or more free on date ``when``."""
+        return self._ranges.free(when, length, earliest, latest)
+
+    def insertion_point(self, task):
+        return bisect.bisect_right(self._keys, task.minutes)
+
+    def insert(self, task, row=None):
+        if row is None:
+            row = self.insertion_point(task)
+        self._tasks.insert(row, task)
+        self._keys.insert(row, task.minutes)
+        self._index(task)
+        return row
+
+    def insert_many(self, tasks):
+        """Insert several tasks at once and return their ``(row, task)`` pairs in row order.
+
+        The result matches inserting them one by one, but costs a single
+        merge instead of a list insert per task.
+        """
+        tasks = list(tasks)
+        added = {id(task) for task in tasks}
+        # Stable sort: ties keep existing tasks first, then the new ones in order.
+        self._tasks.extend(tasks)
+        self._tasks.sort(key=lambda task: task.minutes)
+        self._keys = [task.minutes for task in self._tasks]
+        for task in tasks:
+            self._index(task)
+        return [(row, task) for row, task in enumerate(self._tasks) if id(task) in added]
+
+    def index(self, task):
+        row = bisect.bisect_left(self._keys, task.minutes)
+        while row < len(self._tasks) and self._keys[row] == task.minutes:
+            if self._tasks[row] is task:
+                return row
+            row += 1
+        raise ValueError("task is not scheduled on this day")
+
+    def pop(self, row):
+        del self._keys[row]
+        task = self._tasks.pop(row)
+        del self._by_id[task.id]
+        self._ranges.remove(task)
+        matches = self._by_content[task.content_key()]
+        matches.remove(task)
+        if not matches:
+            del self._by_content[task.content_key()]
+        return task
+
+    def remove(self, task):
+        row = self.index(task)
+        self.pop(row)
+        return row
+
+    def _index(self, task):
+        self._by_id[task.id] = task
+        self._ranges.add(task)
+        self._by_content.setdefault(task.content_key(), []).append(task)
+
+
+def find_task(tasks, task_id):
+    """Return ``(day, task)`` for ``task_id`` in a ``{day: DaySchedule}`` week."""
+    for day, schedule in tasks.items():
+        task = schedule.get(task_id)
+        if task is not None:
+            return day, task
+    return None, None
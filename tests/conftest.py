@@ -0,0 +1,51 @@
+"""Shared setup for the unit tests.
+
+Run from the repository root:
+
+    python -m pytest tests
+
+Qt tests use the offscreen platform.
+"""
+import os
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """The QApplication for tests of Qt widgets and models."""
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    """A MainWindow working in ``tmp_path``, with weather and texts stubbed.
+
+    Put a schedule in ``tmp_path / 'tasks.json'`` before asking for it.
+    """
+    from PyQt5 import sip
+    import main
+    import messaging
+    import weather
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(weather.WeatherClient, 'fetch', lambda self: {})
+    monkeypatch.setattr(weather.WeatherClient, 'cached_forecast', lambda self: weather.Forecast())
+    monkeypatch.setattr(weather.WeatherClient, 'fetch_forecast', lambda self: weather.Forecast())
+    monkeypatch.setattr(messaging.TwilioTransport, 'send', lambda self, body: None)
+    window = main.MainWindow()
+    window.show()
+    qapp.processEvents()
+    yield window
+    if window.isVisible():  # Unless the test closed it
+        window.close()
+    # Destroy the widgets on this thread, not in a later garbage collection
+    # on a worker thread, which Qt aborts on.
+    sip.delete(window)
+    qapp.processEvents()
@@ -0,0 +1,25 @@
+from datetime import date
+
+import activity
+
+
+def test_two_logs_share_a_directory(tmp_path):
+    # The window and a `workflow add` log to the same directory at once.
+    directory = str(tmp_path / 'activity')
+    window = activity.ActivityLog(directory, max_segment_bytes=200)
+    command = activity.ActivityLog(directory, max_segment_bytes=200)
+    for number in range(6):
+        window.record('add', 'Monday', description=f"window {number}")
+        window.flush()
+        command.record('remove', 'Tuesday', description=f"command {number}")
+        command.flush()
+
+    today = date.today()
+    for log in (window, command):
+        entries = log.query(today, today)
+        assert sorted(entry['description'] for entry in entries) == sorted(
+            [f"window {number}" for number in range(6)] + [f"command {number}" for number in range(6)])
+        assert [entry['description'] for entry in log.query(action='remove')] == [
+            f"command {number}" for number in range(6)]
+    window.close()
+    command.close()
@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+import gzip
+import json
+import os
+
+import pytest
+
+import archive
+import storage
+from task_model import DAYS, DaySchedule, Recurrence, Task
+
+
+def test_tasks_are_filed_in_monthly_segments(tmp_path):
+    store = archive.TaskArchive(str(tmp_path))
+    september = Task("Essay", '09:00 AM', date=date(2026, 9, 28), completed=True)
+    october = Task("Lab", '02:00 PM', date=date(2026, 10, 5))
+    early = Task("Lecture", '08:00 AM', date=date(2026, 10, 5))
+    store.add([('Monday', september), ('Monday', october)], today=date(2026, 10, 18))
+    store.add([('Monday', early)], today=date(2026, 10, 18))
+
+    assert sorted(os.listdir(tmp_path)) == ['manifest.json', 'tasks-2026-09.jsonl.gz', 'tasks-2026-10.jsonl.gz']
+    with gzip.open(tmp_path / 'tasks-2026-10.jsonl.gz', 'rt') as file:
+        assert [json.loads(line)['task']['description'] for line in file] == ["Lab", "Lecture"]
+    assert [task.description for task in store.on(date(2026, 10, 5))] == ["Lecture", "Lab"]
+    assert [task.description for task in store.on(date(2026, 9, 28))] == ["Essay"]
+    assert store.on(date(2026, 10, 6)) == ()
+
+
+def test_recurring_task_is_filed_under_its_last_occurrence(tmp_path):
+    store = archive.TaskArchive(str(tmp_path))
+    task = Task("Seminar", '10:00 AM', rule=Recurrence(start=date(2026, 9, 1), until=date(2026, 10, 1)))
+    store.add([('Wednesday', task)], today=date(2026, 10, 18))
+    assert store.week(date(2026, 9, 28))['Wednesday'][0].id == task.id
+
+
+def test_manifest_round_trips(tmp_path):
+    store = archive.TaskArchive(str(tmp_path))
+    store.add([('Monday', Task("Essay", '09:00 AM', date=date(2026, 9, 28), completed=True)),
+               ('Monday', Task("Lab", '02:00 PM', date=date(2026, 10, 5))),
+               ('Tuesday', Task("Quiz", '11:00 AM', date=date(2026, 10, 6), completed=True))],
+              today=date(2026, 10, 18))
+    with open(tmp_path / 'manifest.json') as file:
+        assert json.load(file) == {'2026-09': {'2026-09-28': [1, 1]},
+                                   '2026-10': {'2026-10-05': [1, 0], '2026-10-06': [1, 1]}}
+
+    reopened = archive.TaskArchive(str(tmp_path))
+    assert len(reopened) == 3
+    assert reopened.stats() == (3, 2)
+    assert reopened.stats(date(2026, 10, 1), date(2026, 10, 5)) == (1, 0)
+    assert [task.description for task in reopened.on(date(2026, 10, 6))] == ["Quiz"]
+
+    # An archive already open picks up what another one added.
+    reopened.add([('Tuesday', Task("Exam", '09:00 AM', date=date(2026, 10, 6)))], today=date(2026, 10, 18))
+    assert len(store) == 4
+    assert [task.description for task in store.on(date(2026, 10, 6))] == ["Exam", "Quiz"]
+
+
+def test_segment_survives_a_repeat_and_a_cut_short_member(tmp_path):
+    store = archive.TaskArchive(str(tmp_path))
+    task = Task("Lab", '02:00 PM', date=date(2026, 10, 5))
+    store.add([('Monday', task)], today=date(2026, 10, 18))
+    store.add([('Monday', task)], today=date(2026, 10, 18))
+    assert [archived.id for archived in store.on(date(2026, 10, 5))] == [task.id]
+
+    path = tmp_path / 'tasks-2026-10.jsonl.gz'
+    with open(path, 'ab') as file:
+        file.write(gzip.compress(b'{"date": "2026-10-05"')[:-8])
+    assert [archived.id for archived in archive.TaskArchive(str(tmp_path)).on(date(2026, 10, 5))] == [task.id]
+
+
+def test_decoded_segments_are_bounded(tmp_path):
+    store = archive.TaskArchive(str(tmp_path), max_segments=2)
+    store.add([('Monday', Task(f"Task {month}", '09:00 AM', date=date(2026, month, 1))) for month in (1, 2, 3)],
+              today=date(2026, 10, 18))
+    for month in (1, 2, 3, 2):
+        store.on(date(2026, month, 1))
+    assert list(store._segments) == ['2026-03', '2026-02']
+
+
+def test_expired_keeps_what_still_happens():
+    horizon = date(2026, 10, 12)
+    past = Task("Lab", '02:00 PM', date=date(2026, 10, 5))
+    ended = Task("Seminar", '10:00 AM', rule=Recurrence(until=date(2026, 10, 7)))
+    tasks = {day: DaySchedule() for day in DAYS}
+    tasks['Monday'].insert(past)
+    tasks['Monday'].insert(Task("Exam", '09:00 AM', date=horizon))
+    tasks['Wednesday'].insert(ended)
+    tasks['Wednesday'].insert(Task("Lecture", '09:00 AM', rule=Recurrence()))
+    tasks['Friday'].insert(Task("Gym", '06:00 PM', rule=Recurrence(until=date(2026, 10, 16))))
+    assert archive.expired(tasks, horizon) == [('Monday', past), ('Wednesday', ended)]
+
+
+class NextWeek(date):
+    @classmethod
+    def today(cls):
+        return date.today() + timedelta(days=7)
+
+
+@pytest.fixture
+def scheduled(tmp_path):
+    task = Task("Physics Lab", '02:00 PM', date=date.today())
+    tasks = {day: DaySchedule() for day in DAYS}
+    tasks[DAYS[date.today().weekday()]].insert(task)
+    storage.JsonStorage(str(tmp_path / 'tasks.json')).save(tasks)
+    return task
+
+
+def test_rollover_into_a_new_week_archives_past_tasks(scheduled, window, monkeypatch):
+    import main
+    day = DAYS[date.today().weekday()]
+    assert window.tasks[day].get(scheduled.id) is not None
+    monkeypatch.setattr(main, 'date', NextWeek)
+    window.roll_over_day()
+    assert window.tasks[day].get(scheduled.id) is None
+    assert [task.id for task in window.archive.on(scheduled.date)] == [scheduled.id]
+    window.close()
+
+    store = storage.open_storage()
+    assert [task for day_tasks in store.load().values() for task in day_tasks] == []
+    store.close()
@@ -0,0 +1,115 @@
+from datetime import date
+
+import pytest
+
+import storage
+from task_model import DAYS, DaySchedule, Task
+
+
+@pytest.fixture
+def bus(qapp):
+    import main
+    saves, published = [], []
+    bus = main.ChangeBus(lambda *records: saves.append(records))
+    bus.changed.connect(lambda days, rows, tasks: published.append((days, rows, tasks)))
+    yield bus, saves, published
+    bus.deleteLater()
+
+
+def wait(milliseconds):
+    from PyQt5.QtTest import QTest
+    QTest.qWait(milliseconds)
+
+
+def test_marks_in_one_turn_are_published_once(bus):
+    bus, saves, published = bus
+    first, second, third = Task("a", '09:00 AM'), Task("b", '10:00 AM'), Task("c", '11:00 AM')
+    bus.mark(['Monday'], [])
+    bus.mark(records=[], rows=[('Tuesday', first)])
+    bus.mark(records=[], tasks=[('Tuesday', second)])
+    bus.mark(['Friday'], [], rows=[('Friday', third)])
+    assert published == []
+    wait(50)
+    assert published == [({'Monday', 'Friday'}, [('Tuesday', first), ('Friday', third)], [('Tuesday', second)])]
+    wait(50)
+    assert len(published) == 1
+
+
+def test_save_waits_for_a_quiet_second(bus):
+    bus, saves, published = bus
+    task = Task("a", '09:00 AM')
+    bus.mark(records=[storage.added('Monday', 0, task)])
+    wait(600)
+    bus.mark(records=[storage.updated('Monday', 0, task)])
+    wait(600)
+    assert saves == []  # Restarted by the second change
+    wait(600)
+    assert [[record['op'] for record in records] for records in saves] == [['add', 'set']]
+    wait(1200)
+    assert len(saves) == 1
+
+
+def test_flush_saves_pending_removals_at_once(bus):
+    bus, saves, published = bus
+    task = Task("a", '09:00 AM')
+    bus.mark(records=[storage.removed('Monday', 0, task)], rows=[('Monday', task)])
+    bus.flush()
+    assert saves == [(storage.removed('Monday', 0, task),)]
+    bus.flush()
+    wait(1200)
+    assert len(saves) == 1
+
+
+def test_whole_schedule_after_a_full_mark(bus):
+    bus, saves, published = bus
+    task = Task("a", '09:00 AM')
+    bus.mark(records=[storage.added('Monday', 0, task)])
+    bus.mark(records=None)
+    bus.mark(records=[storage.updated('Monday', 0, task)])
+    bus.flush()
+    assert saves == [()]
+
+
+@pytest.fixture
+def scheduled(tmp_path):
+    task = Task("Physics Lab", '02:00 PM', date=date.today())
+    tasks = {day: DaySchedule() for day in DAYS}
+    tasks[DAYS[date.today().weekday()]].insert(task)
+    storage.JsonStorage(str(tmp_path / 'tasks.json')).save(tasks)
+    return task
+
+
+def start_edit(window, task):
+    day = DAYS[date.today().weekday()]
+    window.build_tab(0)  # Edit tab
+    window.day_combo.setCurrentText(day)
+    window.task_list_view.setCurrentIndex(window.task_list_model.index(window.tasks[day].index(
+        window.tasks[day].get(task.id)), 0))
+    window.edit_task()
+
+
+def test_closing_mid_edit_keeps_the_task(scheduled, window, tmp_path):
+    start_edit(window, scheduled)
+    assert window.tasks[DAYS[date.today().weekday()]].get(scheduled.id) is None
+    window.close()
+
+    store = storage.open_storage()
+    assert [task.id for day_tasks in store.load().values() for task in day_tasks] == [scheduled.id]
+    store.close()
+
+
+def test_edit_is_saved_as_one_replace(scheduled, window, monkeypatch):
+    saved = []
+    save = window.storage.save
+    monkeypatch.setattr(window.storage, 'save',
+                        lambda tasks, changes=(): saved.append([change['op'] for change in changes]) or save(tasks, changes))
+    start_edit(window, scheduled)
+    window.task_input.setText("Physics Lab, room 2")
+    window.add_task()
+    window.changes.flush()
+    assert saved == [['replace']]
+    window.close()
+
+    store = storage.open_storage()
+    assert [task.title for day_tasks in store.load().values() for task in day_tasks] == ["Physics Lab, room 2"]
+    store.close()
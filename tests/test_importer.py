@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+
+import importer
+import storage
+
+EVENT = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+SUMMARY:Physics Lab
+DTSTART:20260105T140000
+DTEND:20260105T155000
+RRULE:{rule}
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Calculus
+DTSTART:20260106T090000
+RRULE:FREQ=WEEKLY;BYDAY=TU,TH
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def read_ics(tmp_path, rule):
+    path = tmp_path / 'schedule.ics'
+    path.write_text(EVENT.format(rule=rule))
+    return list(importer.read_file(str(path)))
+
+
+def read_csv(tmp_path, text):
+    path = tmp_path / 'schedule.csv'
+    path.write_text(text)
+    return list(importer.read_file(str(path)))
+
+
+def test_weekly_rule(tmp_path):
+    entries = read_ics(tmp_path, 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=4')
+    assert [(entry.day, entry.error) for entry in entries] == [
+        ('Monday', None), ('Wednesday', None), ('Tuesday', None), ('Thursday', None)]
+    assert entries[0].task.rule.interval == 2
+    assert str(entries[0].task.rule.until) == '2026-01-21'
+
+
+def occurrences(entry, weeks=20):
+    first = entry.task.rule.start
+    return [first + timedelta(weeks=week) for week in range(weeks)
+            if entry.task.rule.occurs_on(first + timedelta(weeks=week))]
+
+
+def test_count_spans_the_weekdays(tmp_path):
+    # 2026-01-05 is a Monday; every other week gives Mon 5, Wed 7, Mon 19, Wed 21, Mon Feb 2.
+    dates = [date(2026, 1, 5), date(2026, 1, 7), date(2026, 1, 19), date(2026, 1, 21), date(2026, 2, 2)]
+    for count in range(1, 6):
+        entries = read_ics(tmp_path, f'FREQ=WEEKLY;INTERVAL=2;BYDAY=WE,MO;COUNT={count}')
+        physics = [entry for entry in entries if entry.task.description == "Physics Lab"]
+        assert len(physics) == min(count, 2)
+        assert sorted(when for entry in physics for when in occurrences(entry)) == dates[:count]
+
+
+def test_bad_rules_are_row_problems(tmp_path):
+    for rule, error in (('FREQ=WEEKLY;INTERVAL=0', "repeat interval must be at least 1, not 0"),
+                        ('FREQ=WEEKLY;INTERVAL=x', "unreadable repeat interval 'X'"),
+                        ('FREQ=WEEKLY;BYDAY=MO,XY', "unknown weekday 'XY' in repeat rule"),
+                        ('FREQ=WEEKLY;UNTIL=2026', "unreadable repeat end '2026'"),
+                        ('FREQ=WEEKLY;COUNT=0', "repeat count must be at least 1, not 0")):
+        entries = read_ics(tmp_path, rule)
+        assert entries[0].error == error
+        # The rest of the file is still read.
+        assert [entry.day for entry in entries[1:]] == ['Tuesday', 'Thursday']
+
+
+def test_csv_repeat_must_be_positive(tmp_path):
+    entries = read_csv(tmp_path, "description,time,day,repeat\n"
+                                 "Gym,7:00 AM,Monday,2\n"
+                                 "Never,8:00 AM,Monday,0\n"
+                                 "Backwards,8:00 AM,Monday,-1\n"
+                                 "Words,8:00 AM,Monday,two\n")
+    assert entries[0].task.rule.interval == 2
+    assert [entry.error for entry in entries[1:]] == [
+        "repeat must be at least 1 week, not 0", "repeat must be at least 1 week, not -1", "unreadable repeat 'two'"]
+
+
+def test_plan_reports_problems_and_skips_duplicates(tmp_path):
+    tasks = storage.empty_schedule()
+    entries = read_ics(tmp_path, 'FREQ=WEEKLY;BYDAY=XY')
+    plan = importer.plan_import(tasks, entries)
+    changes = importer.apply_plan(tasks, plan)
+    assert plan.problems == [(2, "unknown weekday 'XY' in repeat rule")]
+    assert len(changes) == 2
+    assert importer.plan_import(tasks, read_ics(tmp_path, 'FREQ=WEEKLY')).summary() == (
+        "1 new tasks, 2 already scheduled, 0 unreadable rows.")
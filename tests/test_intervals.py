@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+import random
+
+import pytest
+
+from intervals import IntervalIndex, _Ranges
+from task_model import Recurrence, Task, format_time
+
+MONDAY = date(2026, 1, 5)
+
+
+def ranged(rng, when=None, rule=None):
+    start = rng.randrange(24 * 60 - 1)
+    end = rng.randrange(start + 1, 24 * 60)
+    return Task("Task", format_time(start), rule is not None, date=when, rule=rule, end=format_time(end))
+
+
+@pytest.mark.parametrize('scan', [0, _Ranges.SCAN])
+def test_overlapping_matches_brute_force(monkeypatch, scan):
+    # SCAN 0 sends every query through the tree of ends.
+    monkeypatch.setattr(_Ranges, 'SCAN', scan)
+    rng = random.Random(scan)
+    ranges, live = _Ranges(), []
+    for step in range(2000):
+        if live and rng.random() < 0.4:
+            ranges.remove(live.pop(rng.randrange(len(live))))
+        else:
+            task = ranged(rng)
+            ranges.add(task)
+            live.append(task)
+        start = rng.randrange(24 * 60 - 1)
+        end = rng.randrange(start + 1, 24 * 60)
+        found = ranges.overlapping(start, end)
+        assert sorted(map(id, found)) == sorted(id(task) for task in live
+                                                if task.minutes < end and task.end_minutes > start)
+        assert [task.minutes for task in found] == sorted(task.minutes for task in found)
+    for task in live:
+        ranges.remove(task)
+    assert ranges.ends == {} and ranges.lengths == {}
+
+
+def test_conflicts_only_on_shared_dates():
+    lab = Task("Lab", "02:00 PM", date=MONDAY + timedelta(days=7), end="03:50 PM")
+    weekly = Task("Lecture", "03:00 PM", True, rule=Recurrence(2, MONDAY), end="04:00 PM")
+    all_day = Task("Trip", "12:00 AM", date=MONDAY, end="11:59 PM")
+    index = IntervalIndex([lab, weekly, all_day])
+
+    probe = Task("Meeting", "03:30 PM", date=MONDAY, end="04:30 PM")
+    assert index.conflicts(probe) == [all_day, weekly]
+    # The weekly task skips the next week; the dated one is on it.
+    probe = Task("Meeting", "03:30 PM", date=MONDAY + timedelta(days=7), end="04:30 PM")
+    assert index.conflicts(probe) == [lab]
+    # Weekly on the other alternate weeks: never meets the lecture.
+    probe = Task("Gym", "03:30 PM", True, rule=Recurrence(2, MONDAY + timedelta(days=7)), end="04:30 PM")
+    assert index.conflicts(probe) == [lab]
@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+
+import pytest
+
+import messaging
+
+
+class FakeTransport:
+    """Records each send; raises the next of ``failures`` first, if any."""
+
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.sent = []
+        self.attempts = []
+
+    def send(self, body):
+        self.attempts.append(time.monotonic())
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append(body)
+
+
+class Statuses:
+    """Collects ``on_status`` calls and waits for them."""
+
+    def __init__(self):
+        self.calls = []
+        self._changed = threading.Condition()
+
+    def __call__(self, message_id, status, detail):
+        with self._changed:
+            self.calls.append((message_id, status))
+            self._changed.notify_all()
+
+    def wait_for(self, count, timeout=5):
+        with self._changed:
+            assert self._changed.wait_for(lambda: len(self.calls) >= count, timeout), self.calls
+        return self.calls
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return str(tmp_path / 'outbox.json')
+
+
+def make_queue(transport, outbox, statuses, **options):
+    options = {'base_delay': 0.05, 'max_delay': 1.0, 'min_interval': 0.0, **options}
+    return messaging.MessageQueue(transport, outbox, on_status=statuses, **options)
+
+
+def test_sends_and_empties_outbox(outbox):
+    transport, statuses = FakeTransport(), Statuses()
+    queue = make_queue(transport, outbox, statuses)
+    message_id = queue.submit("Physics Lab in 10 minutes")
+    assert statuses.wait_for(1) == [(message_id, 'sent')]
+    queue.close(timeout=5)
+    assert transport.sent == ["Physics Lab in 10 minutes"]
+    with open(outbox) as file:
+        assert json.load(file) == []
+
+
+def test_retries_with_exponential_backoff(outbox):
+    transport, statuses = FakeTransport(ConnectionError("down"), ConnectionError("down")), Statuses()
+    queue = make_queue(transport, outbox, statuses, base_delay=0.1)
+    message_id = queue.submit("hello")
+    assert statuses.wait_for(3) == [(message_id, 'retrying'), (message_id, 'retrying'), (message_id, 'sent')]
+    queue.close(timeout=5)
+    first, second, third = transport.attempts
+    assert second - first >= 0.1
+    assert third - second >= 0.2
+    assert transport.sent == ["hello"]
+
+
+def test_gives_up_after_max_attempts(outbox):
+    transport, statuses = FakeTransport(*[ConnectionError("down")] * 3), Statuses()
+    queue = make_queue(transport, outbox, statuses, max_attempts=3)
+    queue.submit("hello")
+    assert [status for _, status in statuses.wait_for(3)] == ['retrying', 'retrying', 'failed']
+    queue.close(timeout=5)
+    assert queue.pending() == 0
+
+
+def test_permanent_error_is_not_retried(outbox):
+    transport, statuses = FakeTransport(messaging.PermanentError("bad number")), Statuses()
+    queue = make_queue(transport, outbox, statuses)
+    message_id = queue.submit("hello")
+    assert statuses.wait_for(1) == [(message_id, 'failed')]
+    time.sleep(0.2)
+    queue.close(timeout=5)
+    assert len(transport.attempts) == 1
+    assert queue.pending() == 0
+
+
+def test_undelivered_message_stays_in_outbox(outbox):
+    statuses = Statuses()
+    queue = make_queue(FakeTransport(ConnectionError("down")), outbox, statuses, base_delay=60)
+    message_id = queue.submit("left behind")
+    statuses.wait_for(1)
+    queue.close(timeout=5)
+    with open(outbox) as file:
+        assert [(message['id'], message['body'], message['attempts']) for message in json.load(file)] == [
+            (message_id, "left behind", 1)]
+
+
+def test_resends_due_message_from_outbox(outbox):
+    with open(outbox, 'w') as file:
+        json.dump([{'id': 7, 'body': "left behind", 'attempts': 1, 'next_attempt': 0.0}], file)
+    transport, statuses = FakeTransport(), Statuses()
+    queue = make_queue(transport, outbox, statuses)
+    assert statuses.wait_for(1) == [(7, 'sent')]
+    assert queue.submit("new") == 8
+    statuses.wait_for(2)
+    queue.close(timeout=5)
+    assert transport.sent == ["left behind", "new"]
+
+
+def test_queues_sharing_an_outbox_keep_their_own(outbox):
+    # The window and `workflow daemon` both start with outbox.json.
+    statuses = Statuses()
+    first = make_queue(FakeTransport(ConnectionError("down")), outbox, statuses, base_delay=60)
+    second = make_queue(FakeTransport(ConnectionError("down")), outbox, statuses, base_delay=60)
+    assert second.outbox_path != first.outbox_path
+    first.submit("from the window")
+    second.submit("from the daemon")
+    statuses.wait_for(2)
+    first.close(timeout=5)
+    second.close(timeout=5)
+    for queue, body in ((first, "from the window"), (second, "from the daemon")):
+        with open(queue.outbox_path) as file:
+            assert [message['body'] for message in json.load(file)] == [body]
+
+    resumed = make_queue(FakeTransport(), outbox, Statuses())
+    assert resumed.outbox_path == outbox
+    assert resumed.pending() == 1
+    resumed.close(timeout=5)
@@ -0,0 +1,86 @@
+from datetime import date
+
+from recurrence import OccurrenceCache, next_occurrence, previous_occurrence
+from task_model import DaySchedule, Recurrence, Task
+
+# Mondays
+OCT_5, OCT_12, OCT_19, OCT_26, NOV_2 = (date(2026, 10, 5), date(2026, 10, 12), date(2026, 10, 19),
+                                        date(2026, 10, 26), date(2026, 11, 2))
+
+
+def weekly(interval=1, start=OCT_5, until=None, exceptions=()):
+    return Task("Physics Lab", '02:00 PM', True, rule=Recurrence(interval, start, until, exceptions))
+
+
+def test_every_other_week_from_start():
+    task = weekly(interval=2)
+    assert next_occurrence('Monday', task, date(2026, 10, 6)) == OCT_19
+    assert next_occurrence('Monday', task, OCT_19) == OCT_19
+    assert previous_occurrence('Monday', task, date(2026, 10, 25)) == OCT_19
+    assert previous_occurrence('Monday', task, date(2026, 10, 18)) == OCT_5
+
+
+def test_exceptions_are_skipped():
+    task = weekly(interval=2, exceptions=[OCT_19])
+    assert next_occurrence('Monday', task, date(2026, 10, 6)) == NOV_2
+    assert previous_occurrence('Monday', task, date(2026, 11, 1)) == OCT_5
+
+
+def test_start_and_until_bound_the_rule():
+    task = weekly(until=OCT_19)
+    assert next_occurrence('Monday', task, date(2026, 9, 1)) == OCT_5
+    assert next_occurrence('Monday', task, date(2026, 10, 20)) is None
+    assert previous_occurrence('Monday', task, date(2026, 12, 1)) == OCT_19
+    assert previous_occurrence('Monday', task, date(2026, 10, 4)) is None
+
+
+def test_one_off_and_legacy_tasks():
+    once = Task("Dentist", '09:00 AM', date=OCT_12)
+    assert next_occurrence('Monday', once, OCT_5) == OCT_12
+    assert next_occurrence('Monday', once, date(2026, 10, 13)) is None
+    assert previous_occurrence('Monday', once, date(2026, 10, 11)) is None
+    # Saved before rules existed: every week on its day.
+    legacy = Task("Gym", '07:00 AM')
+    assert next_occurrence('Monday', legacy, date(2026, 10, 14)) == OCT_19
+    assert previous_occurrence('Monday', legacy, date(2026, 10, 14)) == OCT_12
+
+
+def test_cache_expands_each_date():
+    every_other = weekly(interval=2)
+    once = Task("Dentist", '09:00 AM', date=OCT_12)
+    cache = OccurrenceCache({'Monday': DaySchedule([every_other, once])})
+    assert cache.on(OCT_5) == (every_other,)
+    assert cache.on(OCT_12) == (once,)
+    assert cache.week(OCT_19)['Monday'] == (every_other,)
+    assert cache.week(OCT_19)['Tuesday'] == ()
+
+
+def test_cache_drops_least_recently_used_week():
+    cache = OccurrenceCache({'Monday': DaySchedule([weekly()])}, max_weeks=2)
+    first, second = cache.on(OCT_5), cache.on(OCT_12)
+    assert cache.on(OCT_5) is first  # Now the most recently used
+    cache.on(OCT_19)
+    assert cache.on(OCT_5) is first
+    assert cache.on(OCT_12) is not second
+
+
+def test_forget_one_off_touches_only_its_week():
+    schedule = DaySchedule([weekly()])
+    cache = OccurrenceCache({'Monday': schedule})
+    kept, stale = cache.on(OCT_5), cache.on(OCT_12)
+    once = Task("Dentist", '09:00 AM', date=OCT_12)
+    schedule.insert(once)
+    cache.forget('Monday', once)
+    assert cache.on(OCT_5) is kept
+    assert once in cache.on(OCT_12) and stale is not cache.on(OCT_12)
+
+
+def test_forget_recurring_touches_every_week():
+    schedule = DaySchedule()
+    cache = OccurrenceCache({'Monday': schedule})
+    cache.on(OCT_5), cache.on(OCT_26)
+    task = weekly()
+    schedule.insert(task)
+    cache.forget('Monday', task)
+    assert cache.on(OCT_5) == (task,)
+    assert cache.on(OCT_26) == (task,)
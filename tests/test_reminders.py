@@ -0,0 +1,92 @@
+from datetime import date, datetime
+
+import reminders
+from task_model import Recurrence, Task
+
+# A Monday morning; every reminder comes ten minutes before its task.
+NOW = datetime(2026, 10, 12, 8, 0)
+
+
+def weekly(time, description="Physics Lab"):
+    return Task(description, time, True, rule=Recurrence(start=date(2026, 10, 5)))
+
+
+def schedule_of(*tasks):
+    schedule = reminders.ReminderSchedule()
+    for task in tasks:
+        schedule.add('Monday', task, now=NOW)
+    return schedule
+
+
+def test_next_due_is_the_earliest_reminder():
+    later, sooner = weekly('11:00 AM'), weekly('09:00 AM')
+    schedule = schedule_of(later, sooner)
+    assert len(schedule) == 2
+    assert schedule.next_due() == datetime(2026, 10, 12, 8, 50)
+    assert schedule.pop_due(datetime(2026, 10, 12, 10, 55)) == [('Monday', sooner), ('Monday', later)]
+
+
+def test_past_and_finished_tasks_get_no_reminder():
+    schedule = schedule_of(Task("Dentist", '07:00 AM', date=date(2026, 10, 12)),
+                           Task("Dentist", '09:00 AM', date=date(2026, 10, 5)))
+    assert len(schedule) == 0
+    assert schedule.next_due() is None
+
+
+def test_removed_reminder_is_skipped():
+    first, second = weekly('09:00 AM'), weekly('10:00 AM')
+    schedule = schedule_of(first, second)
+    schedule.remove(first)
+    schedule.remove(first)  # Already gone: nothing to do
+    assert len(schedule) == 1
+    assert schedule.next_due() == datetime(2026, 10, 12, 9, 50)
+    assert schedule.pop_due(datetime(2026, 10, 12, 9, 55)) == [('Monday', second)]
+
+
+def test_heap_is_rebuilt_once_most_entries_are_cancelled():
+    tasks = [weekly(f'{hour:02d}:00 PM') for hour in range(1, 11)]
+    schedule = schedule_of(*tasks)
+    # Cancelling is lazy: the entries stay until half of them are cancelled.
+    for task in tasks[1:6]:
+        schedule.remove(task)
+    assert len(schedule._heap) == 10
+    schedule.remove(tasks[6])
+    assert len(schedule._heap) == 4
+    assert len(schedule) == 4
+    assert schedule.pop_due(datetime(2026, 10, 12, 23, 0)) == [('Monday', task) for task in tasks[:1] + tasks[7:]]
+
+
+def test_missed_weeks_remind_once():
+    task = weekly('09:00 AM')
+    schedule = schedule_of(task)
+    # Asleep for three Mondays.
+    assert schedule.pop_due(datetime(2026, 11, 2, 12, 0)) == [('Monday', task)]
+    assert schedule.next_due() == datetime(2026, 11, 9, 8, 50)
+
+
+def test_one_off_reminder_is_dropped_once_sent():
+    task = Task("Dentist", '09:00 AM', date=date(2026, 10, 12))
+    schedule = schedule_of(task)
+    assert schedule.pop_due(datetime(2026, 10, 12, 8, 50)) == [('Monday', task)]
+    assert len(schedule) == 0
+    assert schedule.pop_due(datetime(2026, 10, 20)) == []
+
+
+def test_reset_builds_from_a_week():
+    first, second = weekly('09:00 AM'), weekly('10:00 AM')
+    schedule = reminders.ReminderSchedule()
+    schedule.reset({'Monday': [second], 'Tuesday': [first]}, now=NOW)
+    assert schedule.pop_due(datetime(2026, 10, 12, 9, 55)) == [('Monday', second)]
+    assert schedule.next_due() == datetime(2026, 10, 13, 8, 50)
+
+
+def test_one_sender_at_a_time(tmp_path):
+    path = str(tmp_path / 'reminders.lock')
+    window, daemon = reminders.SenderLock(path), reminders.SenderLock(path)
+    assert window.held()
+    assert window.held()
+    assert not daemon.held()
+    window.release()
+    assert daemon.held()
+    assert not window.held()
+    daemon.release()
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from search import SearchIndex, tokenize
+from task_model import DAYS, DaySchedule, Task, format_time
+
+WORDS = ['physics', 'physical', 'phone', 'lab', 'labor', 'lecture', 'math', 'mathematics',
+         'meeting', 'gym', 'groceries', 'group', 'study', 'studio']
+
+
+def generated_schedule(count, seed=0):
+    rng = random.Random(seed)
+    tasks = {day: DaySchedule() for day in DAYS}
+    for _ in range(count):
+        task = Task(' '.join(rng.sample(WORDS, rng.randint(1, 3))), format_time(rng.randrange(0, 24 * 60, 5)),
+                    location=rng.choice(['', 'RGC 013', 'Library']))
+        tasks[rng.choice(DAYS)].insert(task)
+    return tasks
+
+
+def brute_force(tasks, query, limit=50):
+    """Every task scanned: each query word must start one of its words."""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    results = []
+    for day, day_tasks in tasks.items():
+        for task in day_tasks:
+            words = tokenize(task.title)
+            if not all(any(word.startswith(term) for word in words) for term in terms):
+                continue
+            score = sum(2 if term in words else 1 for term in terms)
+            results.append((-score, DAYS.index(day), task.minutes, task.id, day, task))
+    results.sort(key=lambda result: result[:4])
+    return [(day, task) for *_, day, task in results[:limit]]
+
+
+QUERIES = WORDS + ['p', 'ph', 'phys', 'la', 'ma', 'g', 'stud', 'rgc', 'lib', 'zzz',
+                   'lab physics', 'ph la', 'math meeting', 'g s', 'physics rgc', 'PHYSICS Lab', '']
+
+
+@pytest.fixture
+def tasks():
+    return generated_schedule(600)
+
+
+@pytest.fixture
+def index(tasks):
+    index = SearchIndex()
+    index.rebuild(tasks)
+    return index
+
+
+@pytest.mark.parametrize('limit', [1, 5, 50, 1000])
+def test_matches_brute_force(tasks, index, limit):
+    for query in QUERIES:
+        assert index.search(query, limit) == brute_force(tasks, query, limit), query
+
+
+def test_exact_words_rank_before_prefixes(index):
+    results = index.search('lab', 1000)
+    exact = [task for _, task in results if 'lab' in tokenize(task.title)]
+    assert exact and [task for _, task in results[:len(exact)]] == exact
+    assert len(results) > len(exact)  # "labor" matches too, after them
+
+
+def test_add_and_remove_keep_the_index_current(tasks, index):
+    index.build()
+    rng = random.Random(1)
+    for _ in range(200):
+        day = rng.choice(DAYS)
+        task = tasks[day][rng.randrange(len(tasks[day]))]
+        # An edit: the task leaves and comes back with another title.
+        tasks[day].remove(task)
+        index.remove(task)
+        task.description = ' '.join(rng.sample(WORDS, 2))
+        tasks[day].insert(task)
+        index.add(day, task)
+    new = Task("physics review", '06:00 AM')
+    tasks['Monday'].insert(new)
+    index.add('Monday', new)
+    gone = tasks['Friday'][0]
+    tasks['Friday'].remove(gone)
+    index.remove(gone)
+
+    assert len(index) == sum(len(day_tasks) for day_tasks in tasks.values())
+    for query in QUERIES + ['review']:
+        assert index.search(query, 20) == brute_force(tasks, query, 20), query
+
+
+def test_build_runs_in_slices(tasks):
+    index = SearchIndex()
+    index.BUILD_CHUNK = 50
+    index.rebuild(tasks)
+    assert not index.build(0)
+    # Added while the build is pending: the build starts over and takes it in.
+    late = Task("late physics", '11:00 PM')
+    tasks['Sunday'].insert(late)
+    index.add('Sunday', late)
+    while not index.build(0.001):
+        pass
+    assert index.build()
+    assert ('Sunday', late) in index.search('late')
+    assert index.search('phys', 1000) == brute_force(tasks, 'phys', 1000)
@@ -0,0 +1,174 @@
+from datetime import date
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import storage
+from conftest import REPO
+from task_model import Recurrence, Task
+
+# One session in a child process that dies without warning once its
+# compaction reaches the JournalStorage method named by argv[1], after
+# adding the tasks named by the rest.
+CRASHING_SESSION = """
+import os, sys, threading
+import storage
+from task_model import Task
+
+STEP = sys.argv[1]
+reached = threading.Event()
+
+def crash(self, *args):
+    if STEP == '_rebase':
+        os._exit(9)
+    reached.set()
+    threading.Event().wait()
+
+store = storage.JournalStorage('tasks.json', compact_after=3)
+tasks = store.load()
+setattr(storage.JournalStorage, STEP, crash)
+for title in sys.argv[2:]:
+    task = Task(title, '09:00 AM')
+    store.save(tasks, [storage.added('Monday', tasks['Monday'].insert(task), task)])
+reached.wait(10)
+os._exit(9)
+"""
+
+
+def crash_session(directory, step, *names):
+    session = subprocess.run([sys.executable, '-c', CRASHING_SESSION, step, *names],
+                             cwd=directory, env=dict(os.environ, PYTHONPATH=REPO), timeout=60)
+    assert session.returncode == 9
+
+
+def titles(tasks):
+    return sorted(task.title for task in tasks['Monday'])
+
+
+def add(store, tasks, *names):
+    for name in names:
+        task = Task(name, '09:00 AM')
+        store.save(tasks, [storage.added('Monday', tasks['Monday'].insert(task), task)])
+
+
+def test_journal_replays_after_reload(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    store = storage.JournalStorage(path, compact_after=3)
+    tasks = store.load()
+    add(store, tasks, 't0', 't1')
+    store.close()
+
+    store = storage.JournalStorage(path, compact_after=3)
+    assert titles(store.load()) == ['t0', 't1']
+    store.close()
+
+
+def test_compaction_absorbs_journal(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    store = storage.JournalStorage(path, compact_after=3)
+    tasks = store.load()
+    add(store, tasks, 't0', 't1', 't2', 't3')
+    store.close()
+
+    assert not os.path.exists(f"{path}.journal.old")
+    assert titles(storage.JsonStorage(path).load()) == ['t0', 't1', 't2']
+    store = storage.JournalStorage(path, compact_after=3)
+    assert titles(store.load()) == ['t0', 't1', 't2', 't3']
+    store.close()
+
+
+def test_kill_between_rotation_and_snapshot(tmp_path):
+    # A first compaction completes, then a second session is killed after
+    # rotating its journal and before writing the snapshot.
+    path = str(tmp_path / 'tasks.json')
+    store = storage.JournalStorage(path, compact_after=3)
+    tasks = store.load()
+    add(store, tasks, 't0', 't1', 't2', 't3')
+    store.close()
+
+    crash_session(tmp_path, '_write_snapshot', 't4', 't5', 't6', 't7')
+    assert os.path.exists(f"{path}.journal.old")
+
+    store = storage.JournalStorage(path, compact_after=3)
+    assert titles(store.load()) == [f't{i}' for i in range(8)]
+    store.close()
+    store = storage.JournalStorage(path, compact_after=3)
+    assert titles(store.load()) == [f't{i}' for i in range(8)]
+    store.close()
+
+
+def test_kill_between_snapshot_and_rebase(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    store = storage.JournalStorage(path, compact_after=3)
+    tasks = store.load()
+    add(store, tasks, 't0', 't1', 't2', 't3')
+    store.close()
+
+    crash_session(tmp_path, '_rebase', 't4', 't5')
+    assert titles(storage.JsonStorage(path).load()) == [f't{i}' for i in range(6)]
+
+    store = storage.JournalStorage(path, compact_after=3)
+    tasks = store.load()
+    assert titles(tasks) == [f't{i}' for i in range(6)]
+    add(store, tasks, 't6', 't7', 't8')
+    store.close()
+    store = storage.JournalStorage(path, compact_after=3)
+    assert titles(store.load()) == [f't{i}' for i in range(9)]
+    store.close()
+
+
+def test_snapshot_is_taken_when_the_journal_rotates(tmp_path, monkeypatch):
+    # Edits made while the worker is still writing the snapshot belong to
+    # the new journal, not to the snapshot.
+    release, written = threading.Event(), []
+    write_snapshot = storage.JournalStorage._write_snapshot
+
+    def held_back(self, snapshot):
+        release.wait(10)
+        written.append(json.loads(json.dumps(snapshot)))
+        write_snapshot(self, snapshot)
+
+    monkeypatch.setattr(storage.JournalStorage, '_write_snapshot', held_back)
+    path = str(tmp_path / 'tasks.json')
+    store = storage.JournalStorage(path, compact_after=3)
+    tasks = store.load()
+    add(store, tasks, 't0', 't1')
+    weekly = Task('weekly', '10:00 AM', True, rule=Recurrence(start=date(2026, 10, 5)))
+    store.save(tasks, [storage.added('Monday', tasks['Monday'].insert(weekly), weekly)])
+    weekly.rule.exceptions.add(date(2026, 10, 12))
+    weekly.completed = True
+    release.set()
+    store.close()
+
+    [snapshot] = written
+    [saved] = [task for task in snapshot['Monday'] if task['id'] == weekly.id]
+    assert saved['rule']['exceptions'] == [] and not saved['completed']
+
+
+def test_sync_thread_survives_a_failed_compaction(tmp_path, monkeypatch):
+    failures = []
+
+    def fail(*args):
+        failures.append(args)
+        raise RuntimeError("Set changed size during iteration")
+
+    path = str(tmp_path / 'tasks.json')
+    store = storage.JournalStorage(path, sync_interval=0.01, compact_after=3)
+    tasks = store.load()
+    monkeypatch.setattr(storage, 'write_atomic', fail)
+    add(store, tasks, 't0', 't1', 't2')
+    deadline = time.monotonic() + 5
+    while store._pending_snapshot is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert failures and store._worker.is_alive()
+    monkeypatch.undo()
+    add(store, tasks, 't3')
+    store.close()
+
+    store = storage.JournalStorage(path, compact_after=3)
+    assert titles(store.load()) == ['t0', 't1', 't2', 't3']
+    store.close()
+    assert not os.path.exists(f"{path}.journal.old")
@@ -0,0 +1,36 @@
+import storage
+import sync
+from task_model import Task
+
+
+def test_own_compaction_is_not_an_outside_write(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    store = storage.JournalStorage(path, compact_after=3)
+    state = sync.SyncState(store)
+    tasks = store.load()
+    state.synced()
+    for name in ('t0', 't1', 't2', 't3'):
+        task = Task(name, '09:00 AM')
+        with store.lock:
+            store.save(tasks, [storage.added('Monday', tasks['Monday'].insert(task), task)])
+            state.synced()
+    store.close()
+
+    assert not state.stale()
+
+
+def test_outside_write_is_seen(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    store = storage.JournalStorage(path, compact_after=3)
+    state = sync.SyncState(store)
+    store.load()
+    state.synced()
+
+    other = storage.JournalStorage(path, compact_after=3)
+    tasks = other.load()
+    task = Task('theirs', '09:00 AM')
+    other.save(tasks, [storage.added('Monday', tasks['Monday'].insert(task), task)])
+    other.close()
+    store.close()
+
+    assert state.stale()
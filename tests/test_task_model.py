@@ -0,0 +1,73 @@
+from datetime import date
+import random
+
+import storage
+from task_model import DaySchedule, Recurrence, Task, format_time
+
+
+def assert_indexed(schedule):
+    # Every lookup agrees with a scan of the scheduled tasks.
+    by_key = {}
+    for task in schedule:
+        by_key.setdefault(task.content_key(), []).append(task)
+        assert schedule.get(task.id) is task
+        assert schedule.find_duplicate(Task.from_dict({**task.to_dict(), 'id': None})) in by_key[task.content_key()]
+    assert {key: sorted(map(id, tasks)) for key, tasks in schedule._by_content.items()} == \
+        {key: sorted(map(id, tasks)) for key, tasks in by_key.items()}
+    assert len(schedule._by_id) == len(schedule)
+
+
+def test_duplicates_with_one_key_stay_indexed_until_the_last_goes():
+    first = Task("Lecture", '09:00 AM', date=date(2026, 10, 19))
+    second = Task("Lecture", '09:00 AM', date=date(2026, 10, 19))
+    schedule = DaySchedule([first])
+    schedule.insert(second)
+    assert_indexed(schedule)
+
+    schedule.remove(first)
+    assert schedule.find_duplicate(first) is second
+    assert_indexed(schedule)
+    schedule.remove(second)
+    assert schedule.find_duplicate(first) is None
+    assert schedule._by_content == {}
+
+
+def test_updates_keep_the_content_key():
+    task = Task("Lecture", '09:00 AM', True, rule=Recurrence())
+    tasks = {'Monday': DaySchedule([task])}
+    storage.apply_change(tasks, storage.updated('Monday', 0, Task.from_dict(
+        {**task.to_dict(), 'completed': True, 'rule': Recurrence(interval=2).to_dict()})))
+    assert task.completed and task.rule.interval == 2
+    assert tasks['Monday'].find_duplicate(Task("Lecture", '09:00 AM', True)) is task
+    assert_indexed(tasks['Monday'])
+
+
+def test_indexes_match_a_scan_through_random_changes():
+    rng = random.Random(12)
+    schedule = DaySchedule()
+
+    def make():
+        # Few distinct contents, so most keys are shared by several tasks.
+        return Task(rng.choice(["Lecture", "Lab", "Gym"]), format_time(rng.choice([540, 600, 840])),
+                    date=rng.choice([None, date(2026, 10, 19)]))
+
+    for step in range(500):
+        action = rng.random()
+        if len(schedule) and action < 0.3:
+            schedule.remove(rng.choice(list(schedule)))
+        elif len(schedule) and action < 0.4:
+            schedule.pop(rng.randrange(len(schedule)))
+        elif len(schedule) and action < 0.5:
+            # An edit: the old task leaves and its new version arrives.
+            schedule.remove(rng.choice(list(schedule)))
+            schedule.insert(make())
+        elif action < 0.55:
+            schedule.insert_many(make() for _ in range(3))
+        elif action < 0.6:
+            # A whole-schedule replace builds fresh schedules from the saved form.
+            tasks = {'Monday': schedule}
+            storage.apply_change(tasks, storage.replaced(tasks))
+            schedule = tasks['Monday']
+        else:
+            schedule.insert(make())
+        assert_indexed(schedule)
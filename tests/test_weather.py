@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+import weather
+
+WEATHER = {
+    'main': {'temp': 290.0, 'temp_max': 293.0, 'temp_min': 287.0},
+    'weather': [{'description': 'clear sky'}],
+    'wind': {'speed': 3.1},
+    'sys': {'sunrise': 1700000000, 'sunset': 1700040000},
+}
+
+
+def forecast_response(start, steps=8):
+    """A ``/forecast`` response with readings every three hours from ``start``."""
+    return {'list': [
+        {'dt': int((start + timedelta(hours=3 * step)).timestamp()),
+         'main': {'temp': 280.0 + step},
+         'weather': [{'description': 'light rain' if step % 2 else 'clear sky'}],
+         'pop': step / 10}
+        for step in range(steps)]}
+
+
+class StandIn(ThreadingHTTPServer):
+    """A local OpenWeatherMap stand-in serving ``responses[endpoint]``."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        # From the next hour on, so no reading has passed by the time it is read.
+        self.next_hour = (datetime.now() + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+        self.responses = {'weather': WEATHER, 'forecast': forecast_response(self.next_hour)}
+        self.delay = 0.0
+        self.requests = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        endpoint = self.path.split('?')[0].rsplit('/', 1)[-1]
+        self.server.requests.append(endpoint)
+        time.sleep(self.server.delay)
+        body = json.dumps(self.server.responses[endpoint]).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server, tmp_path):
+    client = weather.WeatherClient('Anaheim', 'key', base_url=server.url, ttl=600, timeout=(1, 1),
+                                   cache_path=str(tmp_path / 'weather_cache.json'),
+                                   forecast_cache_path=str(tmp_path / 'forecast_cache.json'))
+    yield client
+    client.close()
+
+
+def test_current_is_served_from_cache_within_ttl(server, client):
+    assert client.current() == WEATHER
+    assert client.current() == WEATHER
+    assert server.requests == ['weather']
+
+
+def test_current_refetches_after_ttl(server, client, monkeypatch):
+    client.current()
+    later = time.time() + client.ttl + 1
+    monkeypatch.setattr(weather.time, 'time', lambda: later)
+    client.current()
+    assert server.requests == ['weather', 'weather']
+
+
+def test_cache_is_per_city(server, client):
+    client.current()
+    other = weather.WeatherClient('Irvine', 'key', base_url=server.url, cache_path=client.cache_path)
+    assert other.cached() is None
+    other.close()
+
+
+def test_offline_falls_back_to_stale_reading(server, client, monkeypatch):
+    client.current()
+    later = time.time() + client.ttl + 1
+    monkeypatch.setattr(weather.time, 'time', lambda: later)
+    server.shutdown()
+    server.server_close()
+    with pytest.raises(requests.ConnectionError):
+        client.current()
+    assert client.cached(max_age=client.ttl) is None
+    assert client.cached() == WEATHER
+
+
+def test_slow_server_times_out(server, client):
+    server.delay = 2.0
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        client.current()
+    assert time.monotonic() - start < 2.0
+    assert client.cached() is None
+
+
+def test_forecast_is_served_from_cache_within_ttl(server, client):
+    forecast = client.forecast()
+    assert len(forecast) == 24
+    reading = forecast.at(server.next_hour.date(), server.next_hour.hour * 60 + 30)
+    assert reading == {'temp': 280.0, 'description': 'clear sky', 'pop': 0.0}
+    assert client.forecast().hours == forecast.hours
+    assert server.requests == ['forecast']
+
+
+def test_forecast_refetches_after_ttl(server, client, monkeypatch):
+    client.forecast()
+    later = time.time() + client.forecast_ttl + 1
+    monkeypatch.setattr(weather.time, 'time', lambda: later)
+    client.forecast()
+    assert server.requests == ['forecast', 'forecast']
+
+
+def test_forecast_cache_holds_each_city(server, client):
+    client.forecast()
+    other = weather.WeatherClient('Irvine', 'key', base_url=server.url,
+                                  forecast_cache_path=client.forecast_cache_path)
+    assert not other.cached_forecast()
+    other.forecast()
+    other.close()
+    assert client.cached_forecast().hours == other.cached_forecast().hours
+    assert server.requests == ['forecast', 'forecast']
+
+
+def test_offline_falls_back_to_stale_forecast(server, client, monkeypatch):
+    fetched = client.forecast()
+    later = time.time() + client.forecast_ttl + 1
+    monkeypatch.setattr(weather.time, 'time', lambda: later)
+    server.shutdown()
+    server.server_close()
+    with pytest.raises(requests.ConnectionError):
+        client.forecast()
+    assert client.cached_forecast().hours == fetched.hours
+
+
+def test_slow_forecast_times_out(server, client):
+    server.delay = 2.0
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        client.forecast()
+    assert time.monotonic() - start < 2.0
+    assert not client.cached_forecast()
@@ -0,0 +1,70 @@
+from datetime import date
+
+import pytest
+
+from task_model import Task
+
+
+@pytest.fixture
+def page(qapp):
+    import main
+    page = main.WeekPage()
+    yield page
+    page.deleteLater()
+
+
+class Signals:
+    """Records the row and reset signals of one model."""
+
+    def __init__(self, model):
+        self.calls = []
+        model.rowsInserted.connect(lambda parent, first, last: self.calls.append(('insert', first)))
+        model.rowsRemoved.connect(lambda parent, first, last: self.calls.append(('remove', first)))
+        model.modelReset.connect(lambda: self.calls.append(('reset',)))
+
+
+def column(*times):
+    return tuple(Task(f"at {time}", time) for time in times)
+
+
+def show(page, monday):
+    page.show_week(date(2026, 10, 12), {'Monday': monday, **{day: () for day in
+                   ('Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')}}, None, None)
+
+
+def rows(page):
+    model = page.models['Monday']
+    return [model.task(model.index(row)) for row in range(model.rowCount())]
+
+
+def test_added_and_removed_tasks_only_move_their_rows(page):
+    first, second, third = column('09:00 AM', '11:00 AM', '01:00 PM')
+    show(page, (first, third))
+    signals = Signals(page.models['Monday'])
+
+    page.rows_changed('Monday', (first, second, third), [second])
+    assert signals.calls == [('insert', 1)]
+    page.rows_changed('Monday', (second, third), [first])
+    assert signals.calls == [('insert', 1), ('remove', 0)]
+    assert rows(page) == [second, third]
+
+
+def test_several_rows_in_one_change(page):
+    tasks = column('08:00 AM', '09:00 AM', '10:00 AM', '11:00 AM')
+    show(page, tasks[:2])
+    signals = Signals(page.models['Monday'])
+
+    # One task leaves and two arrive.
+    page.rows_changed('Monday', (tasks[1], tasks[2], tasks[3]), [tasks[0], tasks[2], tasks[3]])
+    assert signals.calls == [('remove', 0), ('insert', 1), ('insert', 2)]
+    assert rows(page) == list(tasks[1:])
+
+
+def test_column_is_reset_when_other_rows_moved(page):
+    first, second, third = column('09:00 AM', '11:00 AM', '01:00 PM')
+    show(page, (first, second))
+    signals = Signals(page.models['Monday'])
+
+    page.rows_changed('Monday', (second, first, third), [third])
+    assert signals.calls == [('reset',)]
+    assert rows(page) == [second, first, third]
@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+import argparse
+
+import pytest
+
+import storage
+import workflow
+from task_model import DAYS
+
+
+@pytest.fixture
+def cli(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+
+    def run(*argv):
+        code = workflow.main(list(argv))
+        out, err = capsys.readouterr()
+        return code, out, err
+    return run
+
+
+def scheduled():
+    store = storage.open_storage()
+    try:
+        return {day: list(tasks) for day, tasks in store.load().items() if tasks}
+    finally:
+        store.close()
+
+
+def test_add_then_list_today(cli):
+    today = date.today()
+    code, out, err = cli('add', "Physics Lab", '--time', '2:00 PM', '--end', '15:50')
+    assert code == 0 and out.startswith(f"Added to {DAYS[today.weekday()]}: ")
+    code, out, err = cli('add', "Seminar", '--time', '9:00am', '--day', DAYS[(today.weekday() + 1) % 7][:3])
+    assert code == 0
+
+    [task] = scheduled()[DAYS[today.weekday()]]
+    assert (task.description, task.time, task.end, task.date) == ("Physics Lab", '02:00 PM', '03:50 PM', today)
+
+    code, out, err = cli('list', '--today')
+    assert code == 0
+    assert out.splitlines() == [f"{DAYS[today.weekday()]}, {today:%b %d, %Y}", f"  {workflow.format_task(task)}"]
+
+
+def test_add_refuses_a_duplicate(cli):
+    assert cli('add', "Physics Lab", '--time', '14:00')[0] == 0
+    code, out, err = cli('add', "Physics Lab", '--time', '2:00 PM')
+    assert code == 1 and "already scheduled" in err
+    assert sum(map(len, scheduled().values())) == 1
+
+
+def test_weekly_add_repeats_from_its_date(cli):
+    start = date.today() + timedelta(days=3)
+    assert cli('add', "Gym", '--time', '18:00', '--date', start.isoformat(), '--weekly', '--every', '2')[0] == 0
+    [task] = scheduled()[DAYS[start.weekday()]]
+    assert task.is_permanent and (task.rule.interval, task.rule.start) == (2, start)
+
+
+def test_remove_by_unique_prefix(cli):
+    cli('add', "Physics Lab", '--time', '14:00')
+    cli('add', "Seminar", '--time', '09:00')
+    tasks = [task for day_tasks in scheduled().values() for task in day_tasks]
+    first, second = tasks
+    # Find the shortest prefix of the first id that the second one does not share.
+    length = next(n for n in range(1, len(first.id) + 1) if first.id[:n] != second.id[:n])
+
+    code, out, err = cli('remove', first.id[:length])
+    assert code == 0 and out.startswith("Removed from ")
+    assert [task.id for day_tasks in scheduled().values() for task in day_tasks] == [second.id]
+
+    code, out, err = cli('remove', 'zz')
+    assert code == 1 and "No task matches 'zz'" in err
+
+
+def test_remove_refuses_an_ambiguous_prefix(cli):
+    cli('add', "Physics Lab", '--time', '14:00')
+    cli('add', "Seminar", '--time', '09:00')
+    code, out, err = cli('remove', '')
+    assert code == 1 and "More than one task" in err
+    assert sum(map(len, scheduled().values())) == 2
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2:00 PM', '02:00 PM'), ('2:00pm', '02:00 PM'), ('14:00', '02:00 PM'),
+    ('12:30 AM', '12:30 AM'), ('0:05', '12:05 AM'), (' 9:15 am ', '09:15 AM'),
+])
+def test_time_arg_accepts(text, expected):
+    assert workflow.time_arg(text) == expected
+
+
+@pytest.mark.parametrize('text', ['24:00', '13:00 PM', '0:00 AM', '9:60', '9', 'noon'])
+def test_time_arg_rejects(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        workflow.time_arg(text)
+
+
+def test_day_arg_takes_unambiguous_prefixes():
+    assert workflow.day_arg('tu') == 'Tuesday'
+    assert workflow.day_arg('SUNDAY') == 'Sunday'
+    for text in ('t', 's', 'x'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            workflow.day_arg(text)
+
+
+def test_bad_arguments_are_rejected(cli):
+    code, out, err = cli('add', "Gym", '--time', '18:00', '--weekly', '--every', '0')
+    assert code == 2 and "--every must be at least 1" in err
+    with pytest.raises(SystemExit):
+        cli('add', "Gym", '--time', '25:00')
+    with pytest.raises(SystemExit):
+        cli('list', '--today', '--day', 'Monday')
+    assert scheduled() == {}
@@ -0,0 +1,130 @@
+"""The application stylesheet, parsed once and selected by object name.
+
+Widgets opt into rules with ``setObjectName`` and carry their state in
+dynamic properties such as ``today``. Changing state is then
+:func:`set_state` rather than a fresh per-widget stylesheet.
+"""
+
+STYLESHEET = """
+    QMainWindow {
+        background-color: black;
+    }
+    QTabWidget::pane {
+        border: 1px solid white;
+        background-color: black;
+    }
+    QTabWidget::tab-bar {
+        left: 0px;
+    }
+    QTabBar::tab {
+        background-color: #333333;
+        color: white;
+        padding: 8px 20px;
+        margin-right: 2px;
+    }
+    QTabBar::tab:selected {
+        background-color: #90d5ff;
+        border: 1px solid white;
+    }
+
+    QLabel#dateLabel {
+        color: white;
+        font-family: 'Segoe UI', 'Arial', sans-serif;
+        font-size: 10pt;
+        padding: 8px 20px;
+    }
+
+    /* Edit and Day tab containers */
+    #panel, #panel * {
+        background-color: white;
+        border: 2px solid black;
+    }
+    #panel QScrollArea, #panel QScrollArea * {
+        border: none;
+    }
+    QLabel#panelHeader {
+        color: black;
+        padding: 5px;
+        font-family: 'Segoe UI', 'Arial', sans-serif;
+        font-size: 10pt;
+        font-weight: bold;
+    }
+    QLabel#sectionHeader {
+        color: black;
+        padding: 5px;
+        font-family: 'Segoe UI', 'Arial', sans-serif;
+        font-size: 12pt;
+        font-weight: bold;
+    }
+    QLabel#weatherTitle {
+        font-size: 14pt;
+        font-weight: bold;
+        padding: 5px;
+    }
+    #panel QComboBox, #panel QTimeEdit, #panel QDateEdit, #panel QSpinBox, #panel QLineEdit {
+        padding: 5px;
+        border: 1px solid black;
+        font-family: 'Segoe UI', 'Arial', sans-serif;
+    }
+    #panel QCheckBox {
+        font-family: 'Segoe UI', 'Arial', sans-serif;
+    }
+    QPushButton#actionButton {
+        padding: 8px 20px;
+        background-color: #333333;
+        color: white;
+        border: none;
+        font-family: 'Segoe UI', 'Arial', sans-serif;
+    }
+    QPushButton#actionButton:hover {
+        background-color: #90d5ff;
+    }
+
+    /* Edit tab task list */
+    #panel QListView, #panel QListView * {
+        border: none;
+        font-family: 'Segoe UI', 'Arial', sans-serif;
+    }
+
+    /* Week tab columns */
+    #dayColumn, #dayColumn * {
+        background-color: white;
+    }
+    QLabel#dayLabel {
+        color: black;
+        padding: 5px;
+        font-family: 'Segoe UI', 'Arial', sans-serif;
+        font-size: 12pt;
+        font-weight: bold;
+    }
+    QLabel#dayLabel[today="true"] {
+        color: #90d5ff;
+        text-decoration: underline;
+    }
+    #dayColumn QListView {
+        border: none;
+        font-family: 'Segoe UI', 'Arial', sans-serif;
+    }
+    #dayColumn QListView::item {
+        padding: 2px;
+    }
+
+    /* Profiling overlay (F12) */
+    QLabel#perfOverlay {
+        background-color: rgba(0, 0, 0, 200);
+        color: #90d5ff;
+        font-family: 'Consolas', 'DejaVu Sans Mono', monospace;
+        font-size: 9pt;
+        padding: 8px;
+        border: 1px solid #90d5ff;
+    }
+"""
+
+
+def set_state(widget, **properties):
+    """Set dynamic style properties on ``widget`` and re-polish only it."""
+    for name, value in properties.items():
+        widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
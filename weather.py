@@ -0,0 +1,243 @@
+"""OpenWeatherMap client with a pooled session and on-disk TTL caches.
+
+Nothing here touches Qt; MainWindow runs :meth:`WeatherClient.current` on a
+worker thread and shows :meth:`WeatherClient.cached` as soon as the Day tab opens.
+
+The forecast is fetched the same way, once per city, and kept as an hourly
+:class:`Forecast`; each task's weather is a lookup of its time slot there.
+"""
+from datetime import date, datetime, timedelta
+import json
+import os
+import threading
+import time
+
+CITY = ''
+API_KEY = ''
+BASE_URL = 'https://api.openweathermap.org/data/2.5'
+
+# The free forecast has a reading every 3 hours; each covers the hours up
+# to the next one, but never more than this many.
+FORECAST_STEP_HOURS = 3
+
+
+class Forecast:
+    """Forecast readings for one city, keyed by ``(date, hour)`` in local time.
+
+    A reading is ``{'temp': kelvin, 'description': str, 'pop': chance of
+    precipitation}``. Every hour a source reading covers gets an entry, so a
+    lookup is one dictionary hit whatever the forecast's step.
+    """
+
+    def __init__(self, hours=None, fetched_at=0.0):
+        self.hours = hours if hours is not None else {}
+        self.fetched_at = fetched_at
+
+    def __len__(self):
+        return len(self.hours)
+
+    def at(self, when, minutes):
+        """Return the reading for ``minutes`` past midnight on date ``when``, or None."""
+        return self.hours.get((when, minutes // 60))
+
+    def during(self, when, start, end=None):
+        """Return the wettest reading between ``start`` and ``end`` minutes on
+        ``when``, or the one at ``start`` for a task without an end."""
+        if end is None:
+            return self.at(when, start)
+        wettest = None
+        for hour in range(start // 60, (end - 1) // 60 + 1):
+            reading = self.hours.get((when, hour))
+            if reading is not None and (wettest is None or reading['pop'] > wettest['pop']):
+                wettest = reading
+        return wettest
+
+    def evict(self, now=None):
+        """Drop readings for hours that have already ended."""
+        now = now or datetime.now()
+        current = (now.date(), now.hour)
+        self.hours = {key: reading for key, reading in self.hours.items() if key >= current}
+
+    @classmethod
+    def from_response(cls, data, fetched_at=None):
+        """Build a forecast from an OpenWeatherMap ``/forecast`` response."""
+        entries = sorted(data['list'], key=lambda entry: entry['dt'])
+        hours = {}
+        for entry, following in zip(entries, entries[1:] + [None]):
+            start = datetime.fromtimestamp(entry['dt']).replace(minute=0, second=0, microsecond=0)
+            end = start + timedelta(hours=FORECAST_STEP_HOURS)
+            if following is not None:
+                end = min(end, datetime.fromtimestamp(following['dt']))
+            reading = {
+                'temp': entry['main']['temp'],
+                'description': entry['weather'][0]['description'],
+                'pop': entry.get('pop', 0.0),
+            }
+            while start < end:
+                hours[(start.date(), start.hour)] = reading
+                start += timedelta(hours=1)
+        return cls(hours, time.time() if fetched_at is None else fetched_at)
+
+    def to_dict(self):
+        return {'fetched_at': self.fetched_at,
+                'hours': {f"{when.isoformat()}T{hour:02d}": reading for (when, hour), reading in self.hours.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        hours = {}
+        for key, reading in data['hours'].items():
+            day, hour = key.split('T')
+            hours[(date.fromisoformat(day), int(hour))] = reading
+        return cls(hours, data['fetched_at'])
+
+
+class WeatherClient:
+    """Fetches current conditions and the forecast for one city, caching both.
+
+    Readings younger than ``ttl`` seconds are served from ``cache_path``
+    without a request. Older readings are still returned by :meth:`cached`
+    so a cold start always has something to show. The forecast works the
+    same way with ``forecast_ttl`` and ``forecast_cache_path``, which holds
+    one forecast per city. ``base_url`` can point at a local stand-in server.
+    """
+
+    def __init__(self, city=CITY, api_key=API_KEY, base_url=BASE_URL,
+                 cache_path='weather_cache.json', ttl=600, timeout=(3.05, 10),
+                 forecast_cache_path='forecast_cache.json', forecast_ttl=3600):
+        self.city = city
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.timeout = timeout
+        self.forecast_cache_path = forecast_cache_path
+        self.forecast_ttl = forecast_ttl
+        self._session = None
+        # The session is shared by the current-weather and forecast workers.
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # One pooled session for every request this client makes. requests
+        # is imported here so it is only loaded once weather is needed.
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def cached(self, max_age=None):
+        """Return the cached reading, or None if missing or older than ``max_age``."""
+        try:
+            with open(self.cache_path, 'r') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if entry.get('city') != self.city:
+            return None
+        if max_age is not None and time.time() - entry.get('fetched_at', 0) > max_age:
+            return None
+        return entry.get('data')
+
+    def current(self):
+        """Return a reading no older than the TTL, fetching one if needed."""
+        data = self.cached(max_age=self.ttl)
+        if data is None:
+            data = self.fetch()
+        return data
+
+    def fetch(self):
+        data = self._get('weather')
+        self._store(data)
+        return data
+
+    def cached_forecast(self):
+        """Return the last forecast fetched for this city, however old, minus
+        the hours already past; empty if there is none."""
+        entry = self._read_forecasts().get(self.city)
+        try:
+            forecast = Forecast.from_dict(entry) if entry is not None else Forecast()
+        except (KeyError, ValueError, AttributeError):
+            forecast = Forecast()
+        forecast.evict()
+        return forecast
+
+    def forecast(self):
+        """Return a forecast no older than ``forecast_ttl``, fetching one if needed."""
+        forecast = self.cached_forecast()
+        if not forecast or time.time() - forecast.fetched_at > self.forecast_ttl:
+            forecast = self.fetch_forecast()
+        return forecast
+
+    def fetch_forecast(self):
+        """Fetch the whole forecast for this city in one request and cache it."""
+        forecast = Forecast.from_response(self._get('forecast'))
+        forecast.evict()
+        forecasts = self._read_forecasts()
+        forecasts[self.city] = forecast.to_dict()
+        self._write(self.forecast_cache_path, forecasts)
+        return forecast
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _get(self, endpoint):
+        with self._lock:
+            response = self.session.get(
+                f"{self.base_url}/{endpoint}",
+                params={'q': self.city, 'appid': self.api_key},
+                timeout=self.timeout,
+            )
+        response.raise_for_status()
+        return response.json()
+
+    def _read_forecasts(self):
+        try:
+            with open(self.forecast_cache_path, 'r') as file:
+                forecasts = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return forecasts if isinstance(forecasts, dict) else {}
+
+    def _store(self, data):
+        self._write(self.cache_path, {'city': self.city, 'fetched_at': time.time(), 'data': data})
+
+    @staticmethod
+    def _write(path, entry):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(entry, file)
+        os.replace(tmp_path, path)
+
+
+def kelvin_to_fahrenheit(kelvin):
+    return (kelvin - 273.15) * 9/5 + 32
+
+
+def format_slot(reading):
+    """Render a forecast reading as a short note beside a task."""
+    text = f"{kelvin_to_fahrenheit(reading['temp']):.0f}°F {reading['description']}"
+    if reading['pop'] >= 0.2:
+        text += f" ({reading['pop']:.0%} chance)"
+    return text
+
+
+def format_weather(response):
+    """Render a current-weather response as the Day tab label text."""
+    temp_fahrenheit = kelvin_to_fahrenheit(response['main']['temp'])
+    temp_max_fahrenheit = kelvin_to_fahrenheit(response['main']['temp_max'])
+    temp_min_fahrenheit = kelvin_to_fahrenheit(response['main']['temp_min'])
+    description = response['weather'][0]['description']
+    wind_speed = response['wind']['speed']
+
+    sunrise_time = datetime.fromtimestamp(response['sys']['sunrise']).strftime('%I:%M %p')
+    sunset_time = datetime.fromtimestamp(response['sys']['sunset']).strftime('%I:%M %p')
+
+    return (
+        f"Current Temperature: {temp_fahrenheit:.1f}°F ({description.capitalize()})\n"
+        f"High: {temp_max_fahrenheit:.1f}°F | Low: {temp_min_fahrenheit:.1f}°F\n"
+        f"Wind Speed: {wind_speed} m/s\n"
+        f"Sunrise: {sunrise_time} | Sunset: {sunset_time}"
+    )
@@ -0,0 +1,228 @@
+"""Command-line access to the schedule, without Qt.
+
+Reads and writes the same tasks.json as the window, through the same
+storage backend and lock, so a running window picks the changes up:
+
+    python workflow.py add "Physics Lab" --time "2:00 PM" --end "3:50 PM" --day Tuesday --weekly
+    python workflow.py list --today
+    python workflow.py remove 3f2a9c
+    python workflow.py daemon
+
+``daemon`` sends the same text-message reminders as the window. It only
+loads the task model, storage and messaging modules, and reloads the
+schedule whenever another process writes it. While a window is sending
+reminders the daemon only keeps its schedule, and takes over when the
+window closes.
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import re
+import signal
+import sys
+import threading
+
+import recurrence
+import reminders
+import storage
+import sync
+from task_model import DAYS, Recurrence, Task, find_task, format_time
+
+# Shortest id prefix `list` prints; `remove` takes any unique prefix.
+ID_PREFIX = 8
+
+TIME = re.compile(r'(?P<hour>\d{1,2}):(?P<minute>\d{2})\s*(?P<half>[AaPp][Mm])?')
+
+
+def time_arg(text):
+    """Accept "2:00 PM", "2:00pm" or "14:00" and return it as "hh:mm AP"."""
+    match = TIME.fullmatch(text.strip())
+    if match is not None:
+        hour, minute, half = int(match['hour']), int(match['minute']), match['half']
+        if half is None and hour < 24 and minute < 60:
+            return format_time(hour * 60 + minute)
+        if half is not None and 1 <= hour <= 12 and minute < 60:
+            return format_time((hour % 12 + (12 if half.upper() == 'PM' else 0)) * 60 + minute)
+    raise argparse.ArgumentTypeError(f"invalid time: {text!r} (use 2:00 PM or 14:00)")
+
+
+def day_arg(text):
+    """Accept a weekday name or an unambiguous prefix of one."""
+    matches = [day for day in DAYS if day.lower().startswith(text.lower())]
+    if len(matches) == 1:
+        return matches[0]
+    raise argparse.ArgumentTypeError(f"invalid day: {text!r}")
+
+
+def task_date(args):
+    """The date ``add`` schedules for: ``--date``, else the next ``--day``, else today."""
+    if args.date is not None:
+        return args.date
+    today = date.today()
+    if args.day is None:
+        return today
+    return today + timedelta(days=(DAYS.index(args.day) - today.weekday()) % 7)
+
+
+def format_task(task):
+    mark = 'x' if task.completed else ' '
+    return f"[{mark}] {task.id[:ID_PREFIX]}  {task.span:<19} {task.title}"
+
+
+def add(store, log, args):
+    when = task_date(args)
+    day = DAYS[when.weekday()]
+    try:
+        if args.weekly:
+            task = Task(args.description, args.time, True, rule=Recurrence(args.every, when),
+                        end=args.end, location=args.location)
+        else:
+            task = Task(args.description, args.time, date=when, end=args.end, location=args.location)
+    except ValueError:
+        print("The end time must be after the start time.", file=sys.stderr)
+        return 1
+    with store.lock:
+        tasks = store.load()
+        if tasks[day].find_duplicate(task) is not None:
+            print(f"This task is already scheduled for {day}.", file=sys.stderr)
+            return 1
+        conflicts = tasks[day].conflicts(task)
+        if conflicts and not args.force:
+            print("This overlaps with:", file=sys.stderr)
+            for other in conflicts:
+                print(f"  {format_task(other)}", file=sys.stderr)
+            print("Use --force to add it anyway.", file=sys.stderr)
+            return 1
+        row = tasks[day].insert(task)
+        store.save(tasks, [storage.added(day, row, task)])
+    log.record('add', day, task)
+    print(f"Added to {day}: {format_task(task)}")
+    return 0
+
+
+def list_tasks(store, log, args):
+    with store.lock:
+        tasks = store.load()
+    if args.today:
+        today = date.today()
+        occurrences = recurrence.OccurrenceCache(tasks).on(today)
+        print(f"{DAYS[today.weekday()]}, {today:%b %d, %Y}")
+        for task in occurrences:
+            print(f"  {format_task(task)}")
+        return 0
+    for day in [args.day] if args.day else DAYS:
+        if tasks[day]:
+            print(day)
+            for task in tasks[day]:
+                print(f"  {format_task(task)}")
+    return 0
+
+
+def remove(store, log, args):
+    with store.lock:
+        tasks = store.load()
+        matches = [task.id for schedule in tasks.values() for task in schedule
+                   if task.id.startswith(args.id)]
+        if len(matches) != 1:
+            print(f"{'No' if not matches else 'More than one'} task matches {args.id!r}.", file=sys.stderr)
+            return 1
+        day, task = find_task(tasks, matches[0])
+        row = tasks[day].remove(task)
+        store.save(tasks, [storage.removed(day, row, task)])
+    log.record('remove', day, task)
+    print(f"Removed from {day}: {format_task(task)}")
+    return 0
+
+
+def daemon(store, log, args):
+    """Send reminders until interrupted, reloading whenever the schedule changes."""
+    import messaging  # Only the daemon sends anything.
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    queue = messaging.MessageQueue(messaging.TwilioTransport())
+    schedule = reminders.ReminderSchedule(timedelta(minutes=args.lead))
+    sender = reminders.SenderLock()
+    state = sync.SyncState(store)
+    try:
+        while not stop.is_set():
+            if state.stale():
+                with store.lock:
+                    tasks = store.load()
+                    state.synced()
+                schedule.reset(tasks)
+            due = schedule.pop_due()
+            if sender.held():
+                for day, task in due:
+                    if not task.completed:
+                        queue.submit(reminders.reminder_text(task))
+            # Wake for the next reminder, or sooner to look for outside edits.
+            due = schedule.next_due()
+            delay = args.poll if due is None else (due - datetime.now()).total_seconds()
+            stop.wait(max(0.0, min(delay, args.poll)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.close(timeout=5)
+        sender.release()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='workflow', description="Manage the WorkFlow schedule without the window.")
+    parser.add_argument('--backend', choices=sorted(storage.BACKENDS),
+                        help=f"storage backend (default: {storage.DEFAULT_BACKEND})")
+    parser.add_argument('--file', help="schedule file (default: the backend's own)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = commands.add_parser('add', help="add a task")
+    add_parser.add_argument('description')
+    add_parser.add_argument('--time', type=time_arg, required=True, help="start time, e.g. 2:00 PM or 14:00")
+    add_parser.add_argument('--end', type=time_arg, help="end time")
+    add_parser.add_argument('--location', default='')
+    when = add_parser.add_mutually_exclusive_group()
+    when.add_argument('--date', type=date.fromisoformat, help="YYYY-MM-DD (default: today)")
+    when.add_argument('--day', type=day_arg, help="the next such weekday, from today")
+    add_parser.add_argument('--weekly', action='store_true', help="repeat every week from that date")
+    add_parser.add_argument('--every', type=int, default=1, metavar='WEEKS', help="with --weekly, the interval")
+    add_parser.add_argument('--force', action='store_true', help="add even if it overlaps other tasks")
+    add_parser.set_defaults(run=add)
+
+    list_parser = commands.add_parser('list', help="list tasks")
+    which = list_parser.add_mutually_exclusive_group()
+    which.add_argument('--today', action='store_true', help="only what happens today")
+    which.add_argument('--day', type=day_arg, help="only one weekday's schedule")
+    list_parser.set_defaults(run=list_tasks)
+
+    remove_parser = commands.add_parser('remove', help="remove a task by id")
+    remove_parser.add_argument('id', help="the id, or a unique prefix of it, shown by list")
+    remove_parser.set_defaults(run=remove)
+
+    daemon_parser = commands.add_parser('daemon', help="send reminders in the background")
+    daemon_parser.add_argument('--lead', type=int, default=10, metavar='MINUTES', help="remind this long before")
+    daemon_parser.add_argument('--poll', type=float, default=5.0, metavar='SECONDS',
+                               help="how often to look for outside changes")
+    daemon_parser.set_defaults(run=daemon)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'every', 1) < 1:
+        print("--every must be at least 1.", file=sys.stderr)
+        return 2
+    store = storage.open_storage(args.backend, args.file)
+    # Reads log nothing, so only writers load the activity log.
+    log = None
+    if args.command in ('add', 'remove'):
+        import activity
+        log = activity.ActivityLog()
+    try:
+        return args.run(store, log, args)
+    finally:
+        if log is not None:
+            log.close()
+        store.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())